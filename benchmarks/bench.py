@@ -0,0 +1,273 @@
+#Imports
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+from vterm_core import builtins, registry as registry_module  # noqa: E402
+
+FORMAT_VERSION = 1
+# dirs x files per dir x bytes per file for the synthetic tree, lines in the large file,
+# stages in the long pipeline and commands for the dispatch loop.
+SCALES = {
+    "small": {"dirs": 20, "files": 50, "file_size": 2048, "lines": 200000, "stages": 8, "dispatch": 20000},
+    "medium": {"dirs": 50, "files": 200, "file_size": 4096, "lines": 1000000, "stages": 16, "dispatch": 100000},
+    "large": {"dirs": 200, "files": 500, "file_size": 4096, "lines": 5000000, "stages": 32, "dispatch": 500000},
+}
+# A benchmark is flagged when its median is this many times the baseline's.
+DEFAULT_THRESHOLD = 1.25
+PLATFORM_DIR = {"win32": "Windows", "darwin": "macOS"}.get(sys.platform, "Linux")
+
+#Fixtures
+def make_tree(root, dirs, files, file_size):
+    block = (b"vterm benchmark line with some words to grep through\n" * (file_size // 52 + 1))[:file_size]
+    for d in range(dirs):
+        directory = os.path.join(root, f"dir{d:04}")
+        os.makedirs(directory)
+        for f in range(files):
+            with open(os.path.join(directory, f"file{f:05}.txt"), "wb") as out:
+                out.write(block)
+    return root
+
+def make_large_file(path, lines):
+    with open(path, "w") as out:
+        chunk = 100000
+        for start in range(0, lines, chunk):
+            out.write("".join(f"{n:09} line of the large file {n % 977}\n" for n in range(start, min(start + chunk, lines))))
+    return path
+
+def make_flat_directory(root, entries):
+    os.makedirs(root)
+    for n in range(entries):
+        open(os.path.join(root, f"entry{n:06}"), "wb").close()
+    return root
+
+@contextmanager
+def quiet():
+    # Built-ins print to the terminal (some through stdout.buffer, some to stderr); all
+    # of it goes to the null device at the descriptor level while a benchmark runs.
+    sys.stdout.flush()
+    sys.stderr.flush()
+    saved = os.dup(1), os.dup(2)
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, 1)
+    os.dup2(devnull, 2)
+    try:
+        yield
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os.dup2(saved[0], 1)
+        os.dup2(saved[1], 2)
+        for fd in (devnull, *saved):
+            os.close(fd)
+
+#Benchmarks
+class Suite:
+    def __init__(self, workdir, scale):
+        self.workdir = workdir
+        self.scale = scale
+        self.registry = registry_module.CommandRegistry()
+        builtins.register_builtins(self.registry)
+        self.registry.register("noop", lambda args: 0, "Does nothing (benchmark dispatch).")
+        self.tree = make_tree(os.path.join(workdir, "tree"), scale["dirs"], scale["files"], scale["file_size"])
+        self.large = make_large_file(os.path.join(workdir, "large.txt"), scale["lines"])
+        self.flat = make_flat_directory(os.path.join(workdir, "flat"), scale["dirs"] * scale["files"])
+        self.copies = 0
+
+    def fresh(self, name):
+        self.copies += 1
+        return os.path.join(self.workdir, f"{name}{self.copies}")
+
+    # Each benchmark returns (setup, timed): setup runs untimed before every run.
+    def copy(self):
+        target = {}
+        def setup():
+            target["path"] = self.fresh("copy")
+        return setup, lambda: builtins.copy_directory(self.tree, target["path"])
+
+    def copy_unchanged(self):
+        destination = self.fresh("resume")
+        with quiet():
+            builtins.copy_directory(self.tree, destination)
+        return None, lambda: builtins.copy_directory(self.tree, destination)
+
+    def remove(self):
+        target = {}
+        def setup():
+            target["path"] = self.fresh("remove")
+            shutil.copytree(self.tree, target["path"])
+        return setup, lambda: builtins.remove_file_or_directory(target["path"])
+
+    def ls(self):
+        def listing():
+            previous = os.getcwd()
+            os.chdir(self.flat)
+            try:
+                builtins.list_files_in_current_directory()
+            finally:
+                os.chdir(previous)
+        return None, listing
+
+    def grep(self):
+        return None, lambda: self.registry.execute(f'grep -r -c words "{self.tree}"')
+
+    def grep_large(self):
+        return None, lambda: self.registry.execute(f'grep -c "line of the large file 97$" "{self.large}"')
+
+    def find(self):
+        return None, lambda: self.registry.execute(f'find "{self.tree}" -name "file*7.txt"')
+
+    def view(self):
+        return None, lambda: builtins.view_file(self.large)
+
+    def pipeline(self):
+        # Built-in stages pass spooled output along; no external programs involved.
+        stages = [f'view "{self.large}"'] + ["grep -v zzz"] * (self.scale["stages"] - 2) + ["grep -c 7"]
+        return None, lambda: builtins.execute_commands_with_pipes(stages, registry=self.registry)
+
+    def pipeline_external(self):
+        if shutil.which("cat") is None:
+            return None
+        stages = [f'cat "{self.large}"'] + ["cat"] * (self.scale["stages"] - 2) + ["grep -c 7"]
+        return None, lambda: builtins.execute_commands_with_pipes(stages, registry=self.registry)
+
+    def dispatch(self):
+        count = self.scale["dispatch"]
+        def loop():
+            execute = self.registry.execute
+            for _ in range(count):
+                execute("noop first second 'third argument'")
+        return None, loop
+
+    def cold_start(self):
+        script = os.path.join(ROOT, "src", PLATFORM_DIR, "vterm.py")
+        env = dict(os.environ, VTERM_HEADLESS="1", VTERM_HOME=os.path.join(self.workdir, "home"))
+        argv = [sys.executable, script, "-c", "exit"]
+        return None, lambda: subprocess.run(argv, env=env, cwd=os.path.dirname(script),
+                                            stdin=subprocess.DEVNULL, check=True)
+
+BENCHMARKS = ["copy", "copy_unchanged", "remove", "ls", "grep", "grep_large", "find", "view", "pipeline",
+              "pipeline_external", "dispatch", "cold_start"]
+
+def measure(setup, timed, repeat):
+    runs = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        with quiet():
+            started = time.perf_counter()
+            timed()
+            runs.append(time.perf_counter() - started)
+    return {
+        "min": min(runs),
+        "median": statistics.median(runs),
+        "mean": statistics.fmean(runs),
+        "stdev": statistics.stdev(runs) if len(runs) > 1 else 0.0,
+        "runs": runs,
+    }
+
+#Results
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def environment(scale_name, scale):
+    return {
+        "format": FORMAT_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "scale": scale_name,
+        "parameters": scale,
+    }
+
+def compare(results, baseline, threshold):
+    # Returns the names of the benchmarks whose median went over threshold x the baseline.
+    if results["scale"] != baseline.get("scale"):
+        print(f"Warning: comparing scale '{results['scale']}' against '{baseline.get('scale')}'")
+    print(f"{'benchmark':<20}{'baseline':>12}{'current':>12}{'change':>10}")
+    regressions = []
+    for name, current in results["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if before is None:
+            print(f"{name:<20}{'-':>12}{current['median'] * 1000:>10.1f}ms{'new':>10}")
+            continue
+        ratio = current["median"] / max(before["median"], 1e-9)
+        flag = "  REGRESSION" if ratio > threshold else ""
+        print(f"{name:<20}{before['median'] * 1000:>10.1f}ms{current['median'] * 1000:>10.1f}ms"
+              f"{(ratio - 1) * 100:>+9.1f}%{flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+#Main
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Time vTerm built-ins over a synthetic filesystem.")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("-n", "--repeat", type=int, default=5)
+    parser.add_argument("-o", "--output", metavar="FILE", help="write results as JSON to FILE")
+    parser.add_argument("--compare", metavar="BASELINE", help="compare against an earlier results file")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="flag benchmarks slower than THRESHOLD x the baseline median")
+    parser.add_argument("--only", nargs="+", choices=BENCHMARKS, metavar="NAME", help="run only these benchmarks")
+    parser.add_argument("--keep", action="store_true", help="keep the generated files")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    options = parse_args(argv)
+    if options.repeat < 1:
+        print("--repeat needs at least one run", file=sys.stderr)
+        return 2
+    baseline = None
+    if options.compare:
+        with open(options.compare) as file:
+            baseline = json.load(file)
+    scale = SCALES[options.scale]
+    results = environment(options.scale, scale)
+    results["results"] = {}
+    workdir = tempfile.mkdtemp(prefix="vterm-bench-")
+    try:
+        print(f"Generating {options.scale} fixtures in {workdir}...")
+        suite = Suite(workdir, scale)
+        for name in options.only or BENCHMARKS:
+            benchmark = getattr(suite, name)()
+            if benchmark is None:
+                print(f"{name:<20}skipped")
+                continue
+            result = measure(*benchmark, options.repeat)
+            results["results"][name] = result
+            print(f"{name:<20}{result['median'] * 1000:>10.1f} ms  (min {result['min'] * 1000:.1f} ms)")
+    finally:
+        if options.keep:
+            print(f"Fixtures kept in {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+    if options.output:
+        with open(options.output, "w") as file:
+            json.dump(results, file, indent=2)
+            file.write("\n")
+    if baseline is not None:
+        regressions = compare(results, baseline, options.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) over {options.threshold:g}x: {', '.join(regressions)}")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,359 +1,197 @@
-import os
-import subprocess
-import shutil
-from pathlib import Path
-import re
-from difflib import get_close_matches
-import pygame
 import time
-from tqdm import tqdm
+_started = time.perf_counter()
+import os
 import random
+import sys
 import readline
 
-command_help = {
-    "copy": "Copy a directory from source to destination. Usage: copy <SOURCE DESTINATION>",
-    "python": "Execute Python code interactively. Usage: python",
-    "ls": "List files and directories in the current directory. Usage: ls",
-    "cd": "Change the current directory. Usage: cd <DIRECTORY>",
-    "mkdir": "Create a new directory. Usage: mkdir <DIRECTORY>",
-    "clear": "Clear the terminal screen. Usage: clear",
-    "man": "View descriptions of available commands. Usage: man <COMMAND>",
-    "exit": "Exit the terminal. Usage: exit",
-    "edit OR nano OR vim": "Edit or create a text file. Usage: edit <FILENAME> OR nano <FILENAME> OR vim <FILENAME>",
-    "view OR cat": "View the content of a text file. Usage: view <FILENAME> OR cat <FILENAME>",
-    "create OR touch": "Create an empty file. Usage: create <FILENAME> OR touch <FILENAME>",
-    "rm": "Remove a file or directory. Usage: rm <FILENAME> or rm -r <DIRECTORY>",
-    "version": "Prints the terminal version",
-    "celebrate": "Celebrates. What more do I need to tell you?",
-    "help": "Provides Help for available commands. Usage: help <COMMAND>"
-}
+#Shared core (src/vterm_core)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+if __name__ == "__main__" and "--attach" in sys.argv[1:]:
+    # The thin client: hand this terminal to the daemon before importing the rest.
+    from vterm_core import daemon
+    sys.exit(daemon.attach(sys.argv[1:], os.path.abspath(__file__), _started))
+from vterm_core import batch, cli, completion, daemon, executables, fsindex, history, jobs, output
+from vterm_core.audio import AudioService
+# run_command stays importable from here for scripts that drive vTerm (vterm.run_command).
+from vterm_core.builtins import change_directory, list_commands, register_builtins, run_command, run_external
+from vterm_core.registry import CommandRegistry, ShellExit
+from vterm_core.startup import StartupTimer
+from vterm_core.suggest import SuggestionIndex
 
 S = "Sound"
-pygame.init()
-pygame.mixer.init()
-
-tada = pygame.mixer.Sound(os.path.join(S,"tada.wav"))
-tada.set_volume(1.0)
-startup = pygame.mixer.Sound(os.path.join(S,"Startup.wav"))
-startup.set_volume(1.0)
-error = pygame.mixer.Sound(os.path.join(S,"Error.wav"))
-error.set_volume(1.0)
-err = pygame.mixer.SoundType(os.path.join(S, "Err.wav"))
-err.set_volume(0.2)
-shutdown = pygame.mixer.Sound(os.path.join(S,"Shutdown.wav"))
-shutdown.set_volume(0.6)
+sounds = AudioService(S, {
+    "tada": ("tada.wav", 1.0),
+    "startup": ("Startup.wav", 1.0),
+    "error": ("Error.wav", 1.0),
+    "err": ("Err.wav", 0.2),
+    "shutdown": ("Shutdown.wav", 0.6),
+})
     
 
 version = "vTerm 0.0.100 | MacOS"
+# False when running a script, -c or piped commands.
+interactive = True
 
 def celebrate():
     print("yay!")
-    tada.play()
+    sounds.play("tada")
 
 def get_version_colored():
-    print(f"\033[0;32m{version}\033")
-    print("\033[1;34mCopyright: \033[1;36mEverestWorks @2023\033[0m\n")
+    print(output.style("version", version))
+    print(output.style("copyright", "EverestWorks @2023") + "\n")
 
 def warning_colored():
-    print("\033[1;31mWarning: This is a development environment, and there may be bugs.\033[0m")
-    print("\033[1;34mCopyright: \033[1;36mEverest works @2023\033[0m")
-    print("\033[0;37mType 'commands' to view available commands\033[0m\n")
+    print(output.style("warning", "Warning: This is a development environment, and there may be bugs."))
+    print(output.style("copyright", "Everest works @2023"))
+    print(output.style("hint", "Type 'commands' to view available commands") + "\n")
 
 
 def stylized_prompt(current_directory):
-    return f"\033[1;32m{current_directory}\033[0;35m: >> \033[0m"
+    return output.style("prompt", current_directory)
 
 def clear_screen():
+    output.flush()
     os.system("clear")
 
-def run_command(command):
-    try:
-        result = subprocess.run(command, shell=True, text=True, capture_output=True)
-        output = result.stdout
-        return output
-    except Exception as e:
-        return str(e)
-
-def execute_commands_with_pipes(commands):
-    processes = []
-    for cmd in commands:
-        processes.append(subprocess.Popen(cmd, stdout=subprocess.PIPE, text=True))
-    output = processes[0].communicate()[0]
-    for p in processes[1:]:
-        output = p.communicate(input=output)[0]
-    return output
-
-def grep(pattern, text):
-    lines = text.split('\n')
-    matching_lines = [line for line in lines if re.search(pattern, line)]
-    return '\n'.join(matching_lines)
-
-def copy_directory(source, destination):
-    try:
-        shutil.copytree(source, destination)
-        return f"Directory copied from {source} to {destination}"
-    except Exception as e:
-        return f"Error copying directory: {str(e)}"
-
-def execute_python_code(code):
-    try:
-        # Security Constrains
-        if 'os.' in code or 'fork()' in code:
-            raise ValueError("Command contains restricted operations.")
-
-        exec_result = exec(code)
-        return str(exec_result)
-    except Exception as e:
-        return str(e)
-
-def list_files_in_current_directory():
-    files = os.listdir()
-    for file in files:
-        print(file)
-
-def change_directory(new_dir):
-    try:
-        os.chdir(new_dir)
-        # print(f"Changed directory to: {new_dir}")
-    except FileNotFoundError:
-        print(f"Directory not found: {new_dir}")
-        error.play()
-
-def create_directory(new_dir):
-    try:
-        os.mkdir(new_dir)
-        print(f"Created directory: {new_dir}")
-    except FileExistsError:
-        print(f"Directory already exists: {new_dir}")
-        err.play()
-
-def autocomplete_path(text, state):
-    directory = os.path.dirname(text)
-    matches = [str(p) for p in Path(directory).iterdir() if str(p).startswith(text)]
-    return matches[state] if state < len(matches) else None
-
-def commands():
-    available_commands = list(command_help.keys())
-    print("Available commands:")
-    for cmd in available_commands:
-        print(f"  - {cmd}")
-    print("\nUse 'help <COMMAND>' to receive help on a specific command.")
-
-def display_help(command):
-    # available_commands = list(command_help.keys())
-    # if command == "":
-    #     print("Available commands:")
-    #     for cmd in available_commands:
-    #         print(f"  - {cmd}")
-    #     print("\nUse 'help <COMMAND>' to receive help on a specific command.")
-    if command in command_help:
-        print(f"{command}:")
-        print(command_help[command])
-    else:
-        print(f"Help for {command} not found. The command may not exist.")
-        error.play()
-
-
-def display_command_usage(command):
-    if command in command_help:
-        print(f"Usage: {command_help[command]}")
+def suggest_commands(mistyped_command):
+    return suggestions.lookup(mistyped_command)
+
+def unknown_command(argv, line):
+    if executables.commands.lookup(argv[0]) is not None:
+        return run_external(argv)
+    suggested_commands = suggest_commands(argv[0])
+    if suggested_commands:
+        print(f"Command not found: {line}. Did you mean one of these? {', '.join(suggested_commands)}")
+        sounds.play("err")
     else:
-        print(f"Usage information for {command} not found.")
-        error.play()
-
-def edit_file(filename):
-    try:
-        with open(filename, 'r') as file:
-            content = file.read()
-
-        print("Enter your text. Press Ctrl+D to save and exit.")
-        lines = []
-        while True:
-            try:
-                line = input()
-                lines.append(line)
-            except EOFError:
-                break
-
-        content = '\n'.join(lines)
+        print("Command not found: " + line)
+        sounds.play("error")
+    return 127
+
+#Command Registry
+registry = CommandRegistry()
+registry.on_error = lambda: sounds.play("error")
+register_builtins(registry, restricted_python=True, audio=sounds)
+registry.alias("nano", "edit")
+registry.alias("vim", "edit")
+registry.alias("cat", "view")
+registry.alias("create", "touch")
+registry.fallback = unknown_command
+suggestions = SuggestionIndex(registry)
+
+@registry.command("exit", "Exit the terminal, optionally with an exit status.", usage="exit [STATUS]")
+def exit_command(args):
+    status = int(args[0]) if args and args[0].lstrip("-").isdigit() else 0
+    if not interactive:
+        raise ShellExit(status)
+    if not jobs.supervisor.confirm_exit():
+        return 1
+    print("Shutting Down...")
+    output.flush()
+    sounds.play("shutdown").wait(2)
+    time.sleep(0.35)
+    raise ShellExit(status)
+
+@registry.command("clear", "Clear the terminal screen.", usage="clear")
+def clear_command(args):
+    clear_screen()
+    warning_colored()
 
-        with open(filename, 'w') as file:
-            file.write(content)
+@registry.command("version", "Prints the terminal version.", usage="version")
+def version_command(args):
+    get_version_colored()
 
-        print(f"File '{filename}' saved successfully.")
-    except Exception as e:
-        print(f"Error editing file: {str(e)}")
-        error.play()
+@registry.command("celebrate", "Celebrates. What more do I need to tell you?", usage="celebrate")
+def celebrate_command(args):
+    celebrate()
 
-def view_file(filename):
-    try:
-        with open(filename, 'r') as file:
-            content = file.read()
-            print(f"Content of '{filename}':\n")
-            print(content)
-    except FileNotFoundError:
-        print(f"File '{filename}' not found.")
-    except Exception as e:
-        print(f"Error viewing file: {str(e)}")
-        error.play()
+@registry.command("cd", "Change the current directory.", usage="cd <DIRECTORY>")
+def cd_command(args):
+    return change_directory(" ".join(args) if args else "/", announce=False)
 
-def touch_file(filename):
-    try:
-        with open(filename, 'w'):
-            pass
-        print(f"Created empty file: {filename}")
-    except Exception as e:
-        print(f"Error creating file: {str(e)}")
-        error.play()
+@registry.command("commands", "List the available commands.", usage="commands")
+def commands_command(args):
+    return list_commands(registry)
 
-def remove_file_or_directory(target):
-    try:
-        if os.path.isfile(target):
-            os.remove(target)
-            print(f"Removed file: {target}")
-        elif os.path.isdir(target):
-            shutil.rmtree(target)
-            print(f"Removed directory and its contents: {target}")
-        else:
-            print(f"File or directory not found: {target}")
-            error.play()
-    except Exception as e:
-        print(f"Error removing file or directory: {str(e)}")
-        error.play()
+@registry.command("quit", "Reminds you how to shut down vTerm.", usage="quit")
+def quit_command(args):
+    print("Type 'exit' to shutdown vTerm")
 
-def suggest_commands(mistyped_command):
-    available_commands = list(command_help.keys())
-    suggestions = get_close_matches(mistyped_command, available_commands, n=3, cutoff=0.6)
-    return suggestions
+command_help = registry.help_table()
 
-def main():
-    clear_screen()
+def boot_animation():
+    from tqdm import tqdm
     for i in tqdm(range(100), colour='green', desc="Booting..."):
         wtime = random.uniform(0.001, 0.05)
         time.sleep(wtime)
-        pass
+
+def report_startup(timer, options):
+    timer.mark("first prompt")
+    if options.timings or timer.over_budget(options.startup_budget):
+        timer.report(options.startup_budget)
+
+def attached_session(argv, started):
+    # Runs in a session forked from the daemon; startup timings count from the client's launch.
+    global _started
+    if started is not None:
+        _started = started
+    return main(argv)
+
+def serve_daemon():
+    modules = ("tqdm", "pygame") if sounds.enabled else ("tqdm",)
+    return daemon.serve(attached_session, warm=(history.store.preload, suggestions.refresh),
+                        refresh=(history.store.refresh, suggestions.refresh), modules=modules)
+
+def main(argv=None):
+    global interactive
+    options = cli.parse_args(argv)
+    if options.daemon:
+        return serve_daemon()
+    output.install(readline)
+    if cli.batch_mode(options, sys.stdin):
+        # No banner, sounds, clear or prompt: just the commands and their exit status.
+        interactive = False
+        sounds.enabled = False
+        return batch.run(registry, options)
+    timer = StartupTimer(_started)
+    timer.mark("imports")
+    if not options.fast:
+        clear_screen()
+        boot_animation()
     clear_screen()
     warning_colored()
-    startup.play()
+    timer.mark("banner")
+    sounds.play("startup")
+    timer.mark("audio")
+    completion.install(readline, registry)
+    suggestions.warm()
+    fsindex.indexes.refresh_in_background()
+    history.store.start(readline)
+    jobs.supervisor.install_handlers()
 
     while True:
         current_directory = os.getcwd()
+        if timer is not None:
+            report_startup(timer, options)
+            timer = None
         try:
-            # Read input using readline
-            user_input = input(stylized_prompt(current_directory)).strip()
-
-            # Add the input to the command history
-            readline.add_history(user_input)
-
-            if user_input.lower() == "exit":
-                print("Shutting Down...")
-                shutdown.play()
-                time.sleep(0.35)
-                break
-            elif user_input.lower() == "version":
-                get_version_colored()
-            elif user_input.lower() == "celebrate":
-                celebrate()
-            elif user_input.lower() == "clear":
-                clear_screen()
-                warning_colored()
-            elif "|" in user_input:
-                commands = user_input.split("|")
-                commands = [cmd.strip() for cmd in commands]
-                output = execute_commands_with_pipes(commands)
-                print(output)
-            elif user_input.startswith("grep"):
-                _, pattern = user_input.split(" ", 1)
-                # Get the previous command's output from the user
-                previous_output = input("Enter the output to grep: ")
-                output = grep(pattern, previous_output)
-                print(output)
-            elif user_input.startswith("edit") or user_input.startswith("nano") or user_input.startswith("vim"):
-                try:
-                    _, filename = user_input.split(" ", 1)
-                    edit_file(filename)
-                except ValueError:
-                    print("Argument needed. Usage: edit OR nano OR vim <FILENAME>")
-                    error.play()
-                    continue
-            elif user_input.startswith("view") or user_input.startswith("cat"):
-                try:
-                    _, filename = user_input.split(" ", 1)
-                    view_file(filename)
-                except ValueError:
-                    print("Argument needed. Usage: view OR cat <FILENAME>")
-                    error.play()
-                    continue
-            elif user_input.startswith("create") or user_input.startswith("touch"):
-                try:
-                    _, filename = user_input.split(" ", 1)
-                    touch_file(filename)
-                except ValueError:
-                    print("Argument needed. Usage: create OR touch <FILENAME>")
-                    error.play()
-                    continue
-            elif user_input.startswith("rm"):
-                try:
-                    _, target = user_input.split(" ", 1)
-                except ValueError:
-                    print("Argument needed. Usage: rm file OR rm -r <DIRECTORY>")
-                    error.play()
-                    continue
-                remove_file_or_directory(target)
-            elif user_input.startswith("ls"):
-                list_files_in_current_directory()
-            elif user_input.startswith("cd"):
-                try:
-                    _, new_dir = user_input.splcit(" ", 1)
-                except ValueError:
-                    change_directory('/')
-                    continue
-                change_directory(new_dir)
-            elif user_input.startswith("mkdir"):
-                args = user_input.split()
-                if len(args) > 1:
-                    new_dir = args[1]
-                else:
-                    print("Argument needed. Usage: mkdir <DIRECTORY>")
-                    error.play()
-                    continue
-                create_directory(new_dir)
-            elif user_input.startswith("commands"):
-                args = user_input.split(" ", 1)
-                if len(args) > 1:
-                    display_help(args[1])
-                else:
-                    help()
-            elif user_input.startswith("man"):
-                args = user_input.split(" ", 1)
-                if len(args) > 1:
-                    display_help(args[1])
-                else:
-                    print("Argument needed. Usage: man <COMMAND>")
-                    error.play()
-            elif user_input.startswith("python"):
-                code = ""
-                while True:
-                    code_line = input("... ")
-                    if code_line.lower() == "end":
-                        break
-                    code += code_line + "\n"
-                output = execute_python_code(code)
-                print(output)
-            elif user_input.startswith("quit"):
-                print("Type 'exit' to shutdown vTerm")
-            else:
-                suggested_commands = suggest_commands(user_input)
-                if suggested_commands:
-                    print(f"Command not found: {user_input}. Did you mean one of these? {', '.join(suggested_commands)}")
-                    err.play()
-                else:
-                    print("Command not found: " + user_input)
-                    error.play()
+            # Read input using readline (background jobs redraw the prompt when they print)
+            prompt = stylized_prompt(current_directory)
+            with jobs.supervisor.prompt(prompt, readline):
+                user_input = input(prompt).strip()
+
+            # Add the input to the command history (readline keeps its own copy)
+            history.store.record(user_input)
+
+            registry.execute(user_input)
+            output.flush()
+        except ShellExit as e:
+            return e.status
         except KeyboardInterrupt:
             print("\nUse 'exit' to exit the terminal.")
-            error.play()
+            sounds.play("error")
             continue
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1 @@
+#vTerm core: code shared by the Linux, macOS and Windows builds.
@@ -0,0 +1,14 @@
+#Imports
+import argparse
+
+#Argument parsing for built-ins
+class UsageError(Exception):
+    pass
+
+class CommandParser(argparse.ArgumentParser):
+    # argparse would print and call sys.exit(); built-ins report through the registry instead.
+    def __init__(self, prog, **kwargs):
+        super().__init__(prog=prog, add_help=False, allow_abbrev=False, **kwargs)
+
+    def error(self, message):
+        raise UsageError(message)
@@ -0,0 +1,85 @@
+#Imports
+import os
+import queue
+import threading
+import time
+
+from vterm_core.config import env_flag
+
+#Audio
+class AudioService:
+    # pygame is imported, the mixer opened and each clip decoded on a background
+    # thread the first time it is needed; the REPL never waits on any of it.
+    def __init__(self, sound_dir, clips, enabled=True):
+        # Resolve now: the user may `cd` away before a clip is first loaded.
+        self.sound_dir = os.path.abspath(sound_dir)
+        self.clips = dict(clips)
+        self.enabled = enabled and not env_flag("VTERM_HEADLESS") and not env_flag("VTERM_NO_AUDIO")
+        self.cache = {}
+        self.mixer = None
+        self.tasks = queue.Queue()
+        self.worker = None
+        self.lock = threading.Lock()
+        # Called with ("sound NAME", seconds, 0) after each clip is loaded and started.
+        self.observers = []
+
+    def play(self, name):
+        return self._submit(name, True)
+
+    def preload(self, *names):
+        for name in names:
+            self._submit(name, False)
+
+    def _submit(self, name, play):
+        done = threading.Event()
+        if not self.enabled or name not in self.clips:
+            done.set()
+            return done
+        with self.lock:
+            if self.worker is None:
+                self.worker = threading.Thread(target=self._run, name="vterm-audio", daemon=True)
+                self.worker.start()
+        self.tasks.put((name, play, done))
+        return done
+
+    def _run(self):
+        while True:
+            name, play, done = self.tasks.get()
+            started = time.perf_counter()
+            try:
+                sound = self._load(name)
+                if play and sound is not None:
+                    sound.play()
+            except Exception:
+                pass
+            finally:
+                done.set()
+            for observer in self.observers:
+                observer("sound " + name, time.perf_counter() - started, 0)
+
+    def _load(self, name):
+        if name in self.cache:
+            return self.cache[name]
+        sound = None
+        if self._open_mixer():
+            filename, volume = self.clips[name]
+            try:
+                sound = self.mixer.Sound(os.path.join(self.sound_dir, filename))
+                sound.set_volume(volume)
+            except Exception:
+                sound = None
+        self.cache[name] = sound
+        return sound
+
+    def _open_mixer(self):
+        if self.mixer is None:
+            try:
+                os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+                import pygame
+                pygame.mixer.init()
+                self.mixer = pygame.mixer
+            except Exception:
+                # No audio device (headless server, container, CI): stay silent.
+                self.mixer = False
+                self.enabled = False
+        return bool(self.mixer)
@@ -0,0 +1,69 @@
+#Imports
+import sys
+import time
+
+from vterm_core import output
+from vterm_core.parsing import split_sequence
+from vterm_core.registry import ShellExit
+
+#Batch mode
+def run_lines(registry, lines, errexit=False):
+    # Returns the status of the last command, or the one given to `exit`.
+    status = 0
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        # -e looks at each command of `a; b`, not just at the line.
+        for command in split_sequence(line) if errexit else [line]:
+            try:
+                status = registry.execute(command) or 0
+            except ShellExit as e:
+                return e.status
+            if errexit and status:
+                return status
+    return status
+
+class CountingLines:
+    # Counts lines as they are read, so --timings can report throughput.
+    def __init__(self, lines):
+        self.lines = lines
+        self.count = 0
+
+    def __iter__(self):
+        for line in self.lines:
+            self.count += 1
+            yield line
+
+def _source(options):
+    if options.command is not None:
+        return options.command.splitlines(), None
+    if options.script is not None and options.script != "-":
+        return open(options.script, encoding="utf-8", errors="surrogateescape"), options.script
+    return sys.stdin, None
+
+def run(registry, options):
+    try:
+        lines, path = _source(options)
+    except OSError as e:
+        print(f"vterm: {options.script}: {e.strerror}", file=sys.stderr)
+        return 127
+    counter = CountingLines(lines)
+    started = time.perf_counter()
+    try:
+        status = run_lines(registry, counter, options.errexit)
+    except KeyboardInterrupt:
+        status = 130
+    except BrokenPipeError:
+        # The reader went away (`vterm -c ... | head`), like SIGPIPE in a shell.
+        output.discard()
+        status = 141
+    finally:
+        if path is not None:
+            lines.close()
+        output.flush()
+    if options.timings:
+        elapsed = time.perf_counter() - started
+        print(f"vterm: {counter.count} lines in {elapsed * 1000:.1f} ms "
+              f"({counter.count / max(elapsed, 1e-9):.0f} lines/s)", file=sys.stderr)
+    return status
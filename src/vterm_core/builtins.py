@@ -0,0 +1,357 @@
+#Imports
+import io
+import os
+import subprocess
+import tempfile
+from functools import partial
+
+from vterm_core import (editor, executables, find, fscopy, fsindex, grep, history, jobs, listing, metrics, pager,
+                        process, profiling, pyrepl, remove, streams)
+from vterm_core.parsing import tokenize
+
+# Output of a built-in feeding a later stage stays in memory up to this size, then spills to disk.
+SPOOL_LIMIT = 8 * 1024 * 1024
+
+#Commands
+def _is_builtin(registry, command):
+    argv = tokenize(command)
+    return registry is not None and bool(argv) and registry.lookup(argv[0]) is not None
+
+def _run_builtin(registry, command, stdin, last):
+    # A built-in that feeds a later stage writes into a spool instead of the terminal.
+    if last:
+        return registry.run(tokenize(command), command, stdin=stdin), None
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_LIMIT)
+    stream = io.TextIOWrapper(spool, write_through=True)
+    with streams.redirect(stream):
+        status = registry.run(tokenize(command), command, stdin=stdin)
+    stream.detach()
+    spool.seek(0)
+    return status, spool
+
+def run_pipeline_stages(registry, commands):
+    # External stages run concurrently on OS pipes; a built-in stage reads the
+    # previous stage's output as a stream and its own output feeds the next stage.
+    statuses = []
+    upstream = None
+    index = 0
+    while index < len(commands):
+        if _is_builtin(registry, commands[index]):
+            last = index == len(commands) - 1
+            status, spool = _run_builtin(registry, commands[index], upstream, last)
+            if upstream is not None:
+                upstream.close()
+            statuses.append(status)
+            upstream = spool
+            index += 1
+            continue
+        end = index
+        while end < len(commands) and not _is_builtin(registry, commands[end]):
+            end += 1
+        feeds_builtin = end < len(commands)
+        pipeline = process.Pipeline(commands[index:end], stdin=upstream,
+                                    stdout=subprocess.PIPE if feeds_builtin else None).start()
+        if feeds_builtin:
+            last = end == len(commands) - 1
+            try:
+                status, spool = _run_builtin(registry, commands[end], pipeline.output, last)
+            finally:
+                if pipeline.output is not None:
+                    pipeline.output.close()
+                statuses.extend(pipeline.wait())
+            statuses.append(status)
+            end += 1
+        else:
+            statuses.extend(pipeline.wait())
+            spool = None
+        if upstream is not None:
+            upstream.close()
+        upstream = spool
+        index = end
+    return statuses
+
+def execute_commands_with_pipes(commands, registry=None):
+    statuses = run_pipeline_stages(registry, commands)
+    if process.pipeline_failed(statuses):
+        metrics.collector.error("pipeline")
+        print("Pipeline exit status: " + " | ".join(str(status) for status in statuses))
+    return statuses
+
+def run_external(argv):
+    # Programs found on PATH run directly, with the terminal as their stdin/stdout.
+    status = process.run_pipeline([argv])[-1]
+    if status:
+        metrics.collector.error("external")
+    return status
+
+def run_command(command, stream=False, capture_limit=1024 * 1024):
+    # Runs a program and returns what it printed. With stream=True the output reaches the
+    # terminal as it arrives and only the newest capture_limit bytes are kept.
+    try:
+        if stream:
+            returncode, capture = process.stream_command(command, capture_limit=capture_limit)
+            if returncode:
+                metrics.collector.error("run_command")
+            return capture.text() if capture is not None else ""
+        argv = tokenize(command)
+        result = subprocess.run(argv, executable=executables.resolve(argv[0]), text=True, capture_output=True)
+        if result.returncode:
+            metrics.collector.error("run_command")
+        return result.stdout
+    except Exception as e:
+        metrics.collector.error("run_command")
+        return str(e)
+
+def show_hash(names, reset=False):
+    if reset:
+        executables.commands.forget()
+    status = 0
+    for name in names:
+        if executables.commands.lookup(name) is None:
+            print(f"hash: {name}: not found")
+            status = 1
+    if not reset and not names:
+        entries = executables.commands.items()
+        if not entries:
+            print("hash table empty")
+        else:
+            print("hits\tcommand")
+            for name, hits, path in entries:
+                print(f"{hits:4}\t{path}")
+    return status
+
+def copy_directory(source, destination):
+    return fscopy.command([source, destination])
+
+def execute_python_code(code, restricted=False, session=None):
+    session = session or pyrepl.PythonSession(restricted)
+    return session.run(code)
+
+def list_files_in_current_directory():
+    return listing.command([])
+
+def change_directory(new_dir, announce=True):
+    busy = jobs.supervisor.builtins_running()
+    if busy:
+        # Built-in jobs share vTerm's directory: their relative paths would move with it.
+        numbers = ", ".join(f"%{job.number}" for job in busy)
+        print(f"cd: built-in jobs are running in this directory ({numbers}); wait for them or kill them first")
+        return 1
+    try:
+        os.chdir(new_dir)
+        if announce:
+            print(f"Changed directory to: {new_dir}")
+    except FileNotFoundError:
+        print(f"Directory not found: {new_dir}")
+        return 1
+    except OSError as e:
+        print(f"cd: {new_dir}: {e.strerror or str(e)}")
+        return 1
+
+def create_directory(new_dir):
+    try:
+        os.mkdir(new_dir)
+        print(f"Created directory: {new_dir}")
+    except FileExistsError:
+        print(f"Directory already exists: {new_dir}")
+        return 1
+    except OSError as e:
+        print(f"mkdir: {new_dir}: {e.strerror or str(e)}")
+        return 1
+
+def edit_file(filename):
+    return editor.edit(filename)
+
+def view_file(filename):
+    return pager.show(filename)
+
+def touch_file(filename):
+    try:
+        with open(filename, 'w'):
+            pass
+        print(f"Created empty file: {filename}")
+    except Exception as e:
+        print(f"Error creating file: {str(e)}")
+        return 1
+
+def remove_file_or_directory(target):
+    return remove.command(["-r", target])
+
+def list_commands(registry):
+    print("Available commands:")
+    for cmd in registry.commands:
+        print(f"  - {cmd}")
+    print("\nUse 'help <COMMAND>' to receive help on a specific command.")
+
+def display_help(registry, command):
+    entry = registry.lookup(command)
+    if entry is not None:
+        print(f"{entry.name}:")
+        print(entry.describe())
+    else:
+        print(f"Help for {command} not found. The command may not exist.")
+        return 1
+
+#Registration
+def register_builtins(registry, restricted_python=False, audio=None):
+    registry.pipeline_runner = partial(execute_commands_with_pipes, registry=registry)
+    jobs.supervisor.attach(registry)
+    profiling.enable_from_environment(registry, audio)
+    metrics.enable_from_environment(registry, audio)
+
+    @registry.command("copy", "Copy a directory (or file) from source to destination. Files that are already "
+                      "copied (same size and mtime) are skipped, so an interrupted copy can be resumed.",
+                      usage="copy [-j JOBS] [--no-skip] [-q] <SOURCE> <DESTINATION>", min_args=2)
+    def copy(args):
+        return fscopy.command(args)
+
+    python_session = pyrepl.PythonSession(restricted=restricted_python)
+
+    @registry.command("python", "Execute Python code interactively. Type 'end' to run the block. Variables are "
+                      "kept between blocks, a final expression is printed, and '%time STMT' / '%timeit STMT' "
+                      "lines time a statement.", usage="python")
+    def python(args):
+        code = ""
+        while True:
+            try:
+                code_line = input("... ")
+            except EOFError:
+                break
+            if code_line.lower() == "end":
+                break
+            code += code_line + "\n"
+        return execute_python_code(code, session=python_session)
+
+    @registry.command("ls", "List files and directories. -l long format, -a hidden files, "
+                      "-S/-t sort by size/time, -U unsorted (fastest), -r reverse, -h human sizes.",
+                      usage="ls [-a] [-l] [-h] [-S | -t | -U] [-r] [PATH...]")
+    def ls(args):
+        return listing.command(args)
+
+    @registry.command("cd", "Change the current directory.", usage="cd <DIRECTORY>", min_args=1)
+    def cd(args):
+        return change_directory(" ".join(args))
+
+    @registry.command("mkdir", "Create a new directory.", usage="mkdir <DIRECTORY>", min_args=1)
+    def mkdir(args):
+        return create_directory(args[0])
+
+    @registry.command("edit", "Edit or create a text file with a line editor; type 'h' inside for its commands.",
+                      usage="edit <FILENAME>", min_args=1)
+    def edit(args):
+        return edit_file(args[0])
+
+    @registry.command("view", "View a text file a screen at a time. +N starts at line N; --head/--tail "
+                      "show the first/last N lines and -f follows the file as it grows.",
+                      usage="view [+LINE] [--head | --tail] [-n N] [-f] <FILENAME>", min_args=1)
+    def view(args):
+        return pager.view_command(args)
+
+    @registry.command("head", "Print the first lines of a file or of piped input.", usage="head [-n N | -N] [FILENAME]",
+                      stdin=True)
+    def head(args, stdin=None):
+        return pager.head_command(args, stdin=stdin)
+
+    @registry.command("tail", "Print the last lines of a file or of piped input; -f keeps printing what is "
+                      "appended to a file.", usage="tail [-n N | -N] [-f] [FILENAME]", stdin=True)
+    def tail(args, stdin=None):
+        return pager.tail_command(args, stdin=stdin)
+
+    @registry.command("touch", "Create an empty file.", usage="touch <FILENAME>", min_args=1)
+    def touch(args):
+        return touch_file(args[0])
+
+    @registry.command("rm", "Remove files and directories; accepts several targets and globs. "
+                      "-n lists what would be removed without deleting anything.",
+                      usage="rm [-r] [-f] [-n] [-v] [-q] [-j JOBS] <TARGET...>", min_args=1)
+    def rm(args):
+        return remove.command(args)
+
+    @registry.command("grep", "Search files, directories (-r) or piped input for lines matching a pattern.",
+                      usage="grep [-i] [-v] [-n] [-c] [-l] [-r] [-F] [-j JOBS] <PATTERN> [FILE...]",
+                      min_args=1, stdin=True)
+    def grep_command(args, stdin=None):
+        return grep.command(args, stdin=stdin)
+
+    @registry.command("find", "List files and directories under PATHs (default .) matching every test given. "
+                      "Directories are read in parallel; .gitignore and .ignore rules are honoured unless "
+                      "--no-ignore. -n stops after COUNT matches.",
+                      usage="find [PATH...] [-name GLOB | -iname GLOB] [-regex RE] [-type f|d|l] [-size [+-]N[ckMG]] "
+                      "[-mtime [+-]DAYS] [-maxdepth N] [-n COUNT] [-j JOBS] [--no-ignore]")
+    def find_command(args):
+        return find.command(args)
+
+    @registry.command("locate", "List indexed paths containing TEXT (-b: in the name only), or whose names match "
+                      "a GLOB; a glob with / matches the end of the path. Answers come from the indexes "
+                      "'updatedb' keeps, so they are instant but may be a little out of date (-e checks). "
+                      "-S describes the indexes.",
+                      usage="locate [-i] [-b] [-c] [-e] [-n COUNT] <TEXT | GLOB> | locate -S")
+    def locate_command(args):
+        return fsindex.locate_command(args)
+
+    @registry.command("updatedb", "Index the file names under each ROOT for 'locate' and Tab completion, or "
+                      "bring every index up to date; only directories that changed since are read again.",
+                      usage="updatedb [ROOT...] | updatedb --remove ROOT...")
+    def updatedb_command(args):
+        return fsindex.updatedb_command(args)
+
+    @registry.command("hash", "Show the remembered locations of programs run from PATH. 'hash NAME' looks NAME up "
+                      "now; 'hash -r' forgets every location.", usage="hash [-r] [NAME...]")
+    def hash_command(args):
+        return show_hash([arg for arg in args if arg != "-r"], reset="-r" in args)
+
+    @registry.command("history", "Show the last N commands (default 20), or the latest ones containing TEXT "
+                      "(-p: starting with TEXT). History is kept across sessions; -c clears it.",
+                      usage="history [-n N] [-p] [-c] [TEXT]")
+    def history_command(args):
+        return history.command(args)
+
+    @registry.command("jobs", "List background jobs (started by ending a command with '&'). -l adds process IDs.",
+                      usage="jobs [-l]")
+    def jobs_command(args):
+        return jobs.jobs_command(args)
+
+    @registry.command("fg", "Bring a background or stopped job to the foreground. Ctrl+C interrupts it, "
+                      "Ctrl+Z stops it again.", usage="fg [%JOB]")
+    def fg(args):
+        return jobs.fg_command(args)
+
+    @registry.command("bg", "Resume a stopped job in the background.", usage="bg [%JOB]")
+    def bg(args):
+        return jobs.bg_command(args)
+
+    @registry.command("wait", "Wait for background jobs to finish (all of them by default).", usage="wait [%JOB...]")
+    def wait(args):
+        return jobs.wait_command(args)
+
+    @registry.command("kill", "Send a signal (default TERM) to jobs or processes.",
+                      usage="kill [-SIGNAL | -s SIGNAL] <%JOB | PID>...", min_args=1)
+    def kill(args):
+        return jobs.kill_command(args)
+
+    @registry.command("time", "Run a command and report its wall, user and system time and peak memory. "
+                      "Quote a pipeline to time all of it.", usage="time <COMMAND> | time \"<PIPELINE>\"", min_args=1)
+    def time_command(args):
+        return profiling.time_command(registry, args)
+
+    @registry.command("profile", "Run a command under cProfile and print the N hottest functions (default 20), "
+                      "sorted by cumulative time, own time or calls. -o saves the raw profile.",
+                      usage="profile [-n N] [-s cumulative|tottime|calls] [-o FILE] <COMMAND>", min_args=1)
+    def profile(args):
+        return profiling.profile_command(registry, args)
+
+    @registry.command("ledger", "Show how long each command has taken this session (count, mean, p50, p95, max). "
+                      "'ledger on' starts recording (or set VTERM_LEDGER=1), 'off' stops, 'reset' clears.",
+                      usage="ledger [on | off | reset | show]")
+    def ledger(args):
+        return profiling.ledger_command(args, (registry, audio))
+
+    @registry.command("help", "Provides help for available commands.", usage="help <COMMAND>")
+    def help(args):
+        if not args or args[0] == "-h":
+            return list_commands(registry)
+        return display_help(registry, args[0])
+
+    @registry.command("man", "View descriptions of available commands.", usage="man <COMMAND>", min_args=1)
+    def man(args):
+        return display_help(registry, args[0])
@@ -0,0 +1,40 @@
+#Imports
+import argparse
+import os
+
+from vterm_core.config import env_flag
+
+#Command line
+def build_parser():
+    parser = argparse.ArgumentParser(prog="vterm")
+    parser.add_argument("--fast", action="store_true", default=env_flag("VTERM_FAST_START"),
+                        help="skip the boot animation")
+    parser.add_argument("--timings", action="store_true", default=env_flag("VTERM_STARTUP_TIMINGS"),
+                        help="print how long each startup phase took")
+    parser.add_argument("--startup-budget", type=float, metavar="MS", default=_env_float("VTERM_STARTUP_BUDGET_MS"),
+                        help="warn when time to first prompt exceeds MS milliseconds")
+    parser.add_argument("-c", dest="command", metavar="COMMANDS",
+                        help="run COMMANDS (lines or ';'-separated) without the interactive prompt, then exit")
+    parser.add_argument("-e", "--errexit", action="store_true",
+                        help="in batch mode, stop at the first command that fails")
+    parser.add_argument("--daemon", action="store_true",
+                        help="keep a pre-warmed vTerm running that new terminals attach to with --attach")
+    parser.add_argument("--attach", action="store_true",
+                        help="start the session in the running daemon (falls back to a normal start)")
+    parser.add_argument("script", nargs="?",
+                        help="run the commands in this file ('-' for stdin) without the interactive prompt")
+    return parser
+
+def parse_args(argv=None):
+    return build_parser().parse_args(argv)
+
+def batch_mode(options, stdin):
+    # Scripts, -c and piped input all run without the banner, sounds or prompt.
+    return options.command is not None or options.script is not None or not stdin.isatty()
+
+def _env_float(name):
+    value = os.environ.get(name)
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
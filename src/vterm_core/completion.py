@@ -0,0 +1,176 @@
+#Imports
+import os
+from bisect import bisect_left
+from collections import OrderedDict
+
+from vterm_core import fsindex
+from vterm_core.parsing import split_pipeline
+
+DIRECTORY_CACHE_SIZE = 64
+DELIMITERS = " \t\n\"'|;&<>"
+# Built-ins whose arguments are command names or directories rather than any path.
+COMMAND_ARGUMENTS = {"help", "man"}
+DIRECTORY_ARGUMENTS = {"cd", "mkdir"}
+_FOLD = os.name == "nt"
+
+#Trie
+class Trie:
+    # The words are kept sorted, so every trie node is a contiguous slice of the list.
+    # Nodes are created the first time a prefix is typed (two bisects), then cached,
+    # so building the trie costs one sort and each extra character is one dict lookup.
+    def __init__(self, words=()):
+        pairs = sorted((self._key(word), word) for word in words)
+        self.keys = [key for key, _ in pairs]
+        self.words = [word for _, word in pairs]
+        self.root = [0, len(self.keys), {}]
+
+    @staticmethod
+    def _key(word):
+        return word.lower() if _FOLD else word
+
+    def __len__(self):
+        return len(self.words)
+
+    def _node(self, prefix):
+        node = self.root
+        key = self._key(prefix)
+        for depth, char in enumerate(key):
+            child = node[2].get(char)
+            if child is None:
+                # Every key in the node shares key[:depth]; those with `char` next sit
+                # between key[:depth + 1] and the next character up.
+                start, end = node[0], node[1]
+                lo = bisect_left(self.keys, key[:depth + 1], start, end)
+                hi = bisect_left(self.keys, key[:depth] + chr(ord(char) + 1), lo, end) if ord(char) < 0x10FFFF else end
+                child = node[2][char] = [lo, hi, {}]
+            if child[0] == child[1]:
+                return child
+            node = child
+        return node
+
+    def complete(self, prefix):
+        start, end, _ = self._node(prefix)
+        return self.words[start:end]
+
+#Directory cache
+class DirectoryCache:
+    # One trie per directory, rebuilt only when the directory's mtime changes, so
+    # repeated Tab presses in a huge directory cost a stat, not a rescan.
+    def __init__(self, size=DIRECTORY_CACHE_SIZE):
+        self.size = size
+        self.entries = OrderedDict()
+
+    def lookup(self, directory):
+        path = os.path.abspath(directory or ".")
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            self.entries.pop(path, None)
+            return None
+        cached = self.entries.get(path)
+        if cached is not None and cached[0] == mtime:
+            self.entries.move_to_end(path)
+            return cached[1], cached[2]
+        names = []
+        directories = []
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+                    if is_dir:
+                        directories.append(entry.name + os.sep)
+                        names.append(entry.name + os.sep)
+                    else:
+                        names.append(entry.name)
+        except OSError:
+            return None
+        tries = (Trie(names), Trie(directories))
+        self.entries[path] = (mtime, *tries)
+        self.entries.move_to_end(path)
+        while len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+        return tries
+
+    def invalidate(self, directory=None):
+        if directory is None:
+            self.entries.clear()
+        else:
+            self.entries.pop(os.path.abspath(directory), None)
+
+#Completer
+class Completer:
+    def __init__(self, registry, readline=None, directories=None, index=None):
+        self.registry = registry
+        self.readline = readline
+        self.directories = directories or DirectoryCache()
+        self.index = index
+        self.command_names = ()
+        self.command_trie = Trie()
+        self.matches = []
+
+    def commands(self):
+        names = tuple(self.registry.table)
+        if names != self.command_names:
+            self.command_names = names
+            self.command_trie = Trie(names)
+        return self.command_trie
+
+    def complete_command(self, text):
+        return [name + " " for name in self.commands().complete(text)]
+
+    def complete_path(self, text, directories_only=False):
+        split = max(text.rfind("/"), text.rfind(os.sep)) + 1
+        head, base = text[:split], text[split:]
+        tries = self.directories.lookup(os.path.expanduser(head))
+        if tries is None:
+            return []
+        words = tries[1 if directories_only else 0].complete(base)
+        if not base.startswith("."):
+            words = [word for word in words if not word.startswith(".")]
+        if not words and base and self.index is not None:
+            # Nothing here by that name: a single match further down, found in the file
+            # index (see updatedb), completes to its path. Several are left alone, since
+            # readline would replace what was typed with their common prefix.
+            deep = self.index.complete(os.path.expanduser(head) or os.curdir, base, directories_only, limit=2)
+            if len(deep) == 1:
+                words = deep
+        # A single file is finished with a space; a directory stays open for the next part.
+        if len(words) == 1 and not words[0].endswith(os.sep):
+            return [head + words[0] + " "]
+        return [head + word for word in words]
+
+    def candidates(self, line, begin, text):
+        # Only the last pipeline stage matters: `ls | gr<Tab>` completes a command.
+        words = split_pipeline(line[:begin])[-1].split()
+        if not words:
+            if "/" in text or os.sep in text:
+                return self.complete_path(text)
+            return self.complete_command(text)
+        command = self.registry.lookup(words[0])
+        name = command.name if command is not None else words[0]
+        if name in COMMAND_ARGUMENTS and len(words) == 1:
+            return self.complete_command(text)
+        return self.complete_path(text, directories_only=name in DIRECTORY_ARGUMENTS)
+
+    def complete(self, text, state):
+        # readline asks for match 0, 1, 2... until it gets None; the list is built once.
+        if state == 0:
+            try:
+                self.matches = self.candidates(self.readline.get_line_buffer(), self.readline.get_begidx(), text)
+            except Exception:
+                self.matches = []
+        return self.matches[state] if state < len(self.matches) else None
+
+def install(readline, registry):
+    completer = Completer(registry, readline, index=fsindex.indexes)
+    readline.set_completer_delims(DELIMITERS)
+    readline.set_completer(completer.complete)
+    if "libedit" in (getattr(readline, "__doc__", None) or ""):
+        # macOS ships Python's readline on top of libedit, which has its own syntax.
+        readline.parse_and_bind("bind ^I rl_complete")
+    else:
+        readline.parse_and_bind("tab: complete")
+    return completer
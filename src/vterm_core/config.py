@@ -0,0 +1,15 @@
+#Imports
+import os
+
+#Environment
+def env_flag(name, default=False):
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() not in ("", "0", "false", "no", "off")
+
+def state_dir():
+    # Per-user files (history, caches) live in ~/.vterm unless VTERM_HOME points elsewhere.
+    path = os.environ.get("VTERM_HOME") or os.path.join(os.path.expanduser("~"), ".vterm")
+    os.makedirs(path, exist_ok=True)
+    return path
@@ -0,0 +1,325 @@
+#Imports
+# Only the standard library: the attach side runs before the rest of vTerm is imported.
+import atexit
+import json
+import os
+import select
+import signal
+import socket
+import struct
+import sys
+import time
+import traceback
+
+try:
+    import fcntl
+    import termios
+    import tty
+except ImportError:
+    fcntl = termios = tty = None
+
+from vterm_core.config import state_dir
+
+HEADER = struct.Struct("!I")
+MAX_HEADER = 1 << 20
+# Signals the terminal sends to the attached client, passed on to the session. With a
+# pty the keys reach it as bytes instead, and only hangups and kills are passed on.
+FORWARDED = ("SIGINT", "SIGQUIT", "SIGTSTP", "SIGWINCH", "SIGHUP", "SIGTERM", "SIGCONT")
+RELAY_FORWARDED = ("SIGHUP", "SIGTERM")
+RELAY_CHUNK = 64 * 1024
+# How long output the session wrote just before it ended may take to come through the pty.
+DRAIN_WAIT = 0.05
+
+def socket_path():
+    return os.environ.get("VTERM_DAEMON_SOCKET") or os.path.join(state_dir(), "daemon.sock")
+
+def supported():
+    return hasattr(os, "fork") and hasattr(socket, "AF_UNIX") and hasattr(socket, "send_fds")
+
+#Messages
+def _send(conn, message, fds=()):
+    data = json.dumps(message).encode() + b"\n"
+    if fds:
+        socket.send_fds(conn, [data], fds)
+    else:
+        conn.sendall(data)
+
+def _read_line(conn, buffer):
+    while b"\n" not in buffer:
+        chunk = conn.recv(4096)
+        if not chunk:
+            return None, buffer
+        buffer += chunk
+    line, _, rest = buffer.partition(b"\n")
+    return json.loads(line), rest
+
+def _receive_request(conn):
+    # Length-prefixed JSON (argv, cwd, environment) with stdin/stdout/stderr attached.
+    data, fds, _, _ = socket.recv_fds(conn, MAX_HEADER, 3)
+    while len(data) < HEADER.size:
+        chunk = conn.recv(HEADER.size - len(data))
+        if not chunk:
+            raise ConnectionError("client went away")
+        data += chunk
+    (length,) = HEADER.unpack_from(data)
+    if length > MAX_HEADER:
+        raise ConnectionError("request too large")
+    body = data[HEADER.size:]
+    while len(body) < length:
+        chunk = conn.recv(length - len(body))
+        if not chunk:
+            raise ConnectionError("client went away")
+        body += chunk
+    return json.loads(body), fds
+
+#Client
+def attach(args, script, started=None):
+    # Hands this terminal to the daemon and waits for the session to end. Without a
+    # daemon (or on Windows) vTerm simply starts in this process instead.
+    args = [arg for arg in args if arg != "--attach"]
+    started = time.perf_counter() if started is None else started
+    if supported():
+        conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            conn.connect(socket_path())
+        except OSError:
+            conn.close()
+        else:
+            with conn:
+                return _run_attached(conn, args, started)
+    os.execv(sys.executable, [sys.executable, script] + args)
+
+def _run_attached(conn, args, started):
+    # At a terminal the session gets a pty of its own, since only a new session's own
+    # terminal can be its controlling one, and this process relays between the two
+    # (the way dtach and tmux do). Otherwise it is handed stdin/stdout/stderr as they are.
+    relay = tty is not None and os.isatty(0) and os.isatty(1)
+    request = json.dumps({"argv": args, "cwd": os.getcwd(), "env": dict(os.environ), "started": started,
+                          "pty": relay}).encode()
+    socket.send_fds(conn, [HEADER.pack(len(request)) + request], [0, 1, 2])
+    data, fds, _, _ = socket.recv_fds(conn, 4096, 1)
+    reply, buffer = _read_line(conn, data)
+    if reply is None:
+        for fd in fds:
+            os.close(fd)
+        print("vterm: the daemon closed the connection", file=sys.stderr)
+        return 1
+    session = reply["pid"]
+
+    def forward(signum, frame):
+        try:
+            os.killpg(session, signum)
+        except OSError:
+            pass
+
+    for name in RELAY_FORWARDED if fds else FORWARDED:
+        if hasattr(signal, name):
+            signal.signal(getattr(signal, name), forward)
+    if fds:
+        reply, _ = _relay(conn, buffer, fds[0])
+    else:
+        reply, _ = _read_line(conn, buffer)
+    return 1 if reply is None else reply["status"]
+
+def _relay(conn, buffer, master):
+    # Keys go to the pty as they are typed (the terminal is raw: Ctrl+C and Ctrl+Z are
+    # turned into signals by the pty), its output comes back, until the session reports.
+    def resize(signum=None, frame=None):
+        try:
+            fcntl.ioctl(master, termios.TIOCSWINSZ, fcntl.ioctl(0, termios.TIOCGWINSZ, bytes(8)))
+        except OSError:
+            pass
+
+    signal.signal(signal.SIGWINCH, resize)
+    resize()
+    saved = termios.tcgetattr(0)
+    tty.setraw(0)
+    os.set_blocking(master, False)
+    reading = [0, master, conn]
+    pending = b""
+    reply = None
+    try:
+        while reply is None:
+            # Typing waits while the session is not reading, rather than pile up here.
+            ready, writable, _ = select.select([fd for fd in reading if fd != 0 or not pending],
+                                               [master] if pending else [], [])
+            if master in ready and not _copy_output(master):
+                reading.remove(master)
+            if 0 in ready:
+                pending = os.read(0, RELAY_CHUNK)
+                if not pending:
+                    reading.remove(0)
+            if writable:
+                try:
+                    pending = pending[os.write(master, pending):]
+                except BlockingIOError:
+                    pass
+                except OSError:
+                    pending = b""
+            if conn in ready:
+                reply, buffer = _read_line(conn, buffer)
+                if reply is None:
+                    break
+        while master in reading and select.select([master], [], [], DRAIN_WAIT)[0] and _copy_output(master):
+            pass
+    finally:
+        termios.tcsetattr(0, termios.TCSADRAIN, saved)
+        os.close(master)
+    return reply, buffer
+
+def _copy_output(master):
+    # False once the pty is closed: Linux reports that as EIO rather than end of file.
+    try:
+        data = os.read(master, RELAY_CHUNK)
+    except BlockingIOError:
+        return True
+    except OSError:
+        return False
+    view = memoryview(data)
+    while view:
+        view = view[os.write(1, view):]
+    return bool(data)
+
+#Daemon
+def serve(session, warm=(), refresh=(), modules=(), path=None):
+    # A fork server: everything slow (imports, the history file, PATH scans) is done
+    # once here, and each attach forks a copy that already has it. `session(argv,
+    # started)` runs in the child with the client's terminal, cwd and environment.
+    if not supported():
+        print("vterm: the daemon needs fork and Unix domain sockets (Linux, macOS)", file=sys.stderr)
+        return 1
+    path = path or socket_path()
+    listener = _listen(path)
+    if listener is None:
+        print(f"vterm: a daemon is already listening on {path}", file=sys.stderr)
+        return 1
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+    for name in modules:
+        try:
+            __import__(name)
+        except Exception:
+            pass
+    for step in warm:
+        step()
+    # Sessions are reaped by the kernel; each child reports its own status.
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+    print(f"vTerm daemon {os.getpid()} listening on {path}")
+    sys.stdout.flush()
+    try:
+        while True:
+            try:
+                conn, _ = listener.accept()
+            except InterruptedError:
+                continue
+            try:
+                request, fds = _receive_request(conn)
+            except (OSError, ValueError):
+                conn.close()
+                continue
+            for step in refresh:
+                step()
+            if os.fork() == 0:
+                listener.close()
+                _run_session(session, conn, request, fds)
+            for fd in fds:
+                os.close(fd)
+            conn.close()
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        listener.close()
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+def _listen(path):
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        listener.connect(path)
+    except OSError:
+        pass
+    else:
+        listener.close()
+        return None
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+    # Only this user may attach: the socket hands out a shell.
+    previous = os.umask(0o077)
+    try:
+        listener.bind(path)
+    finally:
+        os.umask(previous)
+    listener.listen(16)
+    return listener
+
+def _open_terminal(client):
+    # A pty set up like the client's terminal (modes, size). After setsid the session
+    # has no controlling terminal, and anything that opens /dev/tty (sudo, ssh, less)
+    # would fail with ENXIO; the pty's slave becomes it.
+    master, slave = os.openpty()
+    try:
+        termios.tcsetattr(slave, termios.TCSANOW, termios.tcgetattr(client))
+        fcntl.ioctl(slave, termios.TIOCSWINSZ, fcntl.ioctl(client, termios.TIOCGWINSZ, bytes(8)))
+    except (OSError, termios.error):
+        pass
+    if hasattr(termios, "TIOCSCTTY"):
+        fcntl.ioctl(slave, termios.TIOCSCTTY, 0)
+    else:
+        os.close(os.open(os.ttyname(slave), os.O_RDWR))
+    return master, slave
+
+def _run_session(session, conn, request, fds):
+    status = 1
+    try:
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        # Its own session and process group, so the client can signal it and the
+        # programs it runs in one go.
+        os.setsid()
+        master = slave = None
+        if request.get("pty") and tty is not None:
+            master, slave = _open_terminal(fds[0])
+        for target, fd in enumerate(fds[:3]):
+            # Redirected streams stay as they are; only the terminal is swapped for the pty.
+            os.dup2(slave if slave is not None and os.isatty(fd) else fd, target)
+        for fd in fds + ([slave] if slave is not None else []):
+            if fd > 2:
+                os.close(fd)
+        # The daemon's stream objects were set up for its own stdio (buffering, seekability).
+        sys.stdin = open(0, "r", encoding=sys.stdin.encoding, closefd=False)
+        sys.stdout = open(1, "w", encoding=sys.stdout.encoding, closefd=False)
+        sys.stderr = open(2, "w", encoding=sys.stderr.encoding, errors="backslashreplace", closefd=False)
+        os.environ.clear()
+        os.environ.update(request["env"])
+        os.chdir(request["cwd"])
+        # Only sessions get their own counts and flusher, not every forked worker.
+        # (Imported here: the thin client loads this module and must stay light.)
+        from vterm_core import metrics
+        metrics.collector.forked()
+        if master is None:
+            _send(conn, {"pid": os.getpid()})
+        else:
+            _send(conn, {"pid": os.getpid()}, [master])
+            os.close(master)
+        status = session(request["argv"], request.get("started"))
+    except SystemExit as e:
+        status = e.code if isinstance(e.code, int) or e.code is None else 1
+    except BaseException:
+        traceback.print_exc()
+    finally:
+        # Exit handlers (metrics) and output first: the client returns as soon as it
+        # has the status. os._exit keeps the child out of the daemon's accept loop.
+        try:
+            atexit._run_exitfuncs()
+            sys.stdout.flush()
+        except Exception:
+            pass
+        try:
+            _send(conn, {"status": status or 0})
+        except OSError:
+            pass
+        os._exit(status or 0)
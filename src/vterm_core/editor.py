@@ -0,0 +1,319 @@
+#Imports
+import os
+import shutil
+import tempfile
+from array import array
+
+from vterm_core.pager import COPY_CHUNK, MappedFile
+
+ORIGINAL = 0
+ADDED = 1
+PAGE_LINES = 20
+
+HELP = """Commands (N and A,B are line numbers, $ is the last line):
+  p [A[,B]]   print lines (default: the next 20)
+  a [N]       append lines after line N; finish with a line holding only '.'
+  i [N]       insert lines before line N
+  c A[,B]     replace lines A..B
+  d A[,B]     delete lines A..B
+  /text       go to the next line containing text
+  w           save          wq   save and quit
+  q           quit          q!   quit without saving"""
+
+#Piece table
+class PieceTable:
+    # The document is a list of pieces [buffer, first line, line count] over two
+    # buffers: the original file (mapped, never copied) and an append-only buffer of
+    # added lines. Edits only split and splice pieces, so no edit copies the text.
+    # The last original piece may have count None, meaning "to the end of the file";
+    # it is resolved only when something needs to know.
+    def __init__(self, mapped=None):
+        self.mapped = mapped
+        self.added = bytearray()
+        self.added_lines = array("Q")
+        self.pieces = [[ORIGINAL, 0, None]] if mapped is not None and mapped.size else []
+        self.modified = False
+        self.newline = b"\n"
+        if self.pieces and mapped.lines(0, 1).endswith(b"\r\n"):
+            self.newline = b"\r\n"
+
+    @classmethod
+    def open(cls, path):
+        return cls(MappedFile(path) if os.path.exists(path) else None)
+
+    def close(self):
+        if self.mapped is not None:
+            self.mapped.close()
+            self.mapped = None
+
+    def _count(self, piece):
+        if piece[2] is None:
+            piece[2] = self.mapped.line_count() - piece[1]
+        return piece[2]
+
+    def _contains(self, piece, index):
+        if piece[2] is None:
+            target = piece[1] + index
+            self.mapped.index_to_line(target)
+            if target < len(self.mapped.offsets):
+                return True
+        return index < self._count(piece)
+
+    def line_count(self):
+        return sum(self._count(piece) for piece in self.pieces)
+
+    def _locate(self, line):
+        # Returns (piece position, line within the piece); the end of the document
+        # is (number of pieces, 0).
+        seen = 0
+        for position, piece in enumerate(self.pieces):
+            if self._contains(piece, line - seen):
+                return position, line - seen
+            seen += piece[2]
+        if line == seen:
+            return len(self.pieces), 0
+        raise IndexError(line)
+
+    def _split(self, line):
+        position, offset = self._locate(line)
+        if offset == 0:
+            return position
+        kind, first, count = self.pieces[position]
+        rest = None if count is None else count - offset
+        self.pieces[position:position + 1] = [[kind, first, offset], [kind, first + offset, rest]]
+        return position + 1
+
+    def insert(self, line, texts):
+        if not texts:
+            return
+        first = len(self.added_lines)
+        for text in texts:
+            self.added_lines.append(len(self.added))
+            self.added += text + self.newline
+        position = self._split(line)
+        self.pieces.insert(position, [ADDED, first, len(texts)])
+        self.modified = True
+
+    def delete(self, start, end):
+        first = self._split(start)
+        last = self._split(end)
+        del self.pieces[first:last]
+        self.modified = True
+
+    def _span(self, kind, first, count):
+        if kind == ORIGINAL:
+            end = self.mapped.size if count is None else self.mapped.line_offset(first + count)
+            return self.mapped.data, self.mapped.line_offset(first), end
+        last = first + count
+        end = self.added_lines[last] if last < len(self.added_lines) else len(self.added)
+        return self.added, self.added_lines[first], end
+
+    def lines(self, start, end):
+        # Yields (line number, bytes without the line ending) for lines [start, end).
+        position, offset = self._locate(start)
+        number = start
+        while number < end and position < len(self.pieces):
+            kind, first, count = self.pieces[position]
+            count = self._count(self.pieces[position])
+            while offset < count and number < end:
+                data, begin, stop = self._span(kind, first + offset, 1)
+                yield number, bytes(data[begin:stop]).rstrip(b"\r\n")
+                offset += 1
+                number += 1
+            position += 1
+            offset = 0
+
+    def find(self, text, start):
+        # Searches forward from `start`, wrapping around to the top.
+        total = self.line_count()
+        for first, last in ((start, total), (0, min(start, total))):
+            for number, line in self.lines(first, last):
+                if text in line:
+                    return number
+        return None
+
+    def write_to(self, out):
+        # Unchanged stretches of the original are copied straight out of the map.
+        pending_newline = False
+        for kind, first, count in self.pieces:
+            data, begin, end = self._span(kind, first, count)
+            if begin == end:
+                continue
+            if pending_newline:
+                out.write(self.newline)
+            for pos in range(begin, end, COPY_CHUNK):
+                out.write(data[pos:min(pos + COPY_CHUNK, end)])
+            # Only the original's last line can lack a line ending; add one if more follows.
+            pending_newline = data[end - 1:end] != b"\n"
+
+#Saving
+def _default_mode():
+    mask = os.umask(0)
+    os.umask(mask)
+    return 0o666 & ~mask
+
+def save_atomically(table, path):
+    # Write a temp file next to the target and rename it over the original, so a
+    # crash leaves either the old file or the new one, never half of each.
+    directory = os.path.dirname(os.path.abspath(path))
+    handle, temp = tempfile.mkstemp(dir=directory, prefix="." + os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(handle, "wb") as out:
+            table.write_to(out)
+            out.flush()
+            os.fsync(out.fileno())
+        if os.path.exists(path):
+            shutil.copymode(path, temp)
+        else:
+            os.chmod(temp, _default_mode())
+        if os.name == "nt" and table.mapped is not None:
+            # Windows will not rename over a mapped file. If the rename fails anyway the
+            # original is mapped again, so the document is still all there.
+            mapped_path = table.mapped.path
+            table.close()
+            try:
+                os.replace(temp, path)
+            except OSError:
+                table.mapped = MappedFile(mapped_path)
+                raise
+        else:
+            os.replace(temp, path)
+    except BaseException:
+        try:
+            os.unlink(temp)
+        except OSError:
+            pass
+        raise
+
+#Editor
+class LineEditor:
+    def __init__(self, path):
+        self.path = path
+        self.table = PieceTable.open(path)
+        self.current = 0
+
+    def _line_number(self, text, default):
+        text = text.strip()
+        if not text:
+            return default
+        if text == "$":
+            return self.table.line_count()
+        if text == ".":
+            return self.current + 1
+        return int(text)
+
+    def _range(self, text, default):
+        if "," in text:
+            first, last = text.split(",", 1)
+            start, end = self._line_number(first, default[0]), self._line_number(last, default[1])
+        else:
+            start = end = self._line_number(text, default[0])
+        total = self.table.line_count()
+        if start < 1 or end < start or end > total:
+            raise ValueError(f"line range out of bounds (the file has {total} lines)")
+        return start, end
+
+    def _read_block(self):
+        texts = []
+        while True:
+            try:
+                line = input()
+            except EOFError:
+                break
+            if line == ".":
+                break
+            texts.append(line.encode("utf-8", "surrogateescape"))
+        return texts
+
+    def _print(self, start, end):
+        width = len(str(end))
+        for number, line in self.table.lines(start - 1, end):
+            print(f"{number + 1:>{width}}  {line.decode(errors='replace')}")
+        self.current = end
+
+    def save(self):
+        if not self.table.modified and os.path.exists(self.path):
+            print("No changes to save.")
+            return True
+        try:
+            save_atomically(self.table, self.path)
+        except OSError as e:
+            # Nothing is lost: the edits stay open and can be saved once the problem is fixed.
+            print(f"Error saving '{self.path}': {e.strerror or str(e)}. Your changes are still open.")
+            return False
+        self.table.close()
+        self.table = PieceTable.open(self.path)
+        print(f"File '{self.path}' saved successfully.")
+        return True
+
+    def run(self):
+        total = self.table.line_count()
+        state = "new file" if self.table.mapped is None else f"{total} lines"
+        print(f"Editing '{self.path}' ({state}). Type 'h' for help.")
+        while True:
+            try:
+                entry = input("edit> ").strip()
+            except EOFError:
+                entry = "q"
+                print()
+            if not entry:
+                continue
+            command, argument = entry[0], entry[1:]
+            try:
+                if entry in ("q", "q!"):
+                    if entry == "q" and self.table.modified:
+                        print("There are unsaved changes. Use 'w' to save or 'q!' to discard them.")
+                        continue
+                    break
+                elif entry in ("w", "wq"):
+                    if self.save() and entry == "wq":
+                        break
+                elif entry == "h":
+                    print(HELP)
+                elif command == "p":
+                    total = self.table.line_count()
+                    if not total:
+                        print("(empty file)")
+                        continue
+                    if argument.strip():
+                        start, end = self._range(argument, (1, total))
+                    else:
+                        start = min(self.current + 1, total)
+                        end = min(start + PAGE_LINES - 1, total)
+                    self._print(start, end)
+                elif command in "ai":
+                    total = self.table.line_count()
+                    line = self._line_number(argument, total if command == "a" else 1)
+                    line = line if command == "a" else line - 1
+                    if not 0 <= line <= total:
+                        raise ValueError(f"line out of bounds (the file has {total} lines)")
+                    texts = self._read_block()
+                    self.table.insert(line, texts)
+                    self.current = line + len(texts)
+                elif command in "cd":
+                    start, end = self._range(argument, (self.current or 1, self.current or 1))
+                    texts = self._read_block() if command == "c" else []
+                    self.table.delete(start - 1, end)
+                    self.table.insert(start - 1, texts)
+                    self.current = start - 1 + len(texts)
+                elif command == "/":
+                    found = self.table.find(argument.encode("utf-8", "surrogateescape"), self.current)
+                    if found is None:
+                        print(f"Not found: {argument}")
+                    else:
+                        self._print(found + 1, found + 1)
+                else:
+                    print(f"Unknown editor command: {entry}. Type 'h' for help.")
+            except ValueError as e:
+                print(f"Error: {str(e)}")
+        self.table.close()
+
+def edit(path):
+    try:
+        LineEditor(path).run()
+    except IsADirectoryError:
+        print(f"'{path}' is a directory.")
+        return 1
+    except OSError as e:
+        print(f"Error editing file: {str(e)}")
+        return 1
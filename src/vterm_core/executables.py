@@ -0,0 +1,125 @@
+#Imports
+import errno
+import os
+import threading
+
+#PATH
+def _extensions():
+    if os.name != "nt":
+        return None
+    # In PATHEXT order, which is the order Windows tries them in.
+    return [ext.lower() for ext in os.environ.get("PATHEXT", ".COM;.EXE;.BAT;.CMD").split(os.pathsep) if ext]
+
+def path_directories(path=None):
+    # PATH entries in order, without duplicates or empty entries.
+    seen = set()
+    directories = []
+    for directory in (os.environ.get("PATH", "") if path is None else path).split(os.pathsep):
+        directory = os.path.expanduser(directory.strip().strip('"'))
+        if directory and directory not in seen:
+            seen.add(directory)
+            directories.append(directory)
+    return directories
+
+def scan_executables(directory):
+    # Command names provided by one PATH directory; on Windows "git.exe" is listed as "git".
+    extensions = _extensions()
+    names = set()
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            try:
+                if not entry.is_file():
+                    continue
+            except OSError:
+                continue
+            if extensions is None:
+                if os.access(entry.path, os.X_OK):
+                    names.add(entry.name)
+            else:
+                stem, ext = os.path.splitext(entry.name)
+                if ext.lower() in extensions:
+                    names.add(stem.lower())
+    return names
+
+def directory_stamp(directory):
+    try:
+        return os.stat(directory).st_mtime_ns
+    except OSError:
+        return None
+
+#Command hash
+class CommandHash:
+    # Like bash's `hash`: a program is searched for on PATH once, then its location is
+    # remembered. The whole table is dropped when PATH changes; a remembered program
+    # that has since disappeared is forgotten and searched for again.
+    def __init__(self):
+        self.table = {}
+        self.hits = {}
+        self.path = None
+        self.lock = threading.Lock()
+
+    def _check_path(self):
+        path = os.environ.get("PATH", "")
+        if path != self.path:
+            self.table.clear()
+            self.hits.clear()
+            self.path = path
+
+    def _search(self, name):
+        extensions = _extensions()
+        if extensions is None or os.path.splitext(name)[1].lower() in extensions:
+            candidates = (name,)
+        else:
+            candidates = tuple(name + ext for ext in extensions)
+        for directory in path_directories(self.path):
+            for candidate in candidates:
+                path = os.path.join(directory, candidate)
+                if os.path.isfile(path) and os.access(path, os.X_OK):
+                    return path, os.path.isabs(directory)
+        return None, False
+
+    def lookup(self, name):
+        if os.sep in name or (os.altsep and os.altsep in name):
+            # Explicit paths are never searched for or remembered.
+            return name if os.path.isfile(name) and os.access(name, os.X_OK) else None
+        with self.lock:
+            self._check_path()
+            path = self.table.get(name)
+            if path is None:
+                path, absolute = self._search(name)
+                if path is None:
+                    return None
+                if not absolute:
+                    # Relative PATH entries depend on the current directory.
+                    return path
+                self.table[name] = path
+                self.hits[name] = 0
+            return path
+
+    def hit(self, name):
+        with self.lock:
+            if name in self.hits:
+                self.hits[name] += 1
+
+    def forget(self, name=None):
+        with self.lock:
+            if name is None:
+                self.table.clear()
+                self.hits.clear()
+            else:
+                self.table.pop(name, None)
+                self.hits.pop(name, None)
+
+    def items(self):
+        with self.lock:
+            self._check_path()
+            return [(name, self.hits[name], path) for name, path in sorted(self.table.items())]
+
+commands = CommandHash()
+
+def resolve(name):
+    path = commands.lookup(name)
+    if path is None:
+        raise FileNotFoundError(errno.ENOENT, "command not found", name)
+    commands.hit(name)
+    return path
@@ -0,0 +1,366 @@
+#Imports
+import fnmatch
+import os
+import queue
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from vterm_core import jobs
+from vterm_core.arguments import CommandParser, UsageError
+
+DEFAULT_JOBS = min(32, (os.cpu_count() or 1) * 4)
+IGNORE_FILES = (".gitignore", ".ignore")
+SIZE_UNITS = {"": 1, "c": 1, "k": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+DAY = 86400
+
+parser = CommandParser("find")
+parser.add_argument("paths", nargs="*")
+parser.add_argument("-name", dest="name")
+parser.add_argument("-iname", dest="iname")
+parser.add_argument("-regex", dest="regex")
+parser.add_argument("-type", dest="type", choices=("f", "d", "l"))
+parser.add_argument("-size", dest="size")
+parser.add_argument("-mtime", dest="mtime")
+parser.add_argument("-maxdepth", dest="maxdepth", type=int)
+parser.add_argument("-n", dest="limit", type=int)
+parser.add_argument("-j", dest="jobs", type=int, default=DEFAULT_JOBS)
+parser.add_argument("--no-ignore", dest="ignore", action="store_false")
+
+#Ignore files
+def translate(pattern):
+    # A gitignore glob as a regex over a "/"-separated path: "*" and "?" stay inside one
+    # directory, "**/" spans any number of them.
+    parts = []
+    i, n = 0, len(pattern)
+    while i < n:
+        char = pattern[i]
+        if char == "*":
+            if pattern.startswith("**/", i):
+                parts.append("(?:.*/)?")
+                i += 3
+                continue
+            if pattern.startswith("**", i):
+                parts.append(".*")
+                i += 2
+                continue
+            parts.append("[^/]*")
+        elif char == "?":
+            parts.append("[^/]")
+        elif char == "[":
+            end = pattern.find("]", i + 2)
+            if end < 0:
+                parts.append("\\[")
+            else:
+                body = pattern[i + 1:end].replace("\\", "\\\\")
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                parts.append(f"[{body}]")
+                i = end
+        elif char == "\\" and i + 1 < n:
+            i += 1
+            parts.append(re.escape(pattern[i]))
+        else:
+            parts.append(re.escape(char))
+        i += 1
+    return "".join(parts)
+
+class IgnoreRule:
+    def __init__(self, line):
+        self.negate = line.startswith("!")
+        if self.negate or line.startswith("\\!") or line.startswith("\\#"):
+            line = line[1:]
+        self.directory_only = line.endswith("/")
+        line = line.rstrip("/")
+        # A slash anywhere but the end ties the pattern to the ignore file's directory;
+        # otherwise it matches a name at any depth.
+        self.anchored = "/" in line
+        self.regex = re.compile(translate(line.lstrip("/")), re.DOTALL)
+
+def parse_ignore_file(path):
+    rules = []
+    try:
+        with open(path, encoding="utf-8", errors="surrogateescape") as file:
+            for line in file:
+                line = line.rstrip("\n").rstrip("\r")
+                if not line.startswith("\\ "):
+                    line = line.rstrip(" ")
+                if line and not line.startswith("#"):
+                    rules.append(IgnoreRule(line))
+    except OSError:
+        pass
+    return rules
+
+class IgnoreChain:
+    # The rules in force in one directory: (base directory, rules) pairs from the top
+    # down, shared with every directory below that adds no ignore file of its own.
+    def __init__(self, levels=()):
+        self.levels = levels
+
+    def extend(self, directory, names):
+        rules = []
+        for name in IGNORE_FILES:
+            if name in names:
+                rules.extend(parse_ignore_file(os.path.join(directory, name)))
+        if not rules:
+            return self
+        # Bases are absolute: the walk's paths may be relative ("find .") while the
+        # ignore files above the starting directory are found by absolute path.
+        return IgnoreChain(self.levels + ((os.path.abspath(directory), rules),))
+
+    def ignored(self, path, name, is_dir):
+        # Later rules win, so a "!pattern" can bring back what an earlier one ignored.
+        result = False
+        absolute = None
+        for base, rules in self.levels:
+            relative = None
+            for rule in rules:
+                if rule.directory_only and not is_dir:
+                    continue
+                if rule.anchored:
+                    if relative is None:
+                        if absolute is None:
+                            absolute = os.path.abspath(path)
+                        relative = absolute[len(base):].lstrip(os.sep).replace(os.sep, "/")
+                    matched = rule.regex.fullmatch(relative)
+                else:
+                    matched = rule.regex.fullmatch(name)
+                if matched:
+                    result = not rule.negate
+        return result
+
+def repository_chain(root):
+    # Ignore files above the starting directory count too, up to the repository root.
+    directory = os.path.abspath(root)
+    ancestors = []
+    while True:
+        parent = os.path.dirname(directory)
+        if os.path.isdir(os.path.join(directory, ".git")):
+            break
+        if parent == directory:
+            return IgnoreChain()
+        ancestors.append(parent)
+        directory = parent
+    chain = IgnoreChain()
+    for ancestor in reversed(ancestors):
+        try:
+            names = set(os.listdir(ancestor))
+        except OSError:
+            continue
+        chain = chain.extend(ancestor, names)
+    return chain
+
+#Filters
+def _compare(spec, parse):
+    # find's "+N" (more than), "-N" (less than) and "N" (exactly) arguments.
+    if spec[:1] in "+-":
+        sign, spec = spec[0], spec[1:]
+    else:
+        sign = ""
+    value = parse(spec)
+    if sign == "+":
+        return lambda actual: actual > value
+    if sign == "-":
+        return lambda actual: actual < value
+    return lambda actual: actual == value
+
+def size_test(spec):
+    match = re.fullmatch(r"([+-]?\d+)([ckMG]?)", spec)
+    if match is None:
+        raise UsageError(f"invalid size '{spec}' (e.g. +10M, -4k, 100c)")
+    unit = SIZE_UNITS[match.group(2)]
+    test = _compare(match.group(1), int)
+    # Like find, sizes count in whole units rounded up.
+    return lambda info: test(-(-info.st_size // unit))
+
+def mtime_test(spec, now):
+    if re.fullmatch(r"[+-]?\d+", spec) is None:
+        raise UsageError(f"invalid age '{spec}' in days (e.g. -1, +30)")
+    test = _compare(spec, int)
+    return lambda info: test(int((now - info.st_mtime) // DAY))
+
+class Filters:
+    def __init__(self, options):
+        self.type = options.type
+        self.name = None
+        if options.name is not None:
+            self.name = re.compile(fnmatch.translate(options.name))
+        elif options.iname is not None:
+            self.name = re.compile(fnmatch.translate(options.iname), re.IGNORECASE)
+        try:
+            self.regex = re.compile(options.regex) if options.regex is not None else None
+        except re.error as e:
+            raise UsageError(f"invalid -regex: {str(e)}")
+        self.stat_tests = []
+        if options.size is not None:
+            self.stat_tests.append(size_test(options.size))
+        if options.mtime is not None:
+            self.stat_tests.append(mtime_test(options.mtime, time.time()))
+
+    def matches(self, entry, kind):
+        if self.type is not None and kind != self.type:
+            return False
+        if self.name is not None and self.name.match(entry.name) is None:
+            return False
+        # Like find, -regex has to match the whole path, not just part of it.
+        if self.regex is not None and self.regex.fullmatch(entry.path) is None:
+            return False
+        if self.stat_tests:
+            # DirEntry reuses what the directory read returned where it can (Windows).
+            info = entry.stat(follow_symlinks=False)
+            return all(test(info) for test in self.stat_tests)
+        return True
+
+#Walking
+class ParallelFinder:
+    # Each directory is one task on the pool; its matches and errors come back to the
+    # calling thread as one message, which prints them at once. With -n the walk stops
+    # as soon as enough matches have been printed.
+    def __init__(self, filters, jobs=DEFAULT_JOBS, maxdepth=None, ignore=True):
+        self.filters = filters
+        self.jobs = jobs
+        self.maxdepth = maxdepth
+        self.ignore = ignore
+        self.results = queue.SimpleQueue()
+        self.stop = threading.Event()
+
+    def scan(self, directory, depth, chain):
+        # Returns (matches, errors, subdirectories to scan next).
+        matches = []
+        subdirectories = []
+        if self.stop.is_set():
+            return matches, [], subdirectories
+        try:
+            with os.scandir(directory) as iterator:
+                entries = list(iterator)
+        except OSError as e:
+            return matches, [(directory, e.strerror)], subdirectories
+        if self.ignore:
+            chain = chain.extend(directory, {entry.name for entry in entries})
+        descend = self.maxdepth is None or depth < self.maxdepth
+        errors = []
+        for entry in entries:
+            try:
+                if entry.is_symlink():
+                    kind = "l"
+                elif entry.is_dir():
+                    kind = "d"
+                else:
+                    kind = "f"
+                if self.ignore and (entry.name == ".git" or chain.ignored(entry.path, entry.name, kind == "d")):
+                    continue
+                if self.filters.matches(entry, kind):
+                    matches.append(entry.path)
+                if kind == "d" and descend:
+                    subdirectories.append((entry.path, depth + 1, chain))
+            except OSError as e:
+                errors.append((entry.path, e.strerror))
+        return matches, errors, subdirectories
+
+    def _task(self, pool, directory, depth, chain):
+        try:
+            matches, errors, subdirectories = self.scan(directory, depth, chain)
+        except Exception as e:
+            matches, errors, subdirectories = [], [(directory, str(e))], []
+        if self.stop.is_set():
+            subdirectories = []
+        # Counted before they are queued: a subdirectory's own message must never reach
+        # the caller ahead of the one announcing it, or the walk would look finished.
+        self.results.put((matches, errors, len(subdirectories)))
+        for item in subdirectories:
+            try:
+                pool.submit(self._task, pool, *item)
+            except RuntimeError:
+                # Shut down after -n was reached.
+                return
+
+    def walk(self, roots):
+        # Yields ("match", path) and ("error", (path, message)) in the order found.
+        starts = []
+        for root in roots:
+            if not os.path.isdir(root) or os.path.islink(root):
+                if not os.path.lexists(root):
+                    yield "error", (root, "No such file or directory")
+                else:
+                    yield "match", root
+                continue
+            chain = repository_chain(root) if self.ignore else IgnoreChain()
+            if self.filters.matches(_RootEntry(root), "d"):
+                yield "match", root
+            if self.maxdepth != 0:
+                starts.append((root, 1, chain))
+        if self.jobs == 1:
+            yield from self._walk_serial(starts)
+            return
+        pool = ThreadPoolExecutor(max_workers=self.jobs, thread_name_prefix="vterm-find")
+        pending = len(starts)
+        try:
+            for item in starts:
+                pool.submit(self._task, pool, *item)
+            while pending:
+                jobs.check_stop()
+                matches, errors, spawned = self.results.get()
+                pending += spawned - 1
+                for error in errors:
+                    yield "error", error
+                for path in matches:
+                    yield "match", path
+        finally:
+            self.stop.set()
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def _walk_serial(self, starts):
+        stack = list(reversed(starts))
+        while stack:
+            jobs.check_stop()
+            matches, errors, subdirectories = self.scan(*stack.pop())
+            for error in errors:
+                yield "error", error
+            for path in matches:
+                yield "match", path
+            stack.extend(reversed(subdirectories))
+
+class _RootEntry:
+    # The starting directory goes through the same filters as the entries below it.
+    def __init__(self, path):
+        self.path = path
+        self.name = os.path.basename(os.path.normpath(path)) or path
+
+    def stat(self, follow_symlinks=True):
+        return os.stat(self.path, follow_symlinks=follow_symlinks)
+
+#Command
+def command(args):
+    options = parser.parse_args(args)
+    if options.jobs < 1:
+        raise UsageError("-j needs at least one worker")
+    if options.limit is not None and options.limit < 1:
+        raise UsageError("-n needs a positive count")
+    if options.maxdepth is not None and options.maxdepth < 0:
+        raise UsageError("-maxdepth must not be negative")
+    filters = Filters(options)
+    finder = ParallelFinder(filters, options.jobs, options.maxdepth, options.ignore)
+    out = sys.stdout
+    found = 0
+    failed = False
+    results = finder.walk(options.paths or ["."])
+    try:
+        for kind, value in results:
+            if kind == "error":
+                path, message = value
+                out.write(f"find: '{path}': {message}\n")
+                failed = True
+                continue
+            out.write(value + "\n")
+            found += 1
+            if options.limit is not None and found >= options.limit:
+                break
+            if finder.results.empty():
+                # Nothing else is ready yet: show what has been found so far.
+                out.flush()
+    finally:
+        results.close()
+    out.flush()
+    return 1 if failed else 0
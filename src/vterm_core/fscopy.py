@@ -0,0 +1,175 @@
+#Imports
+import errno
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from vterm_core import jobs
+from vterm_core.arguments import CommandParser, UsageError
+from vterm_core.progress import Progress, format_duration, format_size
+
+DEFAULT_JOBS = min(32, (os.cpu_count() or 1) * 4)
+# Errors that mean "copy_file_range can't do this pair of files", not "the copy failed".
+_FALLBACK_ERRNOS = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EBADF, getattr(errno, "EOPNOTSUPP", errno.EINVAL)}
+
+parser = CommandParser("copy")
+parser.add_argument("-j", dest="jobs", type=int, default=DEFAULT_JOBS)
+parser.add_argument("--no-skip", dest="skip_unchanged", action="store_false")
+parser.add_argument("-q", dest="quiet", action="store_true")
+parser.add_argument("source")
+parser.add_argument("destination")
+
+#Copying
+def unchanged(source_stat, destination):
+    # Same size and mtime (to the second) as a previous copy: nothing to do.
+    try:
+        target = os.stat(destination)
+    except OSError:
+        return False
+    return (target.st_size == source_stat.st_size
+            and int(target.st_mtime) == int(source_stat.st_mtime))
+
+def _copy_file_range(source, destination, size):
+    with open(source, "rb") as fsrc, open(destination, "wb") as fdst:
+        copied = 0
+        while copied < size:
+            sent = os.copy_file_range(fsrc.fileno(), fdst.fileno(), size - copied)
+            if sent == 0:
+                break
+            copied += sent
+
+def copy_file(source, destination, size):
+    # copy_file_range keeps the data in the kernel (and lets CoW filesystems share blocks);
+    # shutil.copyfile falls back to sendfile on Linux and fcopyfile on macOS.
+    if hasattr(os, "copy_file_range") and size:
+        try:
+            _copy_file_range(source, destination, size)
+            shutil.copystat(source, destination)
+            return
+        except OSError as e:
+            if e.errno not in _FALLBACK_ERRNOS:
+                raise
+    shutil.copyfile(source, destination)
+    # The source mtime is what lets a later run recognise the file as unchanged.
+    shutil.copystat(source, destination)
+
+def _copy_symlink(source, destination):
+    target = os.readlink(source)
+    if os.path.lexists(destination):
+        if os.path.islink(destination) and os.readlink(destination) == target:
+            return False
+        os.remove(destination)
+    os.symlink(target, destination)
+    return True
+
+class TreeCopier:
+    def __init__(self, jobs=DEFAULT_JOBS, skip_unchanged=True, progress=None):
+        self.jobs = jobs
+        self.skip_unchanged = skip_unchanged
+        self.progress = progress or Progress("Copying", enabled=False)
+        self.errors = []
+        self.errors_lock = threading.Lock()
+        # Caps queued work so a tree with millions of files doesn't sit in memory as futures.
+        self.slots = threading.BoundedSemaphore(jobs * 16)
+
+    def _fail(self, path, error):
+        with self.errors_lock:
+            self.errors.append((path, error))
+        self.progress.add(files=0, errors=1)
+
+    def _copy_one(self, source, destination, source_stat):
+        try:
+            if jobs.stop_requested():
+                return
+            if self.skip_unchanged and unchanged(source_stat, destination):
+                self.progress.add(files=0, skipped=1)
+                return
+            copy_file(source, destination, source_stat.st_size)
+            self.progress.add(nbytes=source_stat.st_size)
+        except OSError as e:
+            self._fail(source, e)
+        finally:
+            self.slots.release()
+
+    def _submit(self, pool, source, destination, source_stat):
+        jobs.check_stop()
+        self.slots.acquire()
+        pool.submit(self._copy_one, source, destination, source_stat)
+
+    def copy(self, source, destination):
+        if not os.path.isdir(source):
+            if os.path.isdir(destination):
+                destination = os.path.join(destination, os.path.basename(source))
+            os.makedirs(os.path.dirname(os.path.abspath(destination)), exist_ok=True)
+            self.slots.acquire()
+            self._copy_one(source, destination, os.stat(source))
+            return self.errors
+        directories = []
+        with ThreadPoolExecutor(max_workers=self.jobs, thread_name_prefix="vterm-copy",
+                                initializer=jobs.inherit_stop()) as pool:
+            stack = [(source, destination)]
+            while stack:
+                jobs.check_stop()
+                source_dir, destination_dir = stack.pop()
+                try:
+                    os.makedirs(destination_dir, exist_ok=True)
+                    directories.append((source_dir, destination_dir))
+                    with os.scandir(source_dir) as entries:
+                        for entry in entries:
+                            target = os.path.join(destination_dir, entry.name)
+                            try:
+                                if entry.is_symlink():
+                                    if _copy_symlink(entry.path, target):
+                                        self.progress.add()
+                                elif entry.is_dir():
+                                    stack.append((entry.path, target))
+                                else:
+                                    # DirEntry caches stat data from the directory read on most platforms.
+                                    self._submit(pool, entry.path, target, entry.stat())
+                            except OSError as e:
+                                self._fail(entry.path, e)
+                except OSError as e:
+                    self._fail(source_dir, e)
+        # Directory times last, once nothing else is going to touch them.
+        for source_dir, destination_dir in reversed(directories):
+            try:
+                shutil.copystat(source_dir, destination_dir)
+            except OSError:
+                pass
+        return self.errors
+
+def copy_tree(source, destination, jobs=DEFAULT_JOBS, skip_unchanged=True, progress=None):
+    return TreeCopier(jobs, skip_unchanged, progress).copy(source, destination)
+
+#Command
+def command(args):
+    options = parser.parse_args(args)
+    if options.jobs < 1:
+        raise UsageError("-j needs at least one worker")
+    source, destination = options.source, options.destination
+    if not os.path.exists(source):
+        print(f"Error copying directory: source not found: {source}")
+        return 1
+    if os.path.isdir(source) and os.path.abspath(destination).startswith(os.path.join(os.path.abspath(source), "")):
+        print("Error copying directory: cannot copy a directory into itself")
+        return 1
+    progress = Progress("Copying", enabled=None if not options.quiet else False).start()
+    try:
+        errors = copy_tree(source, destination, options.jobs, options.skip_unchanged, progress)
+    finally:
+        progress.stop()
+    elapsed = progress.elapsed()
+    summary = (f"{progress.files} files, {format_size(progress.bytes)} in {format_duration(elapsed)}"
+               f" ({format_size(progress.bytes / max(elapsed, 1e-9))}/s)")
+    if progress.skipped:
+        summary += f", {progress.skipped} unchanged files skipped"
+    for path, error in errors[:10]:
+        print(f"Error copying {path}: {error.strerror or str(error)}")
+    if len(errors) > 10:
+        print(f"... and {len(errors) - 10} more errors")
+    if errors:
+        print(f"Copy finished with {len(errors)} errors: {summary}")
+        return 1
+    kind = "Directory" if os.path.isdir(source) else "File"
+    print(f"{kind} copied from {source} to {destination}: {summary}")
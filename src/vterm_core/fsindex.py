@@ -0,0 +1,584 @@
+#Imports
+import glob
+import hashlib
+import mmap
+import os
+import re
+import struct
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_right
+
+from vterm_core import jobs
+from vterm_core.arguments import CommandParser, UsageError
+from vterm_core.config import state_dir
+from vterm_core.progress import format_size
+from vterm_core.pyrepl import format_time
+
+MAGIC = b"VTIX"
+VERSION = 1
+# magic, version, byte order, directories, entries, name table size, root size, padding, build time
+HEADER = struct.Struct("<4sHHIIQIId")
+BYTE_ORDER = 1 if sys.byteorder == "little" else 2
+# Listed in the index, but not descended into.
+PRUNE = {b".git", b".hg", b".svn"}
+# entry -> directory number, or one of these.
+FILE = -1
+UNINDEXED = -2
+# A directory modified this close to the scan may change again within the same mtime
+# tick: its mtime is not recorded, so the next refresh reads it again.
+MTIME_SLACK = 2 * 10 ** 9
+REFRESH_AGE = float(os.environ.get("VTERM_INDEX_AGE") or 3600)
+GLOB_CHARS = re.compile(r"[*?[]")
+# One UTF-8 character of a name, never the "/" between names.
+_CHAR = rb"(?:[^/\x80-\xff]|[\xc0-\xff][\x80-\xbf]*)"
+_FOLD = os.name == "nt"
+
+locate_parser = CommandParser("locate")
+locate_parser.add_argument("pattern", nargs="?")
+locate_parser.add_argument("-i", dest="ignore_case", action="store_true")
+locate_parser.add_argument("-b", dest="basename", action="store_true")
+locate_parser.add_argument("-c", dest="count", action="store_true")
+locate_parser.add_argument("-e", dest="existing", action="store_true")
+locate_parser.add_argument("-n", dest="limit", type=int)
+locate_parser.add_argument("-S", dest="statistics", action="store_true")
+
+updatedb_parser = CommandParser("updatedb")
+updatedb_parser.add_argument("roots", nargs="*")
+updatedb_parser.add_argument("--remove", action="store_true")
+
+#Queries
+def glob_regex(pattern):
+    # A glob as a bytes regex over "/"-separated names: "*" and "?" stay inside one
+    # name, "**/" spans directories.
+    parts = []
+    for token in re.split(r"(\*\*/?|\*|\?|\[!?\]?[^\]]*\])", pattern):
+        if not token:
+            continue
+        if token.startswith("**"):
+            parts.append(rb"(?:.*/)?" if token.endswith("/") else rb".*")
+        elif token == "*":
+            parts.append(rb"[^/]*")
+        elif token == "?":
+            parts.append(_CHAR)
+        elif token.startswith("["):
+            body = token[1:-1].replace("\\", "\\\\")
+            if body.startswith("!"):
+                body = "^" + body[1:]
+            parts.append(b"[" + os.fsencode(body) + b"]")
+        else:
+            parts.append(re.escape(os.fsencode(token)))
+    return b"".join(parts)
+
+def _inside(path, root):
+    return path.startswith(root.rstrip(os.sep) + os.sep)
+
+def _slashes(path):
+    return path if os.sep == "/" else path.replace(os.sep, "/")
+
+class Query:
+    # `names` finds candidate entries in the name table; the rest decides which of
+    # them (and, for text, which subtrees below them) match.
+    def __init__(self, pattern, ignore_case=False, basename=False):
+        flags = re.IGNORECASE if ignore_case else 0
+        self.ignore_case = ignore_case
+        self.text = None
+        self.path = None
+        slash = "/" in pattern
+        last = pattern.rpartition("/")[2]
+        if GLOB_CHARS.search(pattern):
+            # A glob matches a whole name; with a "/" it matches the last components of the path.
+            self.names = re.compile(rb"(?<=/)" + glob_regex(last) + rb"(?=/)", flags)
+            if slash and not basename:
+                anchor = rb"\A/" if pattern.startswith("/") else rb"(?:\A|/)"
+                self.path = re.compile(anchor + glob_regex(pattern.lstrip("/")) + rb"\Z", flags)
+        elif basename:
+            self.names = re.compile(re.escape(os.fsencode(pattern)), flags)
+        else:
+            # Text anywhere in the path, as locate does. The shallowest name the text ends
+            # in is a candidate and the whole subtree below it matches; with a "/" in the
+            # text that name starts with the part after the last "/".
+            self.text = pattern.lower() if ignore_case else pattern
+            if slash:
+                self.names = re.compile(rb"(?<=/)" + re.escape(os.fsencode(last)), flags)
+            else:
+                self.names = re.compile(re.escape(os.fsencode(pattern)), flags)
+
+    def contains(self, path):
+        path = _slashes(path)
+        return self.text in (path.lower() if self.ignore_case else path)
+
+#Index files
+def _padding(size):
+    return -size % 8
+
+class IndexFile:
+    # A built index, memory-mapped. Directories are numbered in pre-order and their
+    # entries stored in that order, so a subtree is one run of entries (and one run
+    # of the name table): dirs[d] to ends[d], entries firsts[d] to firsts[ends[d]].
+    # Names are stored as "/name1/name2/.../", so one regex pass over the mapping
+    # answers a query, and offsets[i] points at entry i's name.
+    def __init__(self, path):
+        self.path = path
+        self.paths = {}
+        self.views = []
+        with open(path, "rb") as file:
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._parse()
+        except (ValueError, TypeError, struct.error):
+            self.close()
+            raise ValueError(f"{path} is not a usable index")
+
+    def _parse(self):
+        magic, version, order, directories, entries, names, root, _, built = HEADER.unpack_from(self.map)
+        if magic != MAGIC or version != VERSION or order != BYTE_ORDER:
+            raise ValueError("unknown index format")
+        view = memoryview(self.map)
+        self.views.append(view)
+        position = HEADER.size
+        self.root = os.fsdecode(bytes(view[position:position + root]))
+        position += root + _padding(root)
+        sections = []
+        for code, count in (("I", entries + 1), ("i", entries), ("i", directories), ("i", directories),
+                            ("I", directories + 1), ("I", directories), ("q", directories)):
+            size = count * array(code).itemsize
+            section = view[position:position + size].cast(code)
+            self.views.append(section)
+            sections.append(section)
+            position += size + _padding(size)
+        if position + names != len(self.map):
+            raise ValueError("truncated index")
+        self.offsets, self.children, self.parents, self.dir_entries, self.firsts, self.ends, self.mtimes = sections
+        self.base = position
+        self.count = entries
+        self.directories = directories
+        self.built = built
+        self.size = len(self.map)
+
+    def close(self):
+        for view in reversed(self.views):
+            view.release()
+        self.views = []
+        self.map.close()
+
+    #Entries
+    def name_bytes(self, i):
+        return self.map[self.base + self.offsets[i]:self.base + self.offsets[i + 1] - 1]
+
+    def directory_of(self, i):
+        return bisect_right(self.firsts, i) - 1
+
+    def directory_path(self, d):
+        path = self.paths.get(d)
+        if path is None:
+            if d == 0:
+                path = self.root
+            else:
+                name = os.fsdecode(self.name_bytes(self.dir_entries[d]))
+                path = os.path.join(self.directory_path(self.parents[d]), name)
+            self.paths[d] = path
+        return path
+
+    def entry_path(self, i):
+        return os.path.join(self.directory_path(self.directory_of(i)), os.fsdecode(self.name_bytes(i)))
+
+    def is_dir(self, i):
+        return self.children[i] != FILE
+
+    def directory_table(self):
+        return {self.directory_path(d): d for d in range(self.directories)}
+
+    def find_directory(self, path):
+        # The number of the directory at `path`, by binary search through each level's sorted names.
+        relative = os.path.relpath(path, self.root)
+        if relative == os.curdir:
+            return 0
+        if relative == os.pardir or relative.startswith(os.pardir + os.sep):
+            return None
+        d = 0
+        for part in relative.split(os.sep):
+            name = os.fsencode(part)
+            low, high = self.firsts[d], self.firsts[d + 1]
+            while low < high:
+                middle = (low + high) // 2
+                if self.name_bytes(middle) < name:
+                    low = middle + 1
+                else:
+                    high = middle
+            if low == self.firsts[d + 1] or self.name_bytes(low) != name or self.children[low] < 0:
+                return None
+            d = self.children[low]
+        return d
+
+    def subtree(self, d):
+        return self.firsts[d], self.firsts[self.ends[d]]
+
+    #Search
+    def matching(self, regex, start=0, end=None):
+        # Entries from start to end whose name contains a match, each once, in order.
+        end = self.count if end is None else end
+        offsets, base = self.offsets, self.base
+        position, limit = base + offsets[start], base + offsets[end]
+        while True:
+            match = regex.search(self.map, position, limit)
+            if match is None:
+                return
+            i = bisect_right(offsets, match.start() - base) - 1
+            if i >= end:
+                return
+            if match.end() - base >= offsets[i + 1]:
+                # Ran across the "/" into the next name.
+                position = match.start() + 1
+                continue
+            yield i
+            position = base + offsets[i + 1]
+
+    def search(self, query, start=0, end=None):
+        end = self.count if end is None else end
+        if query.text is not None and query.contains(self.root):
+            yield from range(start, end)
+            return
+        outside = {}
+        for i in self.matching(query.names, start, end):
+            if query.text is not None:
+                d = self.directory_of(i)
+                above = outside.get(d)
+                if above is None:
+                    above = outside[d] = query.contains(self.directory_path(d))
+                # Already matched, with its subtree, at a directory further up.
+                if above or not query.contains(self.entry_path(i)):
+                    continue
+                yield i
+                child = self.children[i]
+                if child >= 0:
+                    yield from range(*self.subtree(child))
+            elif query.path is None or query.path.search(os.fsencode(_slashes(self.entry_path(i)))):
+                yield i
+
+#Building
+def scan_directory(path):
+    listing = []
+    with os.scandir(path) as entries:
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                is_dir = False
+            listing.append((os.fsencode(entry.name), is_dir))
+    listing.sort()
+    return listing
+
+def _copy_entries(previous, d, names, offsets, children):
+    # An unchanged directory: its run of the name table is copied in one piece and its
+    # offsets shifted. Returns the new numbers of the entries that are directories.
+    start, end = previous.firsts[d], previous.firsts[d + 1]
+    low, high = previous.offsets[start], previous.offsets[end]
+    shift = len(names) - low
+    first = len(children)
+    names += previous.map[previous.base + low:previous.base + high]
+    offsets.extend([offset + shift for offset in previous.offsets[start:end]])
+    old = previous.children[start:end]
+    children.extend([FILE if child == FILE else UNINDEXED for child in old])
+    return [first + k for k, child in enumerate(old) if child != FILE]
+
+def build_index(root, target, previous=None):
+    # Walks `root` and writes its index to `target`. With the previous index of the
+    # same root, a directory whose mtime has not changed is copied from it instead
+    # of being read again: one stat per directory rather than a full listing.
+    started = time.perf_counter()
+    trusted = time.time_ns() - MTIME_SLACK
+    known = previous.directory_table() if previous is not None and previous.root == root else {}
+    names = bytearray(b"/")
+    offsets, children = array("I"), array("i")
+    parents, dir_entries, firsts, mtimes = array("i"), array("i"), array("I"), array("q")
+    rescanned = 0
+    stack = [(root, -1, -1)]
+    while stack:
+        jobs.check_stop()
+        path, parent, entry = stack.pop()
+        d = len(parents)
+        parents.append(parent)
+        dir_entries.append(entry)
+        firsts.append(len(offsets))
+        if entry >= 0:
+            children[entry] = d
+        try:
+            mtime = os.stat(path).st_mtime_ns
+            old = known.get(path)
+            if old is not None and mtime and previous.mtimes[old] == mtime:
+                listing = None
+            else:
+                listing = scan_directory(path)
+                rescanned += 1
+        except OSError:
+            mtime, listing = 0, []
+        mtimes.append(0 if mtime > trusted else mtime)
+        if listing is None:
+            directories = _copy_entries(previous, old, names, offsets, children)
+        else:
+            directories = []
+            for name, is_dir in listing:
+                if is_dir:
+                    directories.append(len(children))
+                offsets.append(len(names))
+                names += name
+                names += b"/"
+                children.append(UNINDEXED if is_dir else FILE)
+        subdirectories = []
+        for i in directories:
+            end = offsets[i + 1] if i + 1 < len(offsets) else len(names)
+            name = bytes(names[offsets[i]:end - 1])
+            if name not in PRUNE:
+                subdirectories.append((os.path.join(path, os.fsdecode(name)), d, i))
+        stack.extend(reversed(subdirectories))
+    offsets.append(len(names))
+    firsts.append(len(children))
+    ends = array("I", range(1, len(parents) + 1))
+    for d in range(len(parents) - 1, 0, -1):
+        if ends[d] > ends[parents[d]]:
+            ends[parents[d]] = ends[d]
+    encoded_root = os.fsencode(root)
+    with open(target, "wb") as out:
+        out.write(HEADER.pack(MAGIC, VERSION, BYTE_ORDER, len(parents), len(children), len(names),
+                              len(encoded_root), 0, time.time()))
+        for section in (encoded_root, offsets, children, parents, dir_entries, firsts, ends, mtimes):
+            data = section if isinstance(section, bytes) else section.tobytes()
+            out.write(data + bytes(_padding(len(data))))
+        out.write(names)
+    return {"entries": len(children), "directories": len(parents), "rescanned": rescanned,
+            "seconds": time.perf_counter() - started}
+
+#Index set
+class IndexSet:
+    # The indexes in ~/.vterm/index, one file per root. Each is mapped on first use and
+    # mapped again when a refresh (here or in another session) replaces the file.
+    # Queries and replacing a file hold the lock, so a background refresh never unmaps
+    # an index that is being read.
+    def __init__(self, directory=None):
+        self.directory = directory
+        self.loaded = {}
+        self.lock = threading.RLock()
+        self.refreshing = None
+
+    def index_directory(self):
+        path = self.directory or os.path.join(state_dir(), "index")
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def file_for(self, root):
+        digest = hashlib.sha1(os.fsencode(root)).hexdigest()[:16]
+        return os.path.join(self.index_directory(), f"{digest}.idx")
+
+    def load(self, path):
+        with self.lock:
+            try:
+                stamp = os.stat(path).st_mtime_ns
+            except OSError:
+                stamp = None
+            cached = self.loaded.get(path)
+            if cached is not None:
+                if cached[0] == stamp:
+                    return cached[1]
+                del self.loaded[path]
+                cached[1].close()
+            if stamp is None:
+                return None
+            try:
+                index = IndexFile(path)
+            except (OSError, ValueError):
+                return None
+            self.loaded[path] = (stamp, index)
+            return index
+
+    def indexes(self):
+        found = (self.load(path) for path in sorted(glob.glob(os.path.join(self.index_directory(), "*.idx"))))
+        return [index for index in found if index is not None]
+
+    def covering(self, path):
+        # The index whose root holds `path`.
+        path = os.path.abspath(path)
+        for index in self.indexes():
+            if path == index.root or _inside(path, index.root):
+                return index
+        return None
+
+    def update(self, root):
+        root = os.path.abspath(root)
+        target = self.file_for(root)
+        temp = f"{target}.{os.getpid()}.tmp"
+        # A mapping of its own: the shared one may be swapped out by a query meanwhile.
+        try:
+            previous = IndexFile(target)
+        except (OSError, ValueError):
+            previous = None
+        try:
+            try:
+                stats = build_index(root, temp, previous)
+            finally:
+                if previous is not None:
+                    previous.close()
+            with self.lock:
+                cached = self.loaded.pop(target, None)
+                if cached is not None:
+                    # Windows will not replace a file that is still mapped.
+                    cached[1].close()
+                os.replace(temp, target)
+        finally:
+            if os.path.exists(temp):
+                os.remove(temp)
+        return stats
+
+    def remove(self, root):
+        target = self.file_for(os.path.abspath(root))
+        with self.lock:
+            cached = self.loaded.pop(target, None)
+            if cached is not None:
+                cached[1].close()
+            os.remove(target)
+
+    def stale_roots(self, max_age=REFRESH_AGE):
+        now = time.time()
+        return [index.root for index in self.indexes() if now - index.built >= max_age]
+
+    def refresh_in_background(self, max_age=REFRESH_AGE):
+        # Brings indexes older than max_age up to date without holding up the prompt.
+        if self.refreshing is not None and self.refreshing.is_alive():
+            return
+        try:
+            roots = self.stale_roots(max_age)
+        except OSError:
+            return
+        if not roots:
+            return
+
+        def refresh():
+            for root in roots:
+                try:
+                    self.update(root)
+                except (OSError, OverflowError):
+                    pass
+
+        self.refreshing = threading.Thread(target=refresh, name="vterm-index", daemon=True)
+        self.refreshing.start()
+
+    #Completion
+    def complete(self, directory, prefix, directories_only=False, limit=None):
+        # Paths below `directory`, at any depth, whose name starts with `prefix`.
+        directory = os.path.abspath(directory)
+        regex = re.compile(rb"(?<=/)" + re.escape(os.fsencode(prefix)), re.IGNORECASE if _FOLD else 0)
+        hidden = prefix.startswith(".")
+        results = []
+        with self.lock:
+            index = self.covering(directory)
+            d = index.find_directory(directory) if index is not None else None
+            if d is None:
+                return results
+            for i in index.matching(regex, *index.subtree(d)):
+                if directories_only and not index.is_dir(i):
+                    continue
+                path = index.entry_path(i)
+                relative = os.path.relpath(path, directory)
+                if not hidden and any(part.startswith(".") for part in relative.split(os.sep)):
+                    continue
+                if not os.path.lexists(path):
+                    continue
+                results.append(relative + os.sep if index.is_dir(i) else relative)
+                if len(results) == limit:
+                    break
+        return results
+
+indexes = IndexSet()
+
+#Commands
+def _statistics():
+    found = indexes.indexes()
+    if not found:
+        print("No indexes yet: 'updatedb DIR' indexes DIR.")
+        return 1
+    for index in found:
+        updated = time.strftime("%Y-%m-%d %H:%M", time.localtime(index.built))
+        print(f"{index.root}: {index.count} entries in {index.directories} directories, "
+              f"{format_size(index.size)}, updated {updated}")
+    return 0
+
+def locate_command(args):
+    options = locate_parser.parse_args(args)
+    if options.statistics:
+        return _statistics()
+    if not options.pattern:
+        raise UsageError("give a pattern to look for")
+    if options.limit is not None and options.limit < 1:
+        raise UsageError("-n needs a positive count")
+    query = Query(options.pattern, options.ignore_case, options.basename)
+    out = sys.stdout
+    found = 0
+    with indexes.lock:
+        searched = indexes.indexes()
+        if not searched:
+            print("No indexes yet: 'updatedb DIR' indexes DIR.")
+            return 1
+        for index in searched:
+            jobs.check_stop()
+            for i in index.search(query):
+                path = index.entry_path(i)
+                if options.existing and not os.path.lexists(path):
+                    continue
+                found += 1
+                if not options.count:
+                    out.write(path + "\n")
+                if found == options.limit:
+                    break
+            if found == options.limit:
+                break
+    if options.count:
+        print(found)
+    return 0 if found else 1
+
+def updatedb_command(args):
+    options = updatedb_parser.parse_args(args)
+    roots = [os.path.abspath(os.path.expanduser(root)) for root in options.roots]
+    if options.remove:
+        if not roots:
+            raise UsageError("give the roots to stop indexing")
+        status = 0
+        for root in roots:
+            try:
+                indexes.remove(root)
+                print(f"Removed the index of {root}")
+            except OSError:
+                print(f"updatedb: {root} is not indexed")
+                status = 1
+        return status
+    existing = [index.root for index in indexes.indexes()]
+    if not roots:
+        roots = existing
+        if not roots:
+            print("No indexes yet: 'updatedb DIR' indexes DIR.")
+            return 1
+    status = 0
+    for root in roots:
+        if not os.path.isdir(root):
+            print(f"updatedb: {root}: not a directory")
+            status = 1
+            continue
+        outer = next((other for other in existing if _inside(root, other)), None)
+        if outer is not None:
+            print(f"updatedb: {root} is already indexed as part of {outer}")
+            continue
+        try:
+            stats = indexes.update(root)
+        except (OSError, OverflowError) as e:
+            print(f"updatedb: {root}: {getattr(e, 'strerror', None) or e}")
+            status = 1
+            continue
+        print(f"Indexed {root}: {stats['entries']} entries in {stats['directories']} directories "
+              f"({stats['rescanned']} read) in {format_time(stats['seconds'])}")
+        # A new root replaces the indexes of the directories inside it.
+        for inner in existing:
+            if _inside(inner, root):
+                indexes.remove(inner)
+                print(f"Removed the index of {inner} (now part of {root})")
+    return status
@@ -0,0 +1,252 @@
+#Imports
+import mmap
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from vterm_core.arguments import CommandParser, UsageError
+from vterm_core.jobs import check_stop, stop_requested
+
+# Files at least this big are split into line-aligned chunks searched by worker processes.
+PARALLEL_THRESHOLD = 64 * 1024 * 1024
+PARALLEL_CHUNK = 16 * 1024 * 1024
+BINARY_SNIFF = 8192
+WRITE_BATCH = 64 * 1024
+
+parser = CommandParser("grep")
+parser.add_argument("-i", dest="ignore_case", action="store_true")
+parser.add_argument("-v", dest="invert", action="store_true")
+parser.add_argument("-n", dest="line_numbers", action="store_true")
+parser.add_argument("-c", dest="count", action="store_true")
+parser.add_argument("-l", dest="files_with_matches", action="store_true")
+parser.add_argument("-r", "-R", dest="recursive", action="store_true")
+parser.add_argument("-F", dest="fixed", action="store_true")
+parser.add_argument("-j", dest="jobs", type=int, default=os.cpu_count() or 1)
+parser.add_argument("pattern")
+parser.add_argument("paths", nargs="*")
+
+#Matching
+def compile_pattern(pattern, ignore_case=False, fixed=False):
+    if isinstance(pattern, str):
+        pattern = pattern.encode("utf-8", "surrogateescape")
+    if fixed:
+        pattern = re.escape(pattern)
+    flags = re.MULTILINE | (re.IGNORECASE if ignore_case else 0)
+    return re.compile(pattern, flags)
+
+def search_lines(regex, lines, invert=False):
+    for number, line in enumerate(lines, 1):
+        line = line.rstrip(b"\r\n")
+        if (regex.search(line) is None) == invert:
+            yield number, line
+
+def search_mapped(regex, data, start, end, invert=False):
+    # Scans a buffer (usually an mmap) in place: the regex engine jumps from match to
+    # match and only the matching lines are ever copied out.
+    if invert:
+        yield from _search_mapped_inverted(regex, data, start, end)
+        return
+    number = 1
+    counted = start
+    pos = start
+    while pos < end:
+        match = regex.search(data, pos, end)
+        if match is None:
+            break
+        if match.start() == end and data[end - 1:end] == b"\n":
+            # An empty match after the final newline: there is no line there.
+            break
+        newline = data.rfind(b"\n", start, match.start())
+        line_start = start if newline < 0 else newline + 1
+        line_end = data.find(b"\n", match.start(), end)
+        if line_end < 0:
+            line_end = end
+        number += data[counted:line_start].count(b"\n")
+        counted = line_start
+        line = data[line_start:line_end].rstrip(b"\r")
+        pos = line_end + 1
+        # \s, \W or [^x] can run on past the newline: then only a match inside the line counts.
+        if match.end() > line_end and regex.search(line) is None:
+            continue
+        yield number, line
+
+def _search_mapped_inverted(regex, data, start, end):
+    number = 0
+    pos = start
+    while pos < end:
+        line_end = data.find(b"\n", pos, end)
+        if line_end < 0:
+            line_end = end
+        number += 1
+        line = data[pos:line_end].rstrip(b"\r")
+        if regex.search(line) is None:
+            yield number, line
+        pos = line_end + 1
+
+def _chunk_bounds(data, size, chunk_size):
+    bounds = []
+    start = 0
+    while start < size:
+        end = min(start + chunk_size, size)
+        if end < size:
+            newline = data.find(b"\n", end)
+            end = size if newline < 0 else newline + 1
+        bounds.append((start, end))
+        start = end
+    return bounds
+
+def _scan_chunk(path, pattern, flags, start, end, invert):
+    regex = re.compile(pattern, flags)
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        matches = list(search_mapped(regex, data, start, end, invert))
+        lines = data[start:end].count(b"\n")
+    return matches, lines
+
+def _search_parallel(path, regex, data, size, invert, jobs):
+    bounds = _chunk_bounds(data, size, PARALLEL_CHUNK)
+    with ProcessPoolExecutor(max_workers=min(jobs, len(bounds))) as pool:
+        futures = [pool.submit(_scan_chunk, path, regex.pattern, regex.flags, start, end, invert)
+                   for start, end in bounds]
+        offset = 0
+        for future in futures:
+            if stop_requested():
+                for pending in futures:
+                    pending.cancel()
+                check_stop()
+            matches, lines = future.result()
+            for number, line in matches:
+                yield offset + number, line
+            offset += lines
+
+def search_file(path, regex, invert=False, jobs=1):
+    with open(path, "rb") as file:
+        size = os.fstat(file.fileno()).st_size
+        if size == 0:
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if jobs > 1 and size >= PARALLEL_THRESHOLD:
+                yield from _search_parallel(path, regex, data, size, invert, jobs)
+            else:
+                yield from search_mapped(regex, data, 0, size, invert)
+
+def is_binary(path):
+    with open(path, "rb") as file:
+        return b"\0" in file.read(BINARY_SNIFF)
+
+def iter_files(paths, recursive=False):
+    # Yields (path, error) pairs; directories are expanded with os.scandir when recursive.
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path, None
+            continue
+        if not recursive:
+            yield path, "Is a directory"
+            continue
+        stack = [path]
+        while stack:
+            directory = stack.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    entries = sorted(entries, key=lambda entry: entry.name)
+            except OSError as e:
+                yield directory, e.strerror
+                continue
+            subdirectories = []
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirectories.append(entry.path)
+                elif entry.is_file():
+                    yield entry.path, None
+            stack.extend(reversed(subdirectories))
+
+#Command
+def _output():
+    sys.stdout.flush()
+    return getattr(sys.stdout, "buffer", None)
+
+def _write(batch, out):
+    data = b"".join(batch)
+    if out is not None:
+        out.write(data)
+    else:
+        sys.stdout.write(data.decode(errors="replace"))
+    batch.clear()
+
+def command(args, stdin=None):
+    options = parser.parse_args(args)
+    if options.jobs < 1:
+        raise UsageError("-j needs at least one worker")
+    try:
+        regex = compile_pattern(options.pattern, options.ignore_case, options.fixed)
+    except re.error as e:
+        print(f"grep: invalid pattern: {str(e)}")
+        return 2
+    if not options.paths and stdin is None:
+        if sys.stdin is None or sys.stdin.isatty():
+            raise UsageError("give a file, a directory with -r, or pipe input into grep")
+        stdin = sys.stdin.buffer
+
+    out = _output()
+    batch = []
+    size = 0
+    found = False
+    failed = False
+    show_names = options.recursive or len(options.paths) > 1
+
+    if options.paths:
+        sources = iter_files(options.paths, options.recursive)
+    else:
+        sources = [("(standard input)", None)]
+    for name, error in sources:
+        check_stop()
+        if error is not None:
+            print(f"grep: {name}: {error}")
+            failed = True
+            continue
+        try:
+            if stdin is not None and not options.paths:
+                matches = search_lines(regex, stdin, options.invert)
+            elif is_binary(name):
+                if next(search_file(name, regex, options.invert), None) is not None:
+                    _write(batch, out)
+                    print(f"Binary file {name} matches")
+                    found = True
+                continue
+            else:
+                matches = search_file(name, regex, options.invert, options.jobs)
+            count = 0
+            prefix = os.fsencode(name) + b":" if show_names else b""
+            for number, line in matches:
+                count += 1
+                if options.files_with_matches:
+                    break
+                if options.count:
+                    continue
+                if options.line_numbers:
+                    line = b"%s%d:%s\n" % (prefix, number, line)
+                else:
+                    line = prefix + line + b"\n"
+                batch.append(line)
+                size += len(line)
+                if size >= WRITE_BATCH:
+                    check_stop()
+                    _write(batch, out)
+                    size = 0
+        except OSError as e:
+            _write(batch, out)
+            print(f"grep: {name}: {e.strerror}")
+            failed = True
+            continue
+        if count:
+            found = True
+        if options.files_with_matches and count:
+            batch.append(os.fsencode(name) + b"\n")
+        elif options.count:
+            batch.append(prefix + b"%d\n" % count)
+    _write(batch, out)
+    if out is not None:
+        out.flush()
+    if failed:
+        return 2
+    return 0 if found else 1
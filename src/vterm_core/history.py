@@ -0,0 +1,302 @@
+#Imports
+import os
+import threading
+from array import array
+from bisect import bisect_right
+from contextlib import contextmanager
+
+from vterm_core.arguments import CommandParser, UsageError
+from vterm_core.config import state_dir
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+MAX_ENTRIES = int(os.environ.get("VTERM_HISTORY_SIZE") or 100000)
+# The file is compacted once it holds this many times the cap (duplicates included).
+COMPACT_FACTOR = 1.5
+# How many of the newest entries are handed to readline for Up arrow and Ctrl+R.
+READLINE_ENTRIES = 5000
+
+parser = CommandParser("history")
+parser.add_argument("-n", dest="count", type=int, default=20)
+parser.add_argument("-p", dest="prefix", action="store_true")
+parser.add_argument("-c", dest="clear", action="store_true")
+parser.add_argument("query", nargs="*")
+
+#Index
+class HistoryIndex:
+    # Every entry is packed into one string, "\n" before each, with an array of
+    # start offsets. A substring search is one str.rfind (C speed, newest first)
+    # and a bisect to turn the hit into an entry number; a prefix search looks for
+    # "\n" + prefix. Duplicates only move the entry: `latest` says which copy counts.
+    def __init__(self):
+        self.entries = []
+        self.latest = {}
+        self.offsets = array("Q")
+        self.packed = ""
+        self.pending = []
+        self.size = 0
+
+    def __len__(self):
+        return len(self.latest)
+
+    def add(self, entry):
+        number = len(self.entries)
+        self.entries.append(entry)
+        self.latest[entry] = number
+        self.offsets.append(self.size + 1)
+        self.pending.append("\n" + entry)
+        self.size += len(entry) + 1
+
+    def extend(self, entries):
+        for entry in entries:
+            self.add(entry)
+
+    def _pack(self):
+        if self.pending:
+            self.packed += "".join(self.pending)
+            self.pending.clear()
+
+    def recent(self, count=None):
+        # Newest first, one line per distinct entry.
+        for number in range(len(self.entries) - 1, -1, -1):
+            if count is not None and count <= 0:
+                return
+            entry = self.entries[number]
+            if self.latest.get(entry) == number:
+                yield number, entry
+                if count is not None:
+                    count -= 1
+
+    def search(self, text, prefix=False):
+        # Newest first. The end bound moves before each hit, so every rfind resumes
+        # where the previous one stopped.
+        self._pack()
+        needle = "\n" + text if prefix else text
+        end = len(self.packed)
+        seen = None
+        while True:
+            position = self.packed.rfind(needle, 0, end)
+            if position < 0:
+                return
+            number = bisect_right(self.offsets, position + (1 if prefix else 0)) - 1
+            end = position + len(needle) - 1
+            if number == seen:
+                continue
+            seen = number
+            entry = self.entries[number]
+            if self.latest.get(entry) == number:
+                yield number, entry
+
+#History file
+def _encode(entry):
+    return (entry.replace("\n", " ") + "\n").encode("utf-8", "surrogateescape")
+
+def read_entries(path, offset=0):
+    # The entries from byte `offset` on, and the offset just past the last whole line.
+    try:
+        with open(path, "rb") as file:
+            file.seek(offset)
+            data = file.read()
+    except FileNotFoundError:
+        return [], offset
+    end = data.rfind(b"\n") + 1
+    return data[:end].decode("utf-8", "surrogateescape").splitlines(), offset + end
+
+def compacted(entries, limit):
+    # Keeps the newest copy of each entry, then the newest `limit` entries, in order.
+    latest = {}
+    for number, entry in enumerate(entries):
+        latest[entry] = number
+    kept = sorted(latest.values())[-limit:] if limit else []
+    return [entries[number] for number in kept]
+
+class History:
+    # Sessions share one append-only file. Each entry goes in with a single O_APPEND
+    # write, so concurrent sessions interleave whole lines; compaction rewrites the
+    # file under an exclusive lock that appenders wait on (shared) for the instant
+    # they write.
+    def __init__(self, path=None, limit=MAX_ENTRIES):
+        self.path = path
+        self.limit = limit
+        self.index = HistoryIndex()
+        self.session = []
+        self.loaded = threading.Event()
+        self.started = False
+        self.offset = 0
+        self.fed = False
+        self.lock = threading.Lock()
+        self.last = None
+
+    def _file(self):
+        if self.path is None:
+            self.path = os.path.join(state_dir(), "history")
+        return self.path
+
+    @contextmanager
+    def _locked(self, exclusive):
+        with open(self._file() + ".lock", "a+b") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            else:
+                lock.seek(0)
+                msvcrt.locking(lock.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+                else:
+                    lock.seek(0)
+                    msvcrt.locking(lock.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def record(self, entry):
+        entry = entry.strip()
+        if not entry or entry == self.last:
+            return
+        self.last = entry
+        with self.lock:
+            if self.loaded.is_set():
+                self.index.add(entry)
+            else:
+                self.session.append(entry)
+        try:
+            with self._locked(False):
+                fd = os.open(self._file(), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+                try:
+                    os.write(fd, _encode(entry))
+                finally:
+                    os.close(fd)
+        except OSError:
+            pass
+
+    def load(self):
+        try:
+            entries, offset = read_entries(self._file())
+            if len(entries) > self.limit * COMPACT_FACTOR:
+                entries, offset = self.compact()
+        except OSError:
+            entries, offset = [], 0
+        with self.lock:
+            # Lines typed while the file was loading may be in it already; adding them
+            # again only makes sure they count as the newest.
+            index = HistoryIndex()
+            index.extend(entries[-self.limit:])
+            index.extend(self.session)
+            self.index = index
+            self.offset = offset
+            self.session.clear()
+            self.loaded.set()
+
+    def refresh(self):
+        # Adds what other sessions have appended since the file was read (the daemon
+        # does this before each attach). A compacted, shorter file is read again.
+        if not self.loaded.is_set():
+            return
+        try:
+            if os.path.getsize(self._file()) < self.offset:
+                self.load()
+                return
+            entries, offset = read_entries(self._file(), self.offset)
+        except OSError:
+            return
+        with self.lock:
+            self.index.extend(entries)
+            self.offset = offset
+
+    def compact(self):
+        with self._locked(True):
+            path = self._file()
+            entries = compacted(read_entries(path)[0], self.limit)
+            data = b"".join(_encode(entry) for entry in entries)
+            temp = path + f".{os.getpid()}.tmp"
+            with open(temp, "wb") as out:
+                out.write(data)
+                out.flush()
+                os.fsync(out.fileno())
+            os.replace(temp, path)
+        return entries, len(data)
+
+    def start(self, readline=None):
+        # The file is read off the main thread; readline gets the newest entries the
+        # next time it is about to read a line after loading has finished.
+        if not self.started:
+            self.started = True
+            threading.Thread(target=self.load, name="vterm-history", daemon=True).start()
+        if readline is not None and hasattr(readline, "set_startup_hook"):
+            readline.set_startup_hook(lambda: self.feed(readline))
+
+    def preload(self):
+        # Reads the file on this thread; start() then has nothing left to load.
+        self.started = True
+        self.load()
+
+    def wait_loaded(self):
+        # Batch mode never starts the background load; the first lookup reads the file.
+        if not self.started:
+            self.preload()
+        self.loaded.wait()
+
+    def feed(self, readline):
+        if self.fed or not self.loaded.is_set():
+            return
+        self.fed = True
+        with self.lock:
+            recent = [entry for _, entry in self.index.recent(READLINE_ENTRIES)]
+        # The lines typed so far are already in readline's own list; put the older
+        # ones in front of them.
+        typed = [readline.get_history_item(i) for i in range(1, readline.get_current_history_length() + 1)]
+        readline.clear_history()
+        for entry in reversed(recent):
+            readline.add_history(entry)
+        for entry in typed:
+            if entry:
+                readline.add_history(entry)
+
+    def search(self, text, prefix=False, count=None):
+        self.wait_loaded()
+        with self.lock:
+            results = []
+            for match in self.index.search(text, prefix):
+                results.append(match)
+                if count is not None and len(results) >= count:
+                    break
+            return results
+
+    def recent(self, count=None):
+        self.wait_loaded()
+        with self.lock:
+            return list(self.index.recent(count))
+
+    def clear(self):
+        with self._locked(True):
+            with open(self._file(), "wb"):
+                pass
+        with self.lock:
+            self.index = HistoryIndex()
+            self.offset = 0
+
+store = History()
+
+#Command
+def command(args):
+    options = parser.parse_args(args)
+    if options.count < 1:
+        raise UsageError("-n needs a positive count")
+    if options.clear:
+        store.clear()
+        print("History cleared.")
+        return
+    query = " ".join(options.query)
+    if query:
+        matches = store.search(query, options.prefix, options.count)
+    else:
+        matches = store.recent(options.count)
+    if not matches:
+        return 1
+    width = len(str(matches[0][0] + 1))
+    # Oldest first, like a shell's history listing.
+    print("\n".join(f"{number + 1:>{width}}  {entry}" for number, entry in reversed(matches)))
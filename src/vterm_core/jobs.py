@@ -0,0 +1,471 @@
+#Imports
+import asyncio
+import codecs
+import os
+import signal
+import subprocess
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from vterm_core import executables, process, streams
+from vterm_core.parsing import split_pipeline, tokenize
+from vterm_core.progress import format_duration
+
+READ_CHUNK = 64 * 1024
+POLL_INTERVAL = 0.1
+# Built-ins that talk to the terminal or change the shell itself make no sense as jobs.
+FOREGROUND_ONLY = {"python", "edit", "cd", "exit", "clear", "fg", "bg", "wait"}
+# Signals that ask a built-in job to end; it stops at its next check of stop_requested().
+STOP_SIGNALS = {getattr(signal, name) for name in ("SIGINT", "SIGTERM", "SIGHUP", "SIGKILL") if hasattr(signal, name)}
+# Background jobs get their own process group, so Ctrl+C at the prompt doesn't reach them.
+if os.name == "nt":
+    _DETACH = {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+else:
+    _DETACH = {"start_new_session": True}
+
+#Output
+class PromptPrinter:
+    # Job output arrives while the user may be typing. The prompt line is cleared,
+    # the output printed, and the prompt redrawn with whatever was typed so far.
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.prompt = None
+        self.readline = None
+
+    def emit(self, text):
+        with self.lock:
+            stream = streams.terminal()
+            redraw = self.prompt is not None and stream.isatty()
+            if redraw:
+                stream.write("\r\033[K")
+            stream.write(text)
+            if redraw:
+                typed = self.readline.get_line_buffer() if self.readline is not None else ""
+                stream.write(self.prompt + typed)
+            stream.flush()
+
+class JobOutput:
+    # File-like sink for one output stream of a job: text is cut into whole lines,
+    # each printed with the job number in front.
+    encoding = "utf-8"
+    errors = "replace"
+
+    def __init__(self, printer, number):
+        self.printer = printer
+        self.prefix = f"[{number}] "
+        self.partial = ""
+        self.lock = threading.Lock()
+
+    def write(self, text):
+        with self.lock:
+            lines = (self.partial + text).split("\n")
+            self.partial = lines.pop()
+        if lines:
+            self.printer.emit("".join(self.prefix + line + "\n" for line in lines))
+        return len(text)
+
+    def flush(self):
+        pass
+
+    def isatty(self):
+        return False
+
+    def close(self):
+        with self.lock:
+            partial, self.partial = self.partial, ""
+        if partial:
+            self.printer.emit(self.prefix + partial + "\n")
+
+#Stopping built-ins
+_thread = threading.local()
+
+class JobStopped(Exception):
+    pass
+
+def stop_requested():
+    # True inside a built-in job once it has been killed. Built-ins that walk trees or
+    # read files check it between items; tail -f checks it between polls.
+    stop = getattr(_thread, "stop", None)
+    return stop is not None and stop.is_set()
+
+def check_stop():
+    if stop_requested():
+        raise JobStopped()
+
+def inherit_stop():
+    # Initializer for a worker pool a built-in starts: its threads stop with the job.
+    stop = getattr(_thread, "stop", None)
+
+    def initializer():
+        _thread.stop = stop
+    return initializer
+
+#Jobs
+
+class Job:
+    def __init__(self, number, line):
+        self.number = number
+        self.line = line
+        self.processes = []
+        self.thread = None
+        self.state = "Running"
+        self.status = None
+        self.foreground = False
+        self.started = time.perf_counter()
+        self.finished = None
+        self.done = threading.Event()
+        self.stop = threading.Event()
+        self.stopped_by = None
+
+    def elapsed(self):
+        return (self.finished or time.perf_counter()) - self.started
+
+    def pids(self):
+        return [str(child.pid) for child in self.processes]
+
+    def describe(self):
+        if not self.done.is_set():
+            return self.state
+        if self.status == 0:
+            return "Done"
+        if self.status > 128 and self.status - 128 in signal.valid_signals():
+            return f"Killed ({signal.Signals(self.status - 128).name})"
+        return f"Exit {self.status}"
+
+class JobSupervisor:
+    # External jobs are asyncio subprocesses on an event loop in a background thread:
+    # one thread watches every job, and their output is read as it arrives. A built-in
+    # job runs in its own thread with that thread's stdout routed into the job.
+    def __init__(self):
+        self.registry = None
+        self.jobs = OrderedDict()
+        self.lock = threading.Lock()
+        self.loop = None
+        self.printer = PromptPrinter()
+        self.exit_warned = False
+
+    def attach(self, registry):
+        self.registry = registry
+        registry.background_runner = self.start
+
+    def install_handlers(self):
+        # vTerm itself must not be suspended by Ctrl+Z: there is no shell above it to
+        # resume it. A foreground program stopped along with it is continued right away;
+        # jobs started with '&' (or stopped under fg) are the ones that can be stopped.
+        if hasattr(signal, "SIGTSTP"):
+            signal.signal(signal.SIGTSTP, self._refuse_suspend)
+
+    def _refuse_suspend(self, signum, frame):
+        try:
+            os.killpg(os.getpgrp(), signal.SIGCONT)
+        except OSError:
+            pass
+
+    def _event_loop(self):
+        with self.lock:
+            if self.loop is None:
+                self.loop = asyncio.new_event_loop()
+                threading.Thread(target=self.loop.run_forever, name="vterm-jobs", daemon=True).start()
+            return self.loop
+
+    @contextmanager
+    def prompt(self, text, readline=None):
+        # While the REPL waits at `text`, job output redraws the prompt after itself.
+        self.printer.prompt = text
+        self.printer.readline = readline
+        try:
+            yield
+        finally:
+            self.printer.prompt = None
+
+    def _builtin(self, stage):
+        argv = tokenize(stage)
+        return self.registry.lookup(argv[0]) if argv else None
+
+    def start(self, line):
+        stages = split_pipeline(line)
+        commands = [self._builtin(stage) for stage in stages]
+        for command in commands:
+            if command is not None and command.name in FOREGROUND_ONLY:
+                print(f"{command.name} can only run in the foreground")
+                return 2
+        with self.lock:
+            number = max(self.jobs, default=0) + 1
+            job = self.jobs[number] = Job(number, line)
+        if any(commands):
+            streams.install()
+            job.thread = threading.Thread(target=self._run_builtin, args=(job, line),
+                                          name=f"vterm-job-{number}", daemon=True)
+            job.thread.start()
+            print(f"[{number}] running inside vTerm")
+            return 0
+        status = asyncio.run_coroutine_threadsafe(self._spawn(job, stages), self._event_loop()).result()
+        if status:
+            self._forget(job)
+            return status
+        print(f"[{number}] {' '.join(job.pids())}")
+        return 0
+
+    def _run_builtin(self, job, line):
+        # Programs the line starts (`seq 3 | grep 2 &`) are detached like any job's
+        # and listed in job.processes, so kill reaches them too.
+        out = JobOutput(self.printer, job.number)
+        _thread.stop = job.stop
+        status = 1
+        try:
+            with streams.redirect(out), process.background(job.processes, **_DETACH):
+                status = self.registry.execute(line)
+        except JobStopped:
+            pass
+        except BaseException as e:
+            out.write(f"{type(e).__name__}: {str(e)}\n")
+        finally:
+            out.close()
+            if job.stop.is_set():
+                status = 128 + job.stopped_by
+            self._finish(job, status or 0)
+
+    async def _spawn(self, job, stages):
+        # Stages are chained on OS pipes like a foreground pipeline; stdin is /dev/null
+        # so a job never competes with the prompt for the keyboard.
+        upstream = subprocess.DEVNULL
+        for index, stage in enumerate(stages):
+            last = index == len(stages) - 1
+            read_end, write_end = (None, subprocess.PIPE) if last else os.pipe()
+            try:
+                argv = tokenize(stage)
+                child = await asyncio.create_subprocess_exec(
+                    *argv, executable=executables.resolve(argv[0]), stdin=upstream, stdout=write_end,
+                    stderr=subprocess.PIPE, **_DETACH)
+            except (OSError, ValueError) as e:
+                if isinstance(e, FileNotFoundError):
+                    print(f"Command not found: {stage}")
+                else:
+                    print(f"Error starting '{stage}': {str(e)}")
+                if read_end is not None:
+                    os.close(read_end)
+                for started in job.processes:
+                    started.kill()
+                    await started.wait()
+                return 127 if isinstance(e, FileNotFoundError) else 126
+            finally:
+                for fd in (upstream, write_end):
+                    if isinstance(fd, int) and fd >= 0:
+                        os.close(fd)
+            job.processes.append(child)
+            upstream = read_end
+        outputs = [child.stderr for child in job.processes] + [job.processes[-1].stdout]
+        pumps = [self._pump(stream, JobOutput(self.printer, job.number)) for stream in outputs]
+        asyncio.get_running_loop().create_task(self._supervise(job, pumps))
+        return 0
+
+    async def _pump(self, stream, out):
+        decoder = codecs.getincrementaldecoder("utf-8")("replace")
+        while True:
+            chunk = await stream.read(READ_CHUNK)
+            if not chunk:
+                break
+            out.write(decoder.decode(chunk))
+        out.write(decoder.decode(b"", final=True))
+        out.close()
+
+    async def _supervise(self, job, pumps):
+        await asyncio.gather(*pumps)
+        statuses = [process.exit_status(await child.wait()) for child in job.processes]
+        self._finish(job, statuses[-1])
+
+    def _finish(self, job, status):
+        job.status = status
+        job.finished = time.perf_counter()
+        job.state = "Done"
+        job.done.set()
+        if not job.foreground:
+            self.printer.emit(f"[{job.number}] {job.describe()} after {format_duration(job.elapsed())}: {job.line}\n")
+            self._forget(job)
+
+    def _forget(self, job):
+        with self.lock:
+            if self.jobs.get(job.number) is job:
+                del self.jobs[job.number]
+
+    #Lookup and signals
+    def find(self, spec=None):
+        with self.lock:
+            if not self.jobs:
+                return None
+            if spec in (None, "%", "%+", "%%"):
+                return next(reversed(self.jobs.values()))
+            number = spec[1:] if spec.startswith("%") else spec
+            return self.jobs.get(int(number)) if number.isdigit() else None
+
+    def running(self):
+        with self.lock:
+            return [job for job in self.jobs.values() if not job.done.is_set()]
+
+    def builtins_running(self):
+        return [job for job in self.running() if job.thread is not None]
+
+    def signal(self, job, signum):
+        if job.thread is not None and signum in STOP_SIGNALS and not job.stop.is_set():
+            job.stopped_by = signum
+            job.stop.set()
+        for child in job.processes:
+            if child.returncode is not None:
+                continue
+            try:
+                if os.name == "nt":
+                    if signum == signal.SIGINT:
+                        child.send_signal(signal.CTRL_BREAK_EVENT)
+                    else:
+                        child.terminate()
+                else:
+                    # The whole group, so whatever the job started goes too.
+                    os.killpg(child.pid, signum)
+            except (ProcessLookupError, PermissionError, OSError):
+                pass
+        if hasattr(signal, "SIGSTOP") and signum in (signal.SIGSTOP, signal.SIGTSTP):
+            job.state = "Stopped"
+        elif hasattr(signal, "SIGCONT") and signum == signal.SIGCONT:
+            job.state = "Running"
+
+    #Waiting
+    def wait(self, job, foreground=False):
+        # Blocks until the job ends; the waiter reports the end, not the notification.
+        # In the foreground Ctrl+C interrupts the job (a second one kills it) and Ctrl+Z
+        # stops it; otherwise Ctrl+C just stops the waiting.
+        job.foreground = True
+        interrupts = 0
+        suspend = None
+        if foreground and job.processes and hasattr(signal, "SIGTSTP") \
+                and threading.current_thread() is threading.main_thread():
+            suspend = signal.signal(signal.SIGTSTP, lambda signum, frame: self.signal(job, signal.SIGSTOP))
+        try:
+            while not job.done.is_set():
+                try:
+                    job.done.wait(POLL_INTERVAL)
+                except KeyboardInterrupt:
+                    if not foreground or job.thread is not None:
+                        print(f"\n[{job.number}] still running: {job.line}")
+                        job.foreground = False
+                        return 130
+                    interrupts += 1
+                    self.signal(job, signal.SIGINT if interrupts == 1 else getattr(signal, "SIGKILL", signal.SIGTERM))
+                if job.state == "Stopped":
+                    print(f"\n[{job.number}] Stopped: {job.line}")
+                    job.foreground = False
+                    return 148
+        finally:
+            if suspend is not None:
+                signal.signal(signal.SIGTSTP, suspend)
+        self._forget(job)
+        return job.status
+
+    def confirm_exit(self):
+        # Like a login shell: the first `exit` with jobs running only warns.
+        running = self.running()
+        if running and not self.exit_warned:
+            self.exit_warned = True
+            count = "is 1 running job" if len(running) == 1 else f"are {len(running)} running jobs"
+            print(f"There {count}. Type 'exit' again to stop them and exit.")
+            return False
+        for job in running:
+            job.foreground = True
+            self.signal(job, getattr(signal, "SIGHUP", signal.SIGTERM))
+        return True
+
+supervisor = JobSupervisor()
+
+#Commands
+def jobs_command(args):
+    listed = list(supervisor.jobs.values())
+    for index, job in enumerate(listed):
+        mark = "+" if index == len(listed) - 1 else "-" if index == len(listed) - 2 else " "
+        pids = f" {' '.join(job.pids())}" if "-l" in args and job.processes else ""
+        print(f"[{job.number}]{mark}{pids} {job.describe():<10} {format_duration(job.elapsed()):>8}  {job.line}")
+
+def _job(name, spec):
+    job = supervisor.find(spec)
+    if job is None:
+        print(f"{name}: {spec or 'current'}: no such job")
+    return job
+
+def fg_command(args):
+    job = _job("fg", args[0] if args else None)
+    if job is None:
+        return 1
+    print(job.line)
+    if job.state == "Stopped":
+        supervisor.signal(job, signal.SIGCONT)
+    return supervisor.wait(job, foreground=True)
+
+def bg_command(args):
+    if not hasattr(signal, "SIGCONT"):
+        print("bg: jobs cannot be stopped and resumed on this platform")
+        return 1
+    job = _job("bg", args[0] if args else None)
+    if job is None:
+        return 1
+    if job.state != "Stopped":
+        print(f"bg: job {job.number} is already running")
+        return 1
+    supervisor.signal(job, signal.SIGCONT)
+    print(f"[{job.number}] {job.line} &")
+
+def wait_command(args):
+    targets = [_job("wait", spec) for spec in args] if args else supervisor.running()
+    status = 0
+    for job in targets:
+        if job is None:
+            status = 127
+            continue
+        reported = job.done.is_set()
+        status = supervisor.wait(job)
+        if status == 130 and not job.done.is_set():
+            return status
+        if not reported:
+            print(f"[{job.number}] {job.describe()} after {format_duration(job.elapsed())}: {job.line}")
+    return status
+
+def _parse_signal(text):
+    name = text.upper()
+    if name.isdigit():
+        return signal.Signals(int(name))
+    return signal.Signals[name if name.startswith("SIG") else "SIG" + name]
+
+def kill_command(args):
+    signum = signal.SIGTERM
+    if args and args[0] == "-s" and len(args) > 1:
+        text, args = args[1], args[2:]
+    elif args and args[0].startswith("-") and len(args[0]) > 1:
+        text, args = args[0][1:], args[1:]
+    else:
+        text = None
+    if text is not None:
+        try:
+            signum = _parse_signal(text)
+        except (KeyError, ValueError):
+            print(f"kill: {text}: invalid signal")
+            return 2
+    status = 0
+    for target in args:
+        if target.startswith("%"):
+            job = _job("kill", target)
+            if job is None:
+                status = 1
+            elif job.thread is not None and signum not in STOP_SIGNALS:
+                print(f"kill: job {job.number} is a built-in running inside vTerm; it can only be stopped")
+                status = 1
+            else:
+                supervisor.signal(job, signum)
+        elif target.isdigit():
+            try:
+                os.kill(int(target), signum)
+            except OSError as e:
+                print(f"kill: ({target}) - {e.strerror}")
+                status = 1
+        else:
+            print(f"kill: {target}: arguments must be process or job IDs")
+            status = 1
+    return status
@@ -0,0 +1,114 @@
+#Imports
+import os
+import stat
+import sys
+import time
+
+from vterm_core import jobs
+from vterm_core.arguments import CommandParser
+from vterm_core.progress import format_size
+
+WRITE_BATCH = 64 * 1024
+_HIDDEN_ATTRIBUTE = stat.FILE_ATTRIBUTE_HIDDEN if os.name == "nt" else 0
+
+parser = CommandParser("ls")
+parser.add_argument("-a", dest="all", action="store_true")
+parser.add_argument("-l", dest="long", action="store_true")
+parser.add_argument("-h", dest="human", action="store_true")
+parser.add_argument("-S", dest="sort", action="store_const", const="size", default="name")
+parser.add_argument("-t", dest="sort", action="store_const", const="time")
+parser.add_argument("-U", dest="sort", action="store_const", const=None)
+parser.add_argument("-r", dest="reverse", action="store_true")
+parser.add_argument("paths", nargs="*")
+
+#Entries
+def hidden(entry):
+    if entry.name.startswith("."):
+        return True
+    # On Windows the hidden attribute comes with the directory listing, no extra syscall.
+    if _HIDDEN_ATTRIBUTE:
+        try:
+            return bool(entry.stat(follow_symlinks=False).st_file_attributes & _HIDDEN_ATTRIBUTE)
+        except OSError:
+            return False
+    return False
+
+def _entry_stat(entry):
+    # DirEntry caches the result, so sorting and the long format share one lstat per entry.
+    try:
+        return entry.stat(follow_symlinks=False)
+    except OSError:
+        return None
+
+def _stat_value(entry, field):
+    info = _entry_stat(entry)
+    return getattr(info, field) if info is not None else 0
+
+def _sort_key(sort):
+    # Biggest and newest first, like ls; ties fall back to the name.
+    if sort == "size":
+        return lambda entry: (-_stat_value(entry, "st_size"), entry.name)
+    if sort == "time":
+        return lambda entry: (-_stat_value(entry, "st_mtime"), entry.name)
+    return lambda entry: entry.name
+
+def iter_entries(path, show_all=False, sort="name", reverse=False):
+    with os.scandir(path) as scan:
+        entries = (entry for entry in scan if show_all or not hidden(entry))
+        if sort is None:
+            # Unsorted: entries stream out as the directory is read.
+            yield from entries
+            return
+        listed = sorted(entries, key=_sort_key(sort), reverse=reverse)
+    yield from listed
+
+def format_long(entry, human=False):
+    info = _entry_stat(entry)
+    if info is None:
+        return f"?????????? {'?':>10} {'?':>16} {entry.name}"
+    size = format_size(info.st_size) if human else str(info.st_size)
+    when = time.strftime("%Y-%m-%d %H:%M", time.localtime(info.st_mtime))
+    line = f"{stat.filemode(info.st_mode)} {size:>10} {when:<16} {entry.name}"
+    if entry.is_symlink():
+        try:
+            line += " -> " + os.readlink(entry.path)
+        except OSError:
+            pass
+    return line
+
+#Command
+def list_directory(path, options, out):
+    batch = []
+    size = 0
+    for entry in iter_entries(path, options.all, options.sort, options.reverse):
+        line = (format_long(entry, options.human) if options.long else entry.name) + "\n"
+        batch.append(line)
+        size += len(line)
+        if size >= WRITE_BATCH:
+            jobs.check_stop()
+            out.write("".join(batch))
+            batch.clear()
+            size = 0
+    out.write("".join(batch))
+
+def command(args, out=None):
+    options = parser.parse_args(args)
+    out = out or sys.stdout
+    paths = options.paths or ["."]
+    status = 0
+    for index, path in enumerate(paths):
+        jobs.check_stop()
+        try:
+            if not os.path.isdir(path):
+                if not os.path.lexists(path):
+                    raise FileNotFoundError(2, "No such file or directory")
+                out.write(path + "\n")
+                continue
+            if len(paths) > 1:
+                out.write(("\n" if index else "") + f"{path}:\n")
+            list_directory(path, options, out)
+        except OSError as e:
+            out.write(f"ls: cannot access '{path}': {e.strerror}\n")
+            status = 1
+    out.flush()
+    return status
@@ -0,0 +1,186 @@
+#Imports
+import atexit
+import glob
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+
+from vterm_core.config import env_flag, state_dir
+
+# Upper bounds in seconds (Prometheus style); anything slower lands in +Inf.
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+FLUSH_INTERVAL = float(os.environ.get("VTERM_METRICS_INTERVAL") or 60)
+# Typos and one-off programs would otherwise add a series each; past this many names
+# everything new is counted as "other".
+MAX_COMMANDS = 200
+
+#Prometheus text format
+def _label(value):
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+def _bound(bound):
+    return "+Inf" if bound is None else repr(bound)
+
+def prometheus_text(snapshot):
+    pid = snapshot["pid"]
+    lines = [
+        "# HELP vterm_command_duration_seconds Time taken by each vTerm command line.",
+        "# TYPE vterm_command_duration_seconds histogram",
+    ]
+    for name, entry in sorted(snapshot["commands"].items()):
+        labels = f'command="{_label(name)}",pid="{pid}"'
+        for bound, count in entry["buckets"]:
+            lines.append(f'vterm_command_duration_seconds_bucket{{{labels},le="{_bound(bound)}"}} {count}')
+        lines.append(f"vterm_command_duration_seconds_sum{{{labels}}} {entry['sum']!r}")
+        lines.append(f"vterm_command_duration_seconds_count{{{labels}}} {entry['count']}")
+    lines.append("# HELP vterm_command_failures_total Command lines that ended with a non-zero status.")
+    lines.append("# TYPE vterm_command_failures_total counter")
+    for name, entry in sorted(snapshot["commands"].items()):
+        lines.append(f'vterm_command_failures_total{{command="{_label(name)}",pid="{pid}"}} {entry["failures"]}')
+    lines.append("# HELP vterm_errors_total Internal failures, by where they happened.")
+    lines.append("# TYPE vterm_errors_total counter")
+    for source, count in sorted(snapshot["errors"].items()):
+        lines.append(f'vterm_errors_total{{source="{_label(source)}",pid="{pid}"}} {count}')
+    lines.append("# HELP vterm_session_start_time_seconds When this vTerm session started.")
+    lines.append("# TYPE vterm_session_start_time_seconds gauge")
+    lines.append(f'vterm_session_start_time_seconds{{pid="{pid}"}} {snapshot["started"]!r}')
+    return "\n".join(lines) + "\n"
+
+#Collector
+class MetricsCollector:
+    # An observer like profiling.LatencyLedger, but with fixed buckets instead of
+    # samples: recording is a bisect over BUCKETS and a few additions, whatever the
+    # session length. A background thread writes the totals every FLUSH_INTERVAL and
+    # once more at exit.
+    def __init__(self, directory=None, buckets=BUCKETS, interval=FLUSH_INTERVAL):
+        self.directory = directory
+        self.buckets = buckets
+        self.interval = interval
+        self.commands = {}
+        self.errors = {}
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.pid = os.getpid()
+        self.enabled = False
+        self.stop = threading.Event()
+
+    def record(self, name, seconds, status=0):
+        with self.lock:
+            entry = self.commands.get(name)
+            if entry is None:
+                if len(self.commands) >= MAX_COMMANDS:
+                    name = "other"
+                    entry = self.commands.get(name)
+                if entry is None:
+                    entry = self.commands[name] = [[0] * (len(self.buckets) + 1), 0.0, 0, 0]
+            entry[0][bisect_left(self.buckets, seconds)] += 1
+            entry[1] += seconds
+            entry[2] += 1
+            if status:
+                entry[3] += 1
+
+    def error(self, source):
+        if not self.enabled:
+            return
+        with self.lock:
+            self.errors[source] = self.errors.get(source, 0) + 1
+
+    def snapshot(self):
+        commands = {}
+        with self.lock:
+            for name, (counts, total, count, failures) in self.commands.items():
+                # Buckets are cumulative, as Prometheus expects.
+                running = 0
+                buckets = []
+                for bound, bucket in zip(self.buckets + (None,), counts):
+                    running += bucket
+                    buckets.append((bound, running))
+                commands[name] = {"count": count, "sum": total, "failures": failures, "buckets": buckets}
+            errors = dict(self.errors)
+        return {"time": time.time(), "pid": self.pid, "started": self.started, "commands": commands, "errors": errors}
+
+    #Files
+    def paths(self):
+        directory = self.directory or os.environ.get("VTERM_METRICS_DIR") or os.path.join(state_dir(), "metrics")
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, "metrics.jsonl"), os.path.join(directory, f"vterm-{self.pid}.prom")
+
+    def flush(self):
+        snapshot = self.snapshot()
+        try:
+            jsonl, prom = self.paths()
+            # One O_APPEND write per flush, so sessions sharing the file never interleave.
+            line = json.dumps(snapshot, separators=(",", ":")) + "\n"
+            fd = os.open(jsonl, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+            try:
+                os.write(fd, line.encode())
+            finally:
+                os.close(fd)
+            # The node exporter may read at any moment: write aside, then rename over.
+            temp = prom + ".tmp"
+            with open(temp, "w") as out:
+                out.write(prometheus_text(snapshot))
+            os.replace(temp, prom)
+        except OSError:
+            pass
+
+    def remove_stale(self):
+        # Each session has its own .prom file (they would overwrite one shared file);
+        # files left by sessions that have exited are cleared when the next one starts.
+        if os.name == "nt":
+            return
+        _, prom = self.paths()
+        for path in glob.glob(os.path.join(os.path.dirname(prom), "vterm-*.prom")):
+            pid = os.path.basename(path)[6:-5]
+            if not pid.isdigit() or int(pid) == self.pid:
+                continue
+            try:
+                os.kill(int(pid), 0)
+            except ProcessLookupError:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            except OSError:
+                pass
+
+    def _flusher(self):
+        while not self.stop.wait(self.interval):
+            self.flush()
+
+    def enable(self, *sources):
+        if self.enabled:
+            return
+        self.enabled = True
+        for source in sources:
+            if source is not None:
+                source.observers.append(self.record)
+        try:
+            self.remove_stale()
+        except OSError:
+            pass
+        threading.Thread(target=self._flusher, name="vterm-metrics", daemon=True).start()
+        atexit.register(self.close)
+
+    def close(self):
+        self.stop.set()
+        self.flush()
+
+    def forked(self):
+        # A session forked from the daemon starts its own counts, file and flusher.
+        self.lock = threading.Lock()
+        self.commands = {}
+        self.errors = {}
+        self.started = time.time()
+        self.pid = os.getpid()
+        self.stop = threading.Event()
+        if self.enabled:
+            threading.Thread(target=self._flusher, name="vterm-metrics", daemon=True).start()
+
+collector = MetricsCollector()
+
+def enable_from_environment(*sources):
+    if env_flag("VTERM_METRICS") or os.environ.get("VTERM_METRICS_DIR"):
+        collector.enable(*sources)
@@ -0,0 +1,156 @@
+#Imports
+import io
+import os
+import re
+import sys
+import time
+
+BUFFER_SIZE = 64 * 1024
+# Output that trickles out (a slow loop in `python`) is still pushed out this often.
+FLUSH_INTERVAL = 0.1
+PALETTE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "Texts", "color.txt")
+# Used for any name Texts/color.txt doesn't define (or when the file isn't there).
+DEFAULT_PALETTE = {
+    "GREEN": "\033[0;32m",
+    "PURPLE": "\033[0;35m",
+    "LIGHT_GRAY": "\033[0;37m",
+    "LIGHT_RED": "\033[1;31m",
+    "LIGHT_GREEN": "\033[1;32m",
+    "LIGHT_BLUE": "\033[1;34m",
+    "LIGHT_CYAN": "\033[1;36m",
+    "END": "\033[0m",
+}
+# <NAME> is a palette color; {} is where the text goes.
+TEMPLATES = {
+    "version": ("<GREEN>{}<END>", False),
+    "copyright": ("<LIGHT_BLUE>Copyright: <LIGHT_CYAN>{}<END>", False),
+    "warning": ("<LIGHT_RED>{}<END>", False),
+    "hint": ("<LIGHT_GRAY>{}<END>", False),
+    "prompt": ("<LIGHT_GREEN>{}<PURPLE>: >> <END>", True),
+}
+
+_ENTRY = re.compile(r'^\s*([A-Z_]+)\s*=\s*"(.*)"\s*$')
+_MARKUP = re.compile(r"<([A-Z_]+)>")
+
+#Palette
+def load_palette(path=PALETTE_FILE):
+    palette = dict(DEFAULT_PALETTE)
+    try:
+        with open(path, encoding="utf-8") as file:
+            for line in file:
+                match = _ENTRY.match(line)
+                if match:
+                    palette[match.group(1)] = match.group(2).encode("ascii", "backslashreplace").decode("unicode_escape")
+    except OSError:
+        pass
+    return palette
+
+def color_enabled(stream=None):
+    # Escapes only go to a terminal: not to files, pipes, TERM=dumb or with NO_COLOR set.
+    stream = stream or sys.stdout
+    if os.environ.get("NO_COLOR") or os.environ.get("TERM") == "dumb":
+        return False
+    try:
+        return stream.isatty()
+    except (AttributeError, ValueError):
+        return False
+
+def readline_markers(readline):
+    # GNU readline works out the prompt's width itself and needs \001...\002 around
+    # escapes; libedit and pyreadline would print the markers.
+    if readline is None:
+        return False
+    backend = getattr(readline, "backend", None)
+    if backend is None:
+        backend = "editline" if "libedit" in (getattr(readline, "__doc__", None) or "") else "readline"
+    return backend == "readline" and getattr(readline, "__name__", "") == "readline"
+
+#Styles
+class Styles:
+    # Every template is composed into a plain format string once (palette codes in
+    # place, or nothing when color is off), so a styled line costs one str.format.
+    def __init__(self, templates, palette=None):
+        self.markup = dict(templates)
+        self.palette = palette if palette is not None else load_palette()
+        self.templates = {}
+        self.configure(color=False)
+
+    def configure(self, color, markers=False):
+        self.color = color
+        self.templates = {name: self.compose(text, markers and prompt)
+                          for name, (text, prompt) in self.markup.items()}
+
+    def compose(self, text, markers=False):
+        def code(match):
+            if not self.color:
+                return ""
+            escape = self.palette.get(match.group(1), "")
+            return f"\001{escape}\002" if markers and escape else escape
+        return _MARKUP.sub(code, text)
+
+    def format(self, name, *args):
+        return self.templates[name].format(*args)
+
+styles = Styles(TEMPLATES)
+
+def style(name, *args):
+    return styles.format(name, *args)
+
+#Buffered stdout
+class CommandOutput(io.TextIOWrapper):
+    # stdout with a large buffer that is flushed when a command finishes rather than
+    # at every newline, so a command printing thousands of lines makes a handful of
+    # write calls. Anything that hands the terminal to another program (spawning,
+    # input(), the pager) flushes first.
+    def __init__(self, buffer, encoding, errors):
+        super().__init__(buffer, encoding=encoding, errors=errors, line_buffering=False)
+        self.flushed = time.monotonic()
+
+    def write(self, text):
+        written = super().write(text)
+        if time.monotonic() - self.flushed >= FLUSH_INTERVAL:
+            self.flush()
+        return written
+
+    def flush(self):
+        super().flush()
+        self.flushed = time.monotonic()
+
+def install(readline=None):
+    # Call before anything else wraps sys.stdout (background jobs do).
+    stream = sys.stdout
+    styles.configure(color_enabled(stream), readline_markers(readline))
+    if isinstance(stream, CommandOutput):
+        return stream
+    try:
+        fd = stream.fileno()
+    except (AttributeError, OSError, ValueError):
+        return stream
+    if os.name == "nt":
+        # Keep the console's own raw stream: it writes Unicode through the console API.
+        # With python -u (PYTHONUNBUFFERED) stdout.buffer is already that raw stream.
+        buffer = getattr(stream, "buffer", None)
+        raw = buffer if isinstance(buffer, io.RawIOBase) else getattr(buffer, "raw", None)
+        if raw is None:
+            return stream
+    else:
+        # A raw file of our own, so it stays open whatever happens to the old stream.
+        raw = io.FileIO(fd, "w", closefd=False)
+    stream.flush()
+    sys.stdout = CommandOutput(io.BufferedWriter(raw, BUFFER_SIZE), stream.encoding, stream.errors)
+    return sys.stdout
+
+def flush():
+    try:
+        sys.stdout.flush()
+    except (OSError, ValueError):
+        pass
+
+def discard():
+    # Whatever is still buffered goes to the null device instead of failing again at exit.
+    try:
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        os.close(devnull)
+    except (OSError, ValueError):
+        pass
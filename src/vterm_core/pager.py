@@ -0,0 +1,280 @@
+#Imports
+import mmap
+import os
+import shutil
+import sys
+import time
+from array import array
+from bisect import bisect_right
+from collections import deque
+from itertools import accumulate, islice
+
+from vterm_core import jobs
+from vterm_core.arguments import CommandParser, UsageError
+
+INDEX_BLOCK = 1024 * 1024
+COPY_CHUNK = 1024 * 1024
+FOLLOW_INTERVAL = 0.5
+
+#Mapped files
+class MappedFile:
+    # The file is mapped, never read into memory. Line start offsets are indexed
+    # lazily, a block at a time, only as far as the furthest line asked for; after
+    # that any indexed line is a constant-time lookup.
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "rb")
+        self.size = os.fstat(self.file.fileno()).st_size
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b""
+        self.offsets = array("Q", [0])
+        self.scanned = 0
+
+    def close(self):
+        if self.size:
+            self.data.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def complete(self):
+        return self.scanned >= self.size
+
+    def _index_block(self):
+        # Blocks may end mid-line: offsets accumulate from the block start, so the next
+        # block picks the partial line up where this one stopped.
+        end = min(self.scanned + INDEX_BLOCK, self.size)
+        pieces = self.data[self.scanned:end].split(b"\n")
+        starts = accumulate((len(piece) + 1 for piece in pieces[:-1]), initial=self.scanned)
+        next(starts)
+        self.offsets.extend(starts)
+        if len(self.offsets) > 1 and self.offsets[-1] >= self.size:
+            # A final newline does not start another line.
+            self.offsets.pop()
+        self.scanned = end
+
+    def index_to_line(self, line):
+        while len(self.offsets) <= line + 1 and not self.complete:
+            self._index_block()
+
+    def index_to_offset(self, offset):
+        while self.scanned <= offset and not self.complete:
+            self._index_block()
+
+    def line_count(self):
+        self.index_to_line(sys.maxsize)
+        return len(self.offsets) if self.size else 0
+
+    def line_offset(self, line):
+        self.index_to_line(line)
+        if line < len(self.offsets):
+            return self.offsets[line]
+        return self.size
+
+    def line_at(self, offset):
+        self.index_to_offset(offset)
+        return bisect_right(self.offsets, offset) - 1
+
+    def lines(self, start, count):
+        # The bytes of lines [start, start + count) as one contiguous slice.
+        return self.data[self.line_offset(start):self.line_offset(start + count)]
+
+    def head_offset(self, count):
+        # End of the first `count` lines without building the index.
+        pos = 0
+        for _ in range(count):
+            newline = self.data.find(b"\n", pos)
+            if newline < 0:
+                return self.size
+            pos = newline + 1
+        return pos
+
+    def tail_offset(self, count):
+        # Start of the last `count` lines, found by scanning backwards from the end.
+        if count == 0:
+            return self.size
+        end = self.size
+        if end and self.data[end - 1:end] == b"\n":
+            end -= 1
+        pos = end
+        for _ in range(count):
+            newline = self.data.rfind(b"\n", 0, pos)
+            if newline < 0:
+                return 0
+            pos = newline
+        return pos + 1 if pos < end else end
+
+#Output
+def _output():
+    sys.stdout.flush()
+    return getattr(sys.stdout, "buffer", None)
+
+def _emit(out, chunk):
+    if out is not None:
+        out.write(chunk)
+    else:
+        sys.stdout.write(chunk.decode(errors="replace"))
+
+def write_range(data, start, end):
+    out = _output()
+    for pos in range(start, end, COPY_CHUNK):
+        _emit(out, data[pos:min(pos + COPY_CHUNK, end)])
+    if end > start and data[end - 1:end] != b"\n":
+        _emit(out, b"\n")
+    (out or sys.stdout).flush()
+
+def follow(path, position, interval=FOLLOW_INTERVAL):
+    # tail -f: only the bytes appended since the last poll are read. As a background
+    # job it runs until killed.
+    out = _output()
+    with open(path, "rb") as file:
+        while not jobs.stop_requested():
+            size = os.fstat(file.fileno()).st_size
+            if size < position:
+                # Truncated or rotated in place: start again from the top.
+                position = 0
+            if size > position:
+                file.seek(position)
+                while position < size:
+                    chunk = file.read(min(COPY_CHUNK, size - position))
+                    if not chunk:
+                        break
+                    position += len(chunk)
+                    _emit(out, chunk)
+                (out or sys.stdout).flush()
+            time.sleep(interval)
+
+#Pager
+def page(mapped, start_line=0):
+    height = max(shutil.get_terminal_size().lines - 1, 1)
+    top = max(start_line, 0)
+    out = _output()
+    while True:
+        chunk = mapped.lines(top, height)
+        _emit(out, chunk)
+        if chunk and not chunk.endswith(b"\n"):
+            _emit(out, b"\n")
+        (out or sys.stdout).flush()
+        bottom = top + height
+        if mapped.line_offset(bottom) >= mapped.size:
+            return
+        percent = mapped.line_offset(bottom) * 100 // mapped.size
+        try:
+            answer = input(f"-- {mapped.path}: line {bottom} ({percent}%) -- [Enter] next, b back, "
+                           f"g N go to line, G end, /text search, q quit: ").strip()
+        except EOFError:
+            return
+        if answer == "q":
+            return
+        elif answer == "b":
+            top = max(top - height, 0)
+        elif answer == "G":
+            top = max(mapped.line_count() - height, 0)
+        elif answer.startswith("g") or answer.isdigit():
+            number = answer[1:].strip() if answer.startswith("g") else answer
+            if number.isdigit():
+                top = max(int(number) - 1, 0)
+        elif answer.startswith("/") and len(answer) > 1:
+            found = mapped.data.find(answer[1:].encode(errors="surrogateescape"), mapped.line_offset(bottom))
+            if found < 0:
+                print(f"Pattern not found: {answer[1:]}")
+            else:
+                top = mapped.line_at(found)
+        else:
+            top = bottom
+
+#Commands
+view_parser = CommandParser("view")
+view_parser.add_argument("-n", dest="lines", type=int, default=10)
+view_parser.add_argument("--head", dest="mode", action="store_const", const="head", default="page")
+view_parser.add_argument("--tail", dest="mode", action="store_const", const="tail")
+view_parser.add_argument("-f", dest="follow", action="store_true")
+view_parser.add_argument("filename")
+
+head_parser = CommandParser("head")
+head_parser.add_argument("-n", dest="lines", type=int, default=10)
+head_parser.add_argument("filename", nargs="?")
+
+tail_parser = CommandParser("tail")
+tail_parser.add_argument("-n", dest="lines", type=int, default=10)
+tail_parser.add_argument("-f", dest="follow", action="store_true")
+tail_parser.add_argument("filename", nargs="?")
+
+def show(filename, mode="page", lines=10, follow_file=False, start_line=0):
+    if lines < 0:
+        raise UsageError("-n must not be negative")
+    try:
+        with MappedFile(filename) as mapped:
+            if mode == "head":
+                write_range(mapped.data, 0, mapped.head_offset(lines))
+                return
+            if mode == "tail" or follow_file:
+                start = mapped.tail_offset(lines)
+                write_range(mapped.data, start, mapped.size)
+                position = mapped.size
+            elif sys.stdin.isatty() and sys.stdout.isatty():
+                print(f"Content of '{filename}':\n")
+                page(mapped, start_line)
+                return
+            else:
+                write_range(mapped.data, 0, mapped.size)
+                return
+        if follow_file:
+            try:
+                follow(filename, position)
+            except KeyboardInterrupt:
+                print()
+    except FileNotFoundError:
+        print(f"File '{filename}' not found.")
+        return 1
+    except IsADirectoryError:
+        print(f"'{filename}' is a directory.")
+        return 1
+    except OSError as e:
+        print(f"Error viewing file: {str(e)}")
+        return 1
+
+def view_command(args):
+    # `view +N file` opens the pager at line N.
+    start_line = 0
+    if args and args[0].startswith("+") and args[0][1:].isdigit():
+        start_line = int(args[0][1:]) - 1
+        args = args[1:]
+    options = view_parser.parse_args(args)
+    return show(options.filename, options.mode, options.lines, options.follow, start_line)
+
+def _line_count_args(args):
+    # The traditional `head -5` / `tail -5` spelling of -n 5.
+    return [f"-n{arg[1:]}" if len(arg) > 1 and arg[0] == "-" and arg[1:].isdigit() else arg for arg in args]
+
+def _input(stdin):
+    if stdin is not None:
+        return stdin
+    if sys.stdin is None or sys.stdin.isatty():
+        raise UsageError("give a file or pipe input into it")
+    return sys.stdin.buffer
+
+def show_stream(stream, mode, lines):
+    # head stops reading after its lines; tail keeps only the last ones in memory.
+    if lines < 0:
+        raise UsageError("-n must not be negative")
+    selected = islice(stream, lines) if mode == "head" else deque(stream, maxlen=lines)
+    data = b"".join(line if isinstance(line, bytes) else line.encode(errors="surrogateescape") for line in selected)
+    write_range(data, 0, len(data))
+
+def head_command(args, stdin=None):
+    options = head_parser.parse_args(_line_count_args(args))
+    if options.filename is None:
+        return show_stream(_input(stdin), "head", options.lines)
+    return show(options.filename, "head", options.lines)
+
+def tail_command(args, stdin=None):
+    options = tail_parser.parse_args(_line_count_args(args))
+    if options.filename is None:
+        # Like tail, -f has nothing to follow on a pipe.
+        return show_stream(_input(stdin), "tail", options.lines)
+    return show(options.filename, "tail", options.lines, options.follow)
@@ -0,0 +1,62 @@
+#Imports
+import os
+import shlex
+
+#Tokenizer
+def tokenize(line):
+    # Windows paths use backslashes, which POSIX quoting would swallow.
+    if os.name == "nt":
+        return [_unquote(token) for token in shlex.split(line, posix=False)]
+    return shlex.split(line)
+
+def _unquote(token):
+    if len(token) >= 2 and token[0] == token[-1] and token[0] in "'\"":
+        return token[1:-1]
+    return token
+
+def _split_unquoted(line, separator):
+    parts = []
+    current = []
+    quote = None
+    escaped = False
+    for char in line:
+        if escaped:
+            escaped = False
+        elif quote:
+            if char == quote:
+                quote = None
+        elif char == "\\" and os.name != "nt":
+            escaped = True
+        elif char in "'\"":
+            quote = char
+        elif char == separator:
+            parts.append("".join(current).strip())
+            current = []
+            continue
+        current.append(char)
+    parts.append("".join(current).strip())
+    return parts
+
+def split_pipeline(line):
+    # Split on every '|' that is not inside quotes.
+    return _split_unquoted(line, "|")
+
+def split_sequence(line):
+    # Commands separated by ';' outside quotes run one after the other.
+    return [command for command in _split_unquoted(line, ";") if command]
+
+def split_background(line):
+    # A trailing '&' outside quotes runs the line as a background job: ("cmd", True).
+    stripped = line.rstrip()
+    if not stripped.endswith("&") or stripped.endswith("&&"):
+        return line, False
+    quote = None
+    for char in stripped[:-1]:
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in "'\"":
+            quote = char
+    if quote:
+        return line, False
+    return stripped[:-1].rstrip(), True
@@ -0,0 +1,228 @@
+#Imports
+import os
+import signal
+import subprocess
+import sys
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+from vterm_core import executables
+from vterm_core.parsing import tokenize
+
+CHUNK_SIZE = 64 * 1024
+
+#Helpers
+def exit_status(returncode):
+    # Report signal deaths the way a shell does (128 + signal number).
+    if returncode is not None and returncode < 0:
+        return 128 - returncode
+    return returncode
+
+def _describe(command):
+    return command if isinstance(command, str) else " ".join(command)
+
+def broken_pipe(status):
+    return hasattr(signal, "SIGPIPE") and status == 128 + signal.SIGPIPE
+
+#Waiting
+# Largest ru_maxrss of the children reaped since the last take_child_peak().
+_child_peak = 0
+
+def wait(process):
+    # Reaps with wait4 where there is one, so the child's own peak memory is known.
+    global _child_peak
+    if not hasattr(os, "wait4") or process.returncode is not None:
+        return process.wait()
+    try:
+        pid, status, usage = os.wait4(process.pid, 0)
+    except ChildProcessError:
+        # Already reaped elsewhere.
+        return process.wait()
+    process.returncode = os.waitstatus_to_exitcode(status)
+    _child_peak = max(_child_peak, usage.ru_maxrss)
+    return process.returncode
+
+def take_child_peak():
+    global _child_peak
+    peak, _child_peak = _child_peak, 0
+    return peak
+
+def note_child_peak(peak):
+    global _child_peak
+    _child_peak = max(_child_peak, peak)
+
+#Spawning
+_background = threading.local()
+
+@contextmanager
+def background(children, **popen_args):
+    # While a built-in job runs in this thread, the programs it starts read /dev/null
+    # unless piped, get popen_args (their own process group) and are added to children.
+    _background.children, _background.popen_args = children, popen_args
+    try:
+        yield
+    finally:
+        _background.children = None
+
+def spawn(argv, **popen_args):
+    # The program is found through the command hash and exec'd directly: no shell, and
+    # no PATH walk once a name has been seen.
+    children = getattr(_background, "children", None)
+    if children is not None:
+        if popen_args.get("stdin") is None:
+            popen_args["stdin"] = subprocess.DEVNULL
+        popen_args = {**_background.popen_args, **popen_args}
+    path = executables.resolve(argv[0])
+    # Whatever a built-in printed so far must come out before the child's output.
+    sys.stdout.flush()
+    try:
+        child = subprocess.Popen(argv, executable=path, **popen_args)
+    except FileNotFoundError:
+        # Remembered location has gone away (uninstalled or moved): search PATH again.
+        executables.commands.forget(argv[0])
+        child = subprocess.Popen(argv, executable=executables.resolve(argv[0]), **popen_args)
+    if children is not None:
+        children.append(child)
+    return child
+
+#Pipelines
+class Pipeline:
+    def __init__(self, commands, stdin=None, stdout=None):
+        self.commands = list(commands)
+        self.stdin = stdin
+        self.stdout = stdout
+        self.processes = []
+        self.statuses = [None] * len(self.commands)
+
+    @property
+    def output(self):
+        # Read end of the last stage, only set when started with stdout=PIPE.
+        last = self.processes[-1] if self.processes else None
+        return last.stdout if last is not None else None
+
+    def start(self):
+        upstream = self.stdin
+        for index, command in enumerate(self.commands):
+            last = index == len(self.commands) - 1
+            process = None
+            try:
+                argv = tokenize(command) if isinstance(command, str) else list(command)
+                if not argv:
+                    raise ValueError("empty command in pipeline")
+                process = spawn(argv, stdin=upstream, stdout=self.stdout if last else subprocess.PIPE)
+            except FileNotFoundError:
+                print(f"Command not found: {_describe(command)}")
+                self.statuses[index] = 127
+            except (OSError, ValueError) as e:
+                print(f"Error starting '{_describe(command)}': {str(e)}")
+                self.statuses[index] = 126
+            finally:
+                # The child holds its own copy of the read end; dropping ours lets
+                # the writer see SIGPIPE as soon as the reader goes away (cmd | head).
+                if upstream is not None and upstream is not self.stdin and hasattr(upstream, "close"):
+                    upstream.close()
+            self.processes.append(process)
+            if process is not None and not last:
+                upstream = process.stdout
+            else:
+                upstream = subprocess.DEVNULL
+        return self
+
+    def wait(self):
+        try:
+            for index, process in enumerate(self.processes):
+                if process is not None:
+                    self.statuses[index] = exit_status(wait(process))
+        except BaseException:
+            self.kill()
+            raise
+        return self.statuses
+
+    def kill(self):
+        for process in self.processes:
+            if process is not None and process.poll() is None:
+                process.kill()
+                process.wait()
+
+def run_pipeline(commands):
+    return Pipeline(commands).start().wait()
+
+def pipeline_failed(statuses):
+    # Upstream stages killed by SIGPIPE are the normal outcome of `cmd | head`.
+    upstream, last = statuses[:-1], statuses[-1]
+    return bool(last) or any(status and not broken_pipe(status) for status in upstream)
+
+#Streaming
+class CaptureBuffer:
+    # Keeps only the newest max_bytes of output so huge logs stay bounded.
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.chunks = deque()
+        self.size = 0
+        self.truncated = False
+        self.lock = threading.Lock()
+
+    def append(self, chunk):
+        with self.lock:
+            self.chunks.append(chunk)
+            self.size += len(chunk)
+            while self.size > self.max_bytes:
+                excess = self.size - self.max_bytes
+                head = self.chunks[0]
+                if len(head) <= excess:
+                    self.chunks.popleft()
+                    self.size -= len(head)
+                else:
+                    self.chunks[0] = head[excess:]
+                    self.size -= excess
+                self.truncated = True
+
+    def getvalue(self):
+        with self.lock:
+            return b"".join(self.chunks)
+
+    def text(self):
+        return self.getvalue().decode(errors="replace")
+
+def _forward(pipe, target, capture):
+    # os.read returns whatever is available, so output shows up as soon as it is written.
+    out = getattr(target, "buffer", None)
+    fd = pipe.fileno()
+    try:
+        while True:
+            chunk = os.read(fd, CHUNK_SIZE)
+            if not chunk:
+                break
+            if out is not None:
+                out.write(chunk)
+                out.flush()
+            else:
+                target.write(chunk.decode(errors="replace"))
+                target.flush()
+            if capture is not None:
+                capture.append(chunk)
+    finally:
+        pipe.close()
+
+def stream_command(command, capture_limit=0):
+    argv = tokenize(command) if isinstance(command, str) else list(command)
+    child = spawn(argv, stdout=subprocess.PIPE, stderr=subprocess.PIPE, bufsize=0)
+    capture = CaptureBuffer(capture_limit) if capture_limit else None
+    readers = [
+        threading.Thread(target=_forward, args=(child.stdout, sys.stdout, capture), daemon=True),
+        threading.Thread(target=_forward, args=(child.stderr, sys.stderr, None), daemon=True),
+    ]
+    sys.stdout.flush()
+    for reader in readers:
+        reader.start()
+    try:
+        returncode = wait(child)
+    except BaseException:
+        child.kill()
+        child.wait()
+        raise
+    finally:
+        for reader in readers:
+            reader.join()
+    return exit_status(returncode), capture
@@ -0,0 +1,194 @@
+#Imports
+import argparse
+import cProfile
+import os
+import pstats
+import shlex
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+
+from vterm_core import process
+from vterm_core.arguments import CommandParser, UsageError
+from vterm_core.config import env_flag
+from vterm_core.progress import format_size
+from vterm_core.pyrepl import format_time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Newest latencies kept per command for the percentiles.
+RECENT_SAMPLES = 1024
+
+profile_parser = CommandParser("profile")
+profile_parser.add_argument("-n", dest="count", type=int, default=20)
+profile_parser.add_argument("-s", dest="sort", choices=("cumulative", "tottime", "calls"), default="cumulative")
+profile_parser.add_argument("-o", dest="output")
+profile_parser.add_argument("command", nargs=argparse.REMAINDER)
+
+#Helpers
+def command_line(args):
+    # `time "ls | grep x"`: a single argument is a whole line, so pipelines can be timed.
+    if len(args) == 1:
+        return args[0]
+    if os.name == "nt":
+        return subprocess.list2cmdline(args)
+    return shlex.join(args)
+
+def cpu_times():
+    # User and system time of vTerm plus the programs it has waited for.
+    times = os.times()
+    return times.user + times.children_user, times.system + times.children_system
+
+def rss_bytes(maxrss):
+    # ru_maxrss is in kilobytes, except on macOS.
+    return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+def peak_rss():
+    # vTerm's own high-water mark in bytes over the whole session; None where unknown.
+    if resource is None:
+        return None
+    return rss_bytes(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+
+#time
+def time_command(registry, args):
+    if not args:
+        raise UsageError("nothing to time")
+    user, system = cpu_times()
+    before = peak_rss()
+    outer = process.take_child_peak()
+    started = time.perf_counter()
+    try:
+        return registry.execute(command_line(args))
+    finally:
+        wall = time.perf_counter() - started
+        after_user, after_system = cpu_times()
+        child = process.take_child_peak()
+        process.note_child_peak(max(outer, child))
+        after = peak_rss()
+        print(f"real  {format_time(wall)}")
+        print(f"user  {format_time(after_user - user)}")
+        print(f"sys   {format_time(after_system - system)}")
+        # A child's count starts from the vTerm image it was forked from, so below
+        # vTerm's own peak it says nothing about the program.
+        if child and (before is None or rss_bytes(child) > before):
+            print(f"peak RSS  {format_size(rss_bytes(child))} (largest program run)")
+        # Built-ins run inside vTerm, whose peak only shows when this command raised it.
+        if after is not None and after > before:
+            print(f"vTerm peak RSS  {format_size(after)} (session high-water mark)")
+
+#profile
+def profile_command(registry, args):
+    options = profile_parser.parse_args(args)
+    if not options.command:
+        raise UsageError("nothing to profile")
+    if options.count < 1:
+        raise UsageError("-n needs a positive count")
+    # cProfile follows the calling thread only: worker threads (grep -j, copy) show up
+    # as time spent waiting for them.
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        status = registry.execute(command_line(options.command))
+    finally:
+        profiler.disable()
+    stats = pstats.Stats(profiler, stream=sys.stdout)
+    if options.output:
+        stats.dump_stats(options.output)
+        print(f"Profile saved to {options.output}")
+    stats.strip_dirs().sort_stats(options.sort).print_stats(options.count)
+    return status
+
+#Latency ledger
+class LatencyLedger:
+    # Registered as an observer, it gets (name, seconds, status) after every command
+    # and keeps running totals plus the newest samples per name. Recording is a lock
+    # and a few additions, so it can stay on all session.
+    def __init__(self, samples=RECENT_SAMPLES):
+        self.samples = samples
+        self.stats = {}
+        self.lock = threading.Lock()
+        self.sources = []
+
+    @property
+    def enabled(self):
+        return bool(self.sources)
+
+    def enable(self, *sources):
+        for source in sources:
+            if source is not None and self.record not in source.observers:
+                source.observers.append(self.record)
+                self.sources.append(source)
+
+    def disable(self):
+        for source in self.sources:
+            if self.record in source.observers:
+                source.observers.remove(self.record)
+        self.sources.clear()
+
+    def record(self, name, seconds, status=0):
+        with self.lock:
+            entry = self.stats.get(name)
+            if entry is None:
+                entry = self.stats[name] = [0, 0.0, 0.0, 0, deque(maxlen=self.samples)]
+            entry[0] += 1
+            entry[1] += seconds
+            if seconds > entry[2]:
+                entry[2] = seconds
+            if status:
+                entry[3] += 1
+            entry[4].append(seconds)
+
+    def reset(self):
+        with self.lock:
+            self.stats.clear()
+
+    def summary(self):
+        # [(name, count, total, mean, p50, p95, max, failures)], slowest total first.
+        rows = []
+        with self.lock:
+            for name, (count, total, worst, failures, recent) in self.stats.items():
+                ordered = sorted(recent)
+                p50 = ordered[len(ordered) // 2]
+                p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+                rows.append((name, count, total, total / count, p50, p95, worst, failures))
+        rows.sort(key=lambda row: row[2], reverse=True)
+        return rows
+
+    def report(self):
+        rows = self.summary()
+        if not rows:
+            print("No commands recorded." if self.enabled else "The latency ledger is off ('ledger on').")
+            return 1
+        width = max(len("command"), *(len(row[0]) for row in rows))
+        print(f"{'command':<{width}}  {'count':>6}  {'total':>9}  {'mean':>9}  {'p50':>9}  {'p95':>9}"
+              f"  {'max':>9}  {'failed':>6}")
+        for name, count, total, mean, p50, p95, worst, failures in rows:
+            print(f"{name:<{width}}  {count:>6}  {format_time(total):>9}  {format_time(mean):>9}"
+                  f"  {format_time(p50):>9}  {format_time(p95):>9}  {format_time(worst):>9}  {failures:>6}")
+        return 0
+
+ledger = LatencyLedger()
+
+def ledger_command(args, sources):
+    action = args[0] if args else "show"
+    if action == "on":
+        ledger.enable(*sources)
+        print("Latency ledger on.")
+    elif action == "off":
+        ledger.disable()
+        print("Latency ledger off.")
+    elif action == "reset":
+        ledger.reset()
+    elif action == "show":
+        return ledger.report()
+    else:
+        raise UsageError(f"unknown action '{action}'")
+
+def enable_from_environment(*sources):
+    if env_flag("VTERM_LEDGER"):
+        ledger.enable(*sources)
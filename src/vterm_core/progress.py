@@ -0,0 +1,80 @@
+#Imports
+import sys
+import threading
+import time
+
+#Formatting
+def format_size(size):
+    for unit in ("B", "KiB", "MiB", "GiB", "TiB"):
+        if abs(size) < 1024 or unit == "TiB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+def format_duration(seconds):
+    if seconds < 1:
+        return f"{seconds * 1000:.0f} ms"
+    if seconds < 60:
+        return f"{seconds:.2f} s"
+    minutes, seconds = divmod(int(seconds), 60)
+    return f"{minutes}m{seconds:02d}s"
+
+#Progress line
+class Progress:
+    # Worker threads bump the counters; a single reporter thread redraws one status
+    # line a few times a second, so progress costs nothing per file.
+    def __init__(self, label, interval=0.2, stream=None, enabled=None):
+        self.label = label
+        self.interval = interval
+        self.stream = stream or sys.stdout
+        if enabled is None:
+            enabled = hasattr(self.stream, "isatty") and self.stream.isatty()
+        self.enabled = enabled
+        self.files = 0
+        self.bytes = 0
+        self.skipped = 0
+        self.errors = 0
+        self.lock = threading.Lock()
+        self.started = time.perf_counter()
+        self.done = threading.Event()
+        self.thread = None
+
+    def add(self, files=1, nbytes=0, skipped=0, errors=0):
+        with self.lock:
+            self.files += files
+            self.bytes += nbytes
+            self.skipped += skipped
+            self.errors += errors
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def render(self):
+        elapsed = max(self.elapsed(), 1e-9)
+        text = f"{self.label}: {self.files} files"
+        if self.bytes:
+            text += f", {format_size(self.bytes)} ({format_size(self.bytes / elapsed)}/s)"
+        else:
+            text += f" ({self.files / elapsed:.0f} files/s)"
+        if self.skipped:
+            text += f", {self.skipped} unchanged"
+        if self.errors:
+            text += f", {self.errors} errors"
+        return text
+
+    def start(self):
+        if self.enabled:
+            self.thread = threading.Thread(target=self._run, name="vterm-progress", daemon=True)
+            self.thread.start()
+        return self
+
+    def _run(self):
+        while not self.done.wait(self.interval):
+            self.stream.write("\r" + self.render() + "\033[K")
+            self.stream.flush()
+
+    def stop(self):
+        self.done.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.stream.write("\r\033[K")
+            self.stream.flush()
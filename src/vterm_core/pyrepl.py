@@ -0,0 +1,148 @@
+#Imports
+import ast
+import builtins
+import time
+import timeit
+import traceback
+from collections import OrderedDict
+
+CACHE_SIZE = 256
+TIMEIT_REPEAT = 5
+# What restricted sessions (the macOS and Windows builds) refuse to run. This keeps a
+# typo or pasted snippet from touching files and processes; it is a best-effort
+# guard against accidents, not a sandbox for untrusted code.
+RESTRICTED_MODULES = {"os", "posix", "nt", "subprocess", "shutil", "sys", "ctypes", "multiprocessing",
+                      "pty", "signal", "socket", "importlib", "_thread", "threading", "builtins", "io", "_io",
+                      "pathlib", "runpy", "code", "codeop", "tempfile", "fileinput", "pickle", "marshal",
+                      "shelve", "gc", "inspect", "types", "asyncio", "concurrent", "webbrowser", "pdb"}
+# Refused both as names and as attributes (`builtins.eval`, `io.open`).
+RESTRICTED_NAMES = {"__import__", "eval", "exec", "compile", "globals", "vars", "getattr", "setattr",
+                    "delattr", "open", "breakpoint", "import_module", "system", "popen", "unlink",
+                    "rmdir", "rmtree", "write_text", "write_bytes"}
+
+#Restricted mode
+class RestrictedChecker(ast.NodeVisitor):
+    # Looks at what the code does, not how it is spelled: `import os as o`,
+    # `__import__("os")` and `().__class__.__bases__` are all caught.
+    def fail(self, node):
+        raise ValueError("Command contains restricted operations.")
+
+    def visit_Import(self, node):
+        for alias in node.names:
+            if alias.name.split(".")[0] in RESTRICTED_MODULES:
+                self.fail(node)
+
+    def visit_ImportFrom(self, node):
+        if node.level or (node.module or "").split(".")[0] in RESTRICTED_MODULES:
+            self.fail(node)
+
+    def visit_Name(self, node):
+        if node.id in RESTRICTED_NAMES or node.id.startswith("__"):
+            self.fail(node)
+
+    def visit_Attribute(self, node):
+        if node.attr.startswith("_") or node.attr in RESTRICTED_NAMES:
+            self.fail(node)
+        self.generic_visit(node)
+
+def check_restricted(tree):
+    RestrictedChecker().visit(tree)
+
+#Session
+def format_time(seconds):
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3g} {unit}"
+    return f"{seconds / 1e-9:.3g} ns"
+
+def _split_magics(source):
+    # Yields (magic, text) pieces in order; ordinary code comes through with magic None.
+    block = []
+    for line in source.splitlines():
+        stripped = line.strip()
+        if stripped.startswith("%time ") or stripped.startswith("%timeit "):
+            if block:
+                yield None, "\n".join(block)
+                block = []
+            magic, _, statement = stripped.partition(" ")
+            yield magic[1:], statement.strip()
+        else:
+            block.append(line)
+    if block:
+        yield None, "\n".join(block)
+
+class PythonSession:
+    # Variables, imports and functions stay defined from one `python` block to the
+    # next. Compiled code is cached by source, so re-running a block (or a %timeit
+    # statement) skips parsing and compiling.
+    def __init__(self, restricted=False, cache_size=CACHE_SIZE):
+        self.restricted = restricted
+        self.namespace = {"__name__": "__vterm__", "__builtins__": builtins}
+        self.cache = OrderedDict()
+        self.cache_size = cache_size
+
+    def compile(self, source, split=True):
+        # Returns (body, last expression or None): like the interactive interpreter,
+        # a block ending in an expression shows that expression's value.
+        key = (source, split)
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.cache.move_to_end(key)
+            return cached
+        tree = ast.parse(source, "<vterm>", "exec")
+        if self.restricted:
+            check_restricted(tree)
+        expression = None
+        if split and tree.body and isinstance(tree.body[-1], ast.Expr):
+            expression = compile(ast.Expression(tree.body.pop().value), "<vterm>", "eval")
+        compiled = (compile(tree, "<vterm>", "exec"), expression)
+        self.cache[key] = compiled
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return compiled
+
+    def execute(self, source):
+        body, expression = self.compile(source)
+        exec(body, self.namespace)
+        if expression is not None:
+            value = eval(expression, self.namespace)
+            if value is not None:
+                self.namespace["_"] = value
+                print(repr(value))
+
+    def time(self, statement):
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            self.execute(statement)
+        finally:
+            wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+            print(f"CPU time: {format_time(cpu)}, Wall time: {format_time(wall)}")
+
+    def timeit(self, statement):
+        # The timed code object comes from the cache; only the loop is timeit's.
+        code, _ = self.compile(statement, split=False)
+        namespace = self.namespace
+        timer = timeit.Timer(lambda: exec(code, namespace))
+        loops, _ = timer.autorange()
+        best = min(timer.repeat(TIMEIT_REPEAT, loops)) / loops
+        print(f"{loops} loops, best of {TIMEIT_REPEAT}: {format_time(best)} per loop")
+
+    def run(self, source):
+        for magic, text in _split_magics(source):
+            if not text.strip():
+                continue
+            try:
+                if magic == "time":
+                    self.time(text)
+                elif magic == "timeit":
+                    self.timeit(text)
+                else:
+                    self.execute(text)
+            except KeyboardInterrupt:
+                print("KeyboardInterrupt")
+                return 130
+            except Exception as e:
+                # Later pieces usually depend on the one that failed, so stop here.
+                print("".join(traceback.format_exception_only(type(e), e)).rstrip())
+                return 1
+        return 0
@@ -0,0 +1,177 @@
+#Imports
+import time
+
+from vterm_core.arguments import UsageError
+from vterm_core.parsing import split_background, split_pipeline, split_sequence, tokenize
+
+#Exit
+class ShellExit(Exception):
+    def __init__(self, status=0):
+        super().__init__(status)
+        self.status = status
+
+#Registry
+def command_name(line):
+    # What observers file a line under: its command, or "pipeline" for a multi-stage line.
+    if "|" in line and len(split_pipeline(line)) > 1:
+        return "pipeline"
+    words = line.split(None, 1)
+    return words[0] if words else None
+
+class Command:
+    def __init__(self, name, handler, help, usage=None, aliases=(), min_args=0, stdin=False):
+        self.name = name
+        self.handler = handler
+        self.help = help
+        self.usage = usage or name
+        self.aliases = tuple(aliases)
+        self.min_args = min_args
+        # Handlers that set stdin=True read piped input from a binary stream.
+        self.stdin = stdin
+
+    def describe(self):
+        text = f"{self.help} Usage: {self.usage}"
+        if self.aliases:
+            text += f" (also: {', '.join(self.aliases)})"
+        return text
+
+class CommandRegistry:
+    # One dict lookup per line, whatever the number of commands.
+    def __init__(self):
+        self.commands = {}
+        self.table = {}
+        self.on_error = None
+        self.pipeline_runner = None
+        self.background_runner = None
+        self.fallback = None
+        # Called with (name, seconds, status) after each command line; see profiling.LatencyLedger.
+        self.observers = []
+
+    def register(self, name, handler, help, usage=None, aliases=(), min_args=0, stdin=False):
+        # Registering a name again replaces it, so a platform can override a shared built-in.
+        previous = self.commands.get(name)
+        if previous is not None:
+            for alias in previous.aliases:
+                self.table.pop(alias, None)
+        command = Command(name, handler, help, usage, aliases, min_args, stdin)
+        self.commands[name] = command
+        self.table[name] = command
+        for alias in command.aliases:
+            self.table[alias] = command
+        return command
+
+    def command(self, name, help, usage=None, aliases=(), min_args=0, stdin=False):
+        def decorator(handler):
+            self.register(name, handler, help, usage, aliases, min_args, stdin)
+            return handler
+        return decorator
+
+    def alias(self, alias, name):
+        command = self.commands[name]
+        command.aliases += (alias,)
+        self.table[alias] = command
+
+    def lookup(self, name):
+        command = self.table.get(name)
+        if command is None:
+            command = self.table.get(name.lower())
+        return command
+
+    def names(self):
+        return sorted(self.table)
+
+    def help_table(self):
+        return {name: command.describe() for name, command in self.commands.items()}
+
+    def error(self):
+        if self.on_error is not None:
+            self.on_error()
+
+    def execute(self, line):
+        if ";" in line:
+            commands = split_sequence(line)
+            if len(commands) > 1:
+                status = 0
+                for command in commands:
+                    status = self.execute(command)
+                return status
+        if not self.observers:
+            return self._execute(line)
+        started = time.perf_counter()
+        status = self._execute(line)
+        elapsed = time.perf_counter() - started
+        name = command_name(line)
+        if name:
+            for observer in self.observers:
+                observer(name, elapsed, status)
+        return status
+
+    def _execute(self, line):
+        line, background = split_background(line)
+        if background:
+            if not line:
+                print("Syntax error: nothing to run in the background")
+                self.error()
+                return 2
+            if self.background_runner is None:
+                print("Background jobs are not available")
+                self.error()
+                return 2
+            return self._finish(self.background_runner(line))
+        try:
+            stages = split_pipeline(line)
+            if len(stages) > 1:
+                if not all(stages):
+                    print("Syntax error: empty command in pipeline")
+                    self.error()
+                    return 2
+                return self._finish(self.pipeline_runner(stages))
+            argv = tokenize(line)
+        except ValueError as e:
+            print(f"Syntax error: {str(e)}")
+            self.error()
+            return 2
+        if not argv:
+            return 0
+        return self.run(argv, line)
+
+    def run(self, argv, line=None, stdin=None):
+        command = self.lookup(argv[0])
+        if command is None:
+            if self.fallback is None:
+                print(f"Command not found: {argv[0]}")
+                return 127
+            return self.fallback(argv, line if line is not None else " ".join(argv))
+        args = argv[1:]
+        if len(args) < command.min_args:
+            print(f"Argument needed. Usage: {command.usage}")
+            self.error()
+            return 2
+        try:
+            if command.stdin:
+                status = command.handler(args, stdin=stdin)
+            else:
+                status = command.handler(args)
+        except UsageError as e:
+            print(f"{command.name}: {str(e)}")
+            print(f"Usage: {command.usage}")
+            self.error()
+            return 2
+        except BrokenPipeError:
+            # The reader went away (vterm -c ... | head): nothing more can be printed.
+            raise
+        except OSError as e:
+            # Last resort, so a file error a built-in didn't expect never ends the session.
+            where = f"{e.filename}: " if e.filename is not None else ""
+            print(f"{command.name}: {where}{e.strerror or str(e)}")
+            self.error()
+            return 1
+        return self._finish(status)
+
+    def _finish(self, status):
+        if isinstance(status, list):
+            status = status[-1] if status else 0
+        status = status or 0
+        if status:
+            self.error()
+        return status
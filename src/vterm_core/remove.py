@@ -0,0 +1,207 @@
+#Imports
+import glob
+import os
+import stat
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from vterm_core import jobs
+from vterm_core.arguments import CommandParser, UsageError
+from vterm_core.progress import Progress, format_duration, format_size
+
+DEFAULT_JOBS = min(32, (os.cpu_count() or 1) * 4)
+
+parser = CommandParser("rm")
+parser.add_argument("-r", "-R", dest="recursive", action="store_true")
+parser.add_argument("-f", dest="force", action="store_true")
+parser.add_argument("-n", "--dry-run", dest="dry_run", action="store_true")
+parser.add_argument("-v", dest="verbose", action="store_true")
+parser.add_argument("-q", dest="quiet", action="store_true")
+parser.add_argument("-j", dest="jobs", type=int, default=DEFAULT_JOBS)
+parser.add_argument("targets", nargs="+")
+
+#Targets
+def expand_targets(patterns):
+    # Returns (paths, unmatched patterns); only patterns with wildcards are globbed.
+    paths = []
+    unmatched = []
+    for pattern in patterns:
+        if any(char in pattern for char in "*?["):
+            matches = sorted(glob.glob(pattern))
+            if matches:
+                paths.extend(matches)
+            else:
+                unmatched.append(pattern)
+        else:
+            paths.append(pattern)
+    return paths, unmatched
+
+def protected(path):
+    # Never delete the filesystem root, or the current directory or anything above it.
+    resolved = os.path.abspath(path)
+    if os.path.basename(os.path.normpath(path)) in (".", "..") or resolved == os.path.dirname(resolved):
+        return True
+    if os.path.islink(path):
+        # A link is removed as a link: what it points to is never touched.
+        return False
+    if os.path.join(os.getcwd(), "").startswith(os.path.join(resolved, "")):
+        return True
+    try:
+        return os.path.samefile(resolved, os.getcwd())
+    except OSError:
+        return False
+
+#Removing
+def _unlink(path):
+    try:
+        os.unlink(path)
+    except PermissionError:
+        if os.name != "nt":
+            raise
+        # Windows refuses to delete read-only files.
+        os.chmod(path, stat.S_IWRITE)
+        os.unlink(path)
+
+class TreeRemover:
+    def __init__(self, jobs=DEFAULT_JOBS, dry_run=False, verbose=False, progress=None):
+        self.jobs = jobs
+        self.dry_run = dry_run
+        self.verbose = verbose
+        self.progress = progress or Progress("Removing", enabled=False)
+        self.directories = 0
+        self.errors = []
+        self.lock = threading.Lock()
+        self.slots = threading.BoundedSemaphore(jobs * 16)
+
+    def _fail(self, path, error):
+        with self.lock:
+            self.errors.append((path, error))
+        self.progress.add(files=0, errors=1)
+
+    def _report(self, path):
+        if self.verbose or self.dry_run:
+            with self.lock:
+                print(("would remove " if self.dry_run else "removed ") + path)
+
+    def _remove_file(self, path, size):
+        try:
+            if jobs.stop_requested():
+                return
+            if not self.dry_run:
+                _unlink(path)
+            self.progress.add(nbytes=size if self.dry_run else 0)
+            self._report(path)
+        except OSError as e:
+            self._fail(path, e)
+        finally:
+            self.slots.release()
+
+    def _remove_directory(self, path):
+        try:
+            if not self.dry_run:
+                os.rmdir(path)
+            with self.lock:
+                self.directories += 1
+            self._report(path + os.sep)
+        except OSError as e:
+            self._fail(path, e)
+
+    def _submit(self, pool, path, size):
+        jobs.check_stop()
+        self.slots.acquire()
+        pool.submit(self._remove_file, path, size)
+
+    def remove(self, paths):
+        with ThreadPoolExecutor(max_workers=self.jobs, thread_name_prefix="vterm-rm",
+                                initializer=jobs.inherit_stop()) as pool:
+            # Files go to the pool while the walk continues; directories are kept by depth.
+            levels = []
+            for path in paths:
+                if os.path.isdir(path) and not os.path.islink(path):
+                    self._walk(pool, path, levels)
+                else:
+                    self._submit(pool, path, self._size(path))
+        # Every file is gone once the pool has shut down; empty directories are then
+        # removed deepest level first, each level in parallel.
+        if levels:
+            with ThreadPoolExecutor(max_workers=self.jobs, thread_name_prefix="vterm-rm") as pool:
+                for level in reversed(levels):
+                    jobs.check_stop()
+                    list(pool.map(self._remove_directory, level))
+        return self.errors
+
+    def _size(self, path):
+        if not self.dry_run:
+            return 0
+        try:
+            return os.lstat(path).st_size
+        except OSError:
+            return 0
+
+    def _walk(self, pool, root, levels):
+        stack = [(root, 0)]
+        while stack:
+            jobs.check_stop()
+            directory, depth = stack.pop()
+            while len(levels) <= depth:
+                levels.append([])
+            levels[depth].append(directory)
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append((entry.path, depth + 1))
+                        else:
+                            size = entry.stat(follow_symlinks=False).st_size if self.dry_run else 0
+                            self._submit(pool, entry.path, size)
+            except OSError as e:
+                self._fail(directory, e)
+
+#Command
+def command(args):
+    options = parser.parse_args(args)
+    if options.jobs < 1:
+        raise UsageError("-j needs at least one worker")
+    paths, unmatched = expand_targets(options.targets)
+    failed = False
+    if not options.force:
+        for pattern in unmatched:
+            print(f"File or directory not found: {pattern}")
+            failed = True
+    targets = []
+    for path in paths:
+        if not os.path.lexists(path):
+            if not options.force:
+                print(f"File or directory not found: {path}")
+                failed = True
+        elif os.path.isdir(path) and not os.path.islink(path) and not options.recursive:
+            print(f"{path} is a directory. Use rm -r to remove it and its contents.")
+            failed = True
+        elif protected(path):
+            print(f"Refusing to remove '{path}'")
+            failed = True
+        else:
+            targets.append(path)
+    if not targets:
+        return 1 if failed else 0
+
+    progress = Progress("Scanning" if options.dry_run else "Removing",
+                        enabled=False if options.quiet or options.verbose or options.dry_run else None).start()
+    remover = TreeRemover(options.jobs, options.dry_run, options.verbose, progress)
+    try:
+        errors = remover.remove(targets)
+    finally:
+        progress.stop()
+    elapsed = progress.elapsed()
+    files = progress.files
+    for path, error in errors[:10]:
+        print(f"Error removing {path}: {error.strerror or str(error)}")
+    if len(errors) > 10:
+        print(f"... and {len(errors) - 10} more errors")
+    if options.dry_run:
+        print(f"Would remove {files} files and {remover.directories} directories ({format_size(progress.bytes)})")
+    elif not options.quiet:
+        rate = files / max(elapsed, 1e-9)
+        print(f"Removed {files} files and {remover.directories} directories "
+              f"in {format_duration(elapsed)} ({rate:.0f} files/s)")
+    return 1 if failed or errors else 0
@@ -0,0 +1,32 @@
+#Imports
+import time
+
+#Startup timing
+class StartupTimer:
+    def __init__(self, started=None):
+        self.started = started if started is not None else time.perf_counter()
+        self.last = self.started
+        self.phases = []
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last))
+        self.last = now
+
+    def total(self):
+        return self.last - self.started
+
+    def over_budget(self, budget_ms):
+        return budget_ms is not None and self.total() * 1000 > budget_ms
+
+    def report(self, budget_ms=None):
+        print("Startup timing:")
+        for phase, seconds in self.phases:
+            print(f"  {phase:<14}{seconds * 1000:9.1f} ms")
+        print(f"  {'total':<14}{self.total() * 1000:9.1f} ms")
+        if budget_ms is not None:
+            if self.over_budget(budget_ms):
+                print(f"  Over the startup budget of {budget_ms:g} ms!")
+            else:
+                print(f"  Within the startup budget of {budget_ms:g} ms.")
+        print()
@@ -0,0 +1,51 @@
+#Imports
+import sys
+import threading
+from contextlib import contextmanager, redirect_stdout
+
+#Thread-routed stdout
+class ThreadRoutedStream:
+    # Stands in for sys.stdout so each thread can have its own output: a built-in
+    # running as a background job prints into its job, while the REPL thread keeps
+    # the terminal. Threads without a route write to the original stream.
+    def __init__(self, default):
+        self.default = default
+        self.local = threading.local()
+
+    def target(self):
+        return getattr(self.local, "target", None) or self.default
+
+    def __getattr__(self, name):
+        return getattr(self.target(), name)
+
+    def write(self, text):
+        return self.target().write(text)
+
+    def flush(self):
+        return self.target().flush()
+
+def install():
+    if not isinstance(sys.stdout, ThreadRoutedStream):
+        sys.stdout = ThreadRoutedStream(sys.stdout)
+    return sys.stdout
+
+def terminal():
+    # The real stdout, whatever the current thread is routed to.
+    stream = sys.stdout
+    return stream.default if isinstance(stream, ThreadRoutedStream) else stream
+
+@contextmanager
+def redirect(target):
+    # Sends this thread's output to `target`. Without the router installed this is
+    # plain redirect_stdout (no other thread is printing anyway).
+    stream = sys.stdout
+    if not isinstance(stream, ThreadRoutedStream):
+        with redirect_stdout(target):
+            yield target
+        return
+    previous = getattr(stream.local, "target", None)
+    stream.local.target = target
+    try:
+        yield target
+    finally:
+        stream.local.target = previous
@@ -0,0 +1,104 @@
+#Imports
+import threading
+from collections import Counter, defaultdict
+from difflib import get_close_matches
+
+from vterm_core.executables import directory_stamp, path_directories, scan_executables
+
+SHORTLIST = 32
+CUTOFF = 0.6
+
+#Trigrams
+def trigrams(word):
+    # Padded, so short names and the first and last letters still count.
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+#Index
+class SuggestionIndex:
+    # Candidates come from sources (the built-ins and each PATH directory). A source
+    # is re-read only when it changes: the built-ins when the registry does, a PATH
+    # directory when its mtime does. Only the names that came or went touch the index.
+    def __init__(self, registry=None):
+        self.registry = registry
+        self.sources = {}
+        self.references = Counter()
+        self.postings = defaultdict(set)
+        self.by_length = defaultdict(set)
+        self.sizes = {}
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.references)
+
+    def _add(self, name):
+        self.references[name] += 1
+        if self.references[name] == 1:
+            grams = trigrams(name)
+            for gram in grams:
+                self.postings[gram].add(name)
+            self.sizes[name] = len(grams)
+            self.by_length[len(name)].add(name)
+
+    def _remove(self, name):
+        self.references[name] -= 1
+        if self.references[name] <= 0:
+            del self.references[name]
+            del self.sizes[name]
+            for gram in trigrams(name):
+                self.postings[gram].discard(name)
+            self.by_length[len(name)].discard(name)
+
+    def _update(self, key, stamp, read):
+        previous = self.sources.get(key)
+        if previous is not None and previous[0] == stamp:
+            return
+        try:
+            names = read()
+        except OSError:
+            names = set()
+        old = previous[1] if previous is not None else set()
+        for name in old - names:
+            self._remove(name)
+        for name in names - old:
+            self._add(name)
+        self.sources[key] = (stamp, names)
+
+    def _drop(self, key):
+        for name in self.sources.pop(key)[1]:
+            self._remove(name)
+
+    def refresh(self):
+        with self.lock:
+            if self.registry is not None:
+                names = tuple(self.registry.table)
+                self._update("builtins", names, lambda: set(names))
+            directories = path_directories()
+            for key in [key for key in self.sources if key != "builtins" and key not in directories]:
+                self._drop(key)
+            for directory in directories:
+                stamp = directory_stamp(directory)
+                self._update(directory, stamp, lambda: scan_executables(directory) if stamp is not None else set())
+
+    def warm(self):
+        # Builds the index off the main thread so the first typo does not pay for the PATH scan.
+        threading.Thread(target=self.refresh, name="vterm-suggest", daemon=True).start()
+
+    def lookup(self, word, n=3, cutoff=CUTOFF):
+        self.refresh()
+        grams = trigrams(word)
+        with self.lock:
+            shared = Counter()
+            for gram in grams:
+                shared.update(self.postings.get(gram, ()))
+            # Ranked by Dice overlap, not raw counts: a long name sharing every trigram
+            # ("python3.11-config" for "pythn") must not crowd out a close short one.
+            scores = {name: 2 * count / (len(grams) + self.sizes[name]) for name, count in shared.items()}
+            shortlist = sorted(scores, key=lambda name: (-scores[name], name))[:SHORTLIST]
+            if len(word) <= 4:
+                # Trigrams barely overlap on very short names ("sl" for "ls"), so those
+                # are compared by length instead.
+                for length in range(max(len(word) - 1, 1), len(word) + 2):
+                    shortlist.extend(self.by_length.get(length, ()))
+        # The final ranking is the same ratio difflib always used, over a few dozen names.
+        return get_close_matches(word, set(shortlist), n=n, cutoff=cutoff)
@@ -0,0 +1,17 @@
+#Imports
+import os
+import sys
+
+import pytest
+
+# The shared package lives in src/, next to the platform front-ends.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+from vterm_core.builtins import register_builtins  # noqa: E402
+from vterm_core.registry import CommandRegistry  # noqa: E402
+
+@pytest.fixture
+def shell():
+    # A registry with every shared built-in, as the front-ends set it up.
+    registry = CommandRegistry()
+    register_builtins(registry)
+    return registry
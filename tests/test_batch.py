@@ -0,0 +1,79 @@
+#Imports
+import os
+import subprocess
+import sys
+
+import pytest
+
+from vterm_core import batch, cli
+from vterm_core.registry import ShellExit
+
+FRONT_END = {"linux": "Linux", "darwin": "macOS", "win32": "Windows"}.get(sys.platform)
+
+@pytest.fixture
+def shell(shell):
+    ran = shell.ran = []
+
+    @shell.command("status", "Return STATUS.", usage="status N", min_args=1)
+    def status_command(args):
+        ran.append(" ".join(args))
+        return int(args[0])
+
+    @shell.command("exit", "Exit with STATUS.", usage="exit [STATUS]")
+    def exit_command(args):
+        raise ShellExit(int(args[0]) if args else 0)
+
+    return shell
+
+#Exit status
+def test_the_status_of_the_last_command(shell):
+    assert batch.run_lines(shell, ["status 3", "status 0"]) == 0
+    assert batch.run_lines(shell, ["status 0", "status 4"]) == 4
+    assert batch.run_lines(shell, ["status 4; status 5"]) == 5
+    assert batch.run_lines(shell, []) == 0
+
+def test_comments_and_blank_lines_are_skipped(shell):
+    assert batch.run_lines(shell, ["# status 1", "", "   ", "status 2", "# status 0"]) == 2
+    assert shell.ran == ["2"]
+
+def test_exit_stops_the_script(shell):
+    assert batch.run_lines(shell, ["status 1", "exit 7", "status 0"]) == 7
+    assert batch.run_lines(shell, ["exit"]) == 0
+    assert shell.ran == ["1"]
+
+def test_errexit_stops_at_the_first_failure(shell):
+    assert batch.run_lines(shell, ["status 0", "status 3", "status 0"], errexit=True) == 3
+    assert shell.ran == ["0", "3"]
+
+def test_errexit_applies_inside_a_sequence(shell):
+    assert batch.run_lines(shell, ["status 2; exit 5"], errexit=True) == 2
+    assert batch.run_lines(shell, ["status 0 'a;b'"], errexit=True) == 0
+    assert shell.ran == ["2", "0 a;b"]
+
+def test_a_missing_script(shell, tmp_path, capsys):
+    options = cli.parse_args([str(tmp_path / "missing.vt")])
+    assert batch.run(shell, options) == 127
+    assert "missing.vt" in capsys.readouterr().err
+
+def test_scripts_and_commands(shell, tmp_path):
+    script = tmp_path / "script.vt"
+    script.write_text("# setup\nstatus 0\nstatus 6\n")
+    assert batch.run(shell, cli.parse_args([str(script)])) == 6
+    assert batch.run(shell, cli.parse_args(["-c", "status 1\nstatus 2"])) == 2
+    assert batch.run(shell, cli.parse_args(["-e", "-c", "status 1; status 2"])) == 1
+
+#Front-end
+@pytest.mark.skipif(FRONT_END is None, reason="no front-end for this platform")
+@pytest.mark.parametrize("args, stdin, status", [
+    (["-c", "ls ."], None, 0),
+    (["-c", "ls missing-path; exit 5"], None, 5),
+    (["-e", "-c", "ls missing-path; exit 5"], None, 1),
+    (["-c", "no-such-command-here"], None, 127),
+    ([], "ls .\nexit 3\n", 3),
+])
+def test_exit_status_of_vterm(tmp_path, args, stdin, status):
+    script = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src", FRONT_END, "vterm.py")
+    env = dict(os.environ, VTERM_HEADLESS="1", VTERM_HOME=str(tmp_path))
+    result = subprocess.run([sys.executable, script] + args, input=stdin or "", cwd=tmp_path, env=env,
+                            capture_output=True, text=True, timeout=60)
+    assert result.returncode == status
@@ -0,0 +1,79 @@
+#Imports
+import os
+
+import pytest
+
+from vterm_core import completion, fsindex
+
+@pytest.fixture
+def directory(tmp_path, monkeypatch):
+    (tmp_path / "src" / "deep" / "deeper").mkdir(parents=True)
+    (tmp_path / "docs").mkdir()
+    (tmp_path / "setup.py").write_text("")
+    (tmp_path / "setup.cfg").write_text("")
+    (tmp_path / ".env").write_text("")
+    (tmp_path / "src" / "deep" / "deeper" / "needle.txt").write_text("")
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+@pytest.fixture
+def completer(shell):
+    return completion.Completer(shell)
+
+def complete(completer, line):
+    begin = max(line.rfind(char) for char in completion.DELIMITERS) + 1
+    return completer.candidates(line, begin, line[begin:])
+
+#Trie
+def test_trie_completes_prefixes():
+    trie = completion.Trie(["grep", "git", "go", "cd", "g\U0010ffff"])
+    assert trie.complete("g") == ["git", "go", "grep", "g\U0010ffff"]
+    assert trie.complete("gi") == ["git"]
+    assert trie.complete("gx") == []
+    assert trie.complete("") == ["cd", "git", "go", "grep", "g\U0010ffff"]
+    assert trie.complete("gi") == ["git"]
+    assert len(trie) == 5
+
+#Directory cache
+def test_directories_are_read_again_only_when_changed(directory):
+    cache = completion.DirectoryCache()
+    first = cache.lookup(".")[0]
+    assert cache.lookup(".")[0] is first
+    os.mkdir(directory / "new")
+    os.utime(directory, ns=(0, os.stat(directory).st_mtime_ns + 10 ** 9))
+    assert cache.lookup(".")[0] is not first
+    assert "new" + os.sep in cache.lookup(".")[0].complete("n")
+    assert cache.lookup("missing") is None
+
+def test_the_cache_keeps_the_newest_directories(directory):
+    cache = completion.DirectoryCache(size=2)
+    for path in ("src", "docs", "."):
+        cache.lookup(path)
+    assert list(cache.entries) == [str(directory / "docs"), str(directory)]
+
+#Completer
+def test_commands_and_their_arguments(directory, completer):
+    assert "grep " in complete(completer, "gr")
+    assert all(match.startswith("gr") for match in complete(completer, "gr"))
+    assert "grep " in complete(completer, "ls | gr")
+    assert "grep " in complete(completer, "help gr")
+
+def test_paths(directory, completer):
+    assert complete(completer, "cat set") == ["setup.cfg", "setup.py"]
+    assert complete(completer, "cat setup.p") == ["setup.py "]
+    assert complete(completer, "cat s") == ["setup.cfg", "setup.py", "src" + os.sep]
+    assert complete(completer, "cat .e") == [".env "]
+    assert complete(completer, "cat src/d") == ["src/deep" + os.sep]
+    assert complete(completer, "./se") == ["./setup.cfg", "./setup.py"]
+
+def test_cd_completes_directories_only(directory, completer):
+    assert complete(completer, "cd s") == ["src" + os.sep]
+    assert complete(completer, "mkdir d") == ["docs" + os.sep]
+
+def test_a_single_deeper_match_comes_from_the_index(directory, shell, tmp_path):
+    index = fsindex.IndexSet(str(tmp_path / "index"))
+    index.update(str(directory))
+    completer = completion.Completer(shell, index=index)
+    assert complete(completer, "cat needle") == [os.path.join("src", "deep", "deeper", "needle.txt") + " "]
+    assert complete(completer, "cd deeper") == [os.path.join("src", "deep", "deeper") + os.sep]
+    assert complete(completer, "cat missing") == []
@@ -0,0 +1,82 @@
+#Imports
+import os
+
+import pytest
+
+from vterm_core import fscopy
+from vterm_core.progress import Progress
+
+@pytest.fixture
+def source(tmp_path):
+    root = tmp_path / "source"
+    (root / "sub" / "deeper").mkdir(parents=True)
+    (root / "a.txt").write_text("alpha")
+    (root / "sub" / "b.bin").write_bytes(os.urandom(300 * 1024))
+    (root / "sub" / "deeper" / "c.txt").write_text("")
+    if hasattr(os, "symlink"):
+        os.symlink("a.txt", root / "link")
+    return root
+
+def tree(root):
+    found = {}
+    for directory, _, names in os.walk(root):
+        for name in names:
+            path = os.path.join(directory, name)
+            relative = os.path.relpath(path, root)
+            found[relative] = os.readlink(path) if os.path.islink(path) else open(path, "rb").read()
+    return found
+
+#Copying
+def test_copies_the_whole_tree(source, tmp_path):
+    destination = tmp_path / "copy"
+    assert fscopy.copy_tree(str(source), str(destination)) == []
+    assert tree(destination) == tree(source)
+    assert int(os.stat(destination / "a.txt").st_mtime) == int(os.stat(source / "a.txt").st_mtime)
+
+def test_unchanged_files_are_skipped(source, tmp_path):
+    destination = tmp_path / "copy"
+    fscopy.copy_tree(str(source), str(destination))
+    progress = Progress("Copying", enabled=False)
+    fscopy.copy_tree(str(source), str(destination), progress=progress)
+    assert progress.skipped == 3
+    assert progress.bytes == 0
+
+def test_changed_files_are_copied_again(source, tmp_path):
+    destination = tmp_path / "copy"
+    fscopy.copy_tree(str(source), str(destination))
+    (source / "a.txt").write_text("alpha, longer")
+    progress = Progress("Copying", enabled=False)
+    fscopy.copy_tree(str(source), str(destination), progress=progress)
+    assert progress.skipped == 2
+    assert (destination / "a.txt").read_text() == "alpha, longer"
+
+def test_no_skip_copies_everything(source, tmp_path):
+    destination = tmp_path / "copy"
+    fscopy.copy_tree(str(source), str(destination))
+    progress = Progress("Copying", enabled=False)
+    fscopy.copy_tree(str(source), str(destination), skip_unchanged=False, progress=progress)
+    assert progress.skipped == 0
+    assert progress.bytes == 300 * 1024 + 5
+
+def test_resume_after_an_interrupted_copy(source, tmp_path):
+    # Half-written file from an earlier run: same name, wrong size, so it is copied again.
+    destination = tmp_path / "copy"
+    (destination / "sub").mkdir(parents=True)
+    (destination / "sub" / "b.bin").write_bytes(b"partial")
+    fscopy.copy_tree(str(source), str(destination))
+    assert tree(destination) == tree(source)
+
+#Command
+def test_refuses_to_copy_into_itself(source, capsys):
+    assert fscopy.command(["-q", str(source), str(source / "sub" / "inside")]) == 1
+    assert "cannot copy a directory into itself" in capsys.readouterr().out
+
+def test_missing_source(tmp_path, capsys):
+    assert fscopy.command(["-q", str(tmp_path / "missing"), str(tmp_path / "copy")]) == 1
+    assert "source not found" in capsys.readouterr().out
+
+def test_single_file_into_directory(source, tmp_path, capsys):
+    target = tmp_path / "target"
+    target.mkdir()
+    assert not fscopy.command(["-q", str(source / "a.txt"), str(target)])
+    assert (target / "a.txt").read_text() == "alpha"
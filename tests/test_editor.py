@@ -0,0 +1,51 @@
+#Imports
+import io
+from unittest import mock
+
+import pytest
+
+from vterm_core import editor
+
+def contents(table):
+    out = io.BytesIO()
+    table.write_to(out)
+    return out.getvalue()
+
+@pytest.fixture
+def session(tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_bytes(b"one\ntwo\n")
+    line_editor = editor.LineEditor(str(path))
+    line_editor.table.insert(2, [b"three"])
+    yield path, line_editor
+    line_editor.table.close()
+
+#Saving
+def test_failed_save_keeps_the_edits(session, capsys):
+    path, line_editor = session
+    with mock.patch("os.replace", side_effect=PermissionError(13, "Permission denied")):
+        assert line_editor.save() is False
+    assert "Your changes are still open" in capsys.readouterr().out
+    assert path.read_bytes() == b"one\ntwo\n"
+    assert contents(line_editor.table) == b"one\ntwo\nthree\n"
+    assert [entry.name for entry in path.parent.iterdir()] == ["notes.txt"]
+    assert line_editor.save() is True
+    assert path.read_bytes() == b"one\ntwo\nthree\n"
+
+def test_failed_save_remaps_the_original_on_windows(session):
+    # Windows closes the mapping before the rename; a failed rename must bring it back.
+    path, line_editor = session
+    with mock.patch.object(editor.os, "name", "nt"), \
+            mock.patch("os.replace", side_effect=PermissionError(13, "Permission denied")):
+        assert line_editor.save() is False
+    assert line_editor.table.mapped is not None
+    assert contents(line_editor.table) == b"one\ntwo\nthree\n"
+
+def test_quit_after_failed_write_quit_asks_again(session, monkeypatch, capsys):
+    path, line_editor = session
+    entries = iter(["wq", "q", "q!"])
+    monkeypatch.setattr("builtins.input", lambda prompt="": next(entries))
+    with mock.patch("os.replace", side_effect=OSError(28, "No space left on device")):
+        line_editor.run()
+    assert "There are unsaved changes" in capsys.readouterr().out
+    assert path.read_bytes() == b"one\ntwo\n"
@@ -0,0 +1,59 @@
+#Imports
+import os
+
+import pytest
+
+from vterm_core import find
+
+@pytest.fixture
+def repository(tmp_path):
+    # repo/.gitignore ignores sub/build by an anchored rule and *.log anywhere.
+    (tmp_path / ".git").mkdir()
+    (tmp_path / ".gitignore").write_text("sub/build\n*.log\n")
+    for directory in ("sub/build", "sub/keep/deep"):
+        (tmp_path / directory).mkdir(parents=True)
+    for name in ("sub/build/out.o", "sub/keep/a.txt", "sub/keep/b.log", "sub/keep/deep/c.txt"):
+        (tmp_path / name).write_text("")
+    return tmp_path
+
+def run(args, capsys):
+    status = find.command(args)
+    return status, capsys.readouterr().out.splitlines()
+
+#Ignore rules
+@pytest.mark.parametrize("jobs", ["1", "4"])
+def test_parent_ignore_file_from_a_relative_root(repository, monkeypatch, capsys, jobs):
+    monkeypatch.chdir(repository / "sub")
+    status, lines = run([".", "-j", jobs], capsys)
+    assert status == 0
+    expected = [".", "./keep", "./keep/a.txt", "./keep/deep", "./keep/deep/c.txt"]
+    assert sorted(lines) == sorted(expected)
+
+def test_absolute_root(repository, capsys):
+    status, lines = run([str(repository / "sub"), "-type", "f"], capsys)
+    keep = os.path.join(str(repository), "sub", "keep")
+    assert sorted(lines) == [os.path.join(keep, "a.txt"), os.path.join(keep, "deep", "c.txt")]
+
+def test_no_ignore(repository, monkeypatch, capsys):
+    monkeypatch.chdir(repository / "sub")
+    status, lines = run([".", "--no-ignore", "-name", "*.o"], capsys)
+    assert lines == [os.path.join(".", "build", "out.o")]
+
+#Depth
+@pytest.mark.parametrize("depth, expected", [
+    ("0", ["."]),
+    ("1", [".", "./keep"]),
+    ("2", [".", "./keep", "./keep/a.txt", "./keep/deep"]),
+])
+def test_maxdepth(repository, monkeypatch, capsys, depth, expected):
+    monkeypatch.chdir(repository / "sub")
+    status, lines = run([".", "-maxdepth", depth], capsys)
+    assert sorted(lines) == sorted(expected)
+
+#Regex
+def test_regex_matches_the_whole_path(repository, monkeypatch, capsys):
+    monkeypatch.chdir(repository / "sub")
+    status, lines = run([".", "-regex", r".*\.txt"], capsys)
+    assert sorted(lines) == ["./keep/a.txt", "./keep/deep/c.txt"]
+    status, lines = run([".", "-regex", r"a\.txt"], capsys)
+    assert lines == []
@@ -0,0 +1,101 @@
+#Imports
+import os
+import time
+
+import pytest
+
+from vterm_core import fsindex
+
+OLD = time.time() - 3600
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / "tree"
+    (root / "src" / "pkg").mkdir(parents=True)
+    (root / "docs").mkdir()
+    (root / "src" / "pkg" / "main.py").write_text("")
+    (root / "src" / "pkg" / "util.py").write_text("")
+    (root / "docs" / "guide.md").write_text("")
+    age(root)
+    return root
+
+@pytest.fixture
+def index_set(tmp_path, monkeypatch):
+    found = fsindex.IndexSet(str(tmp_path / "index"))
+    monkeypatch.setattr(fsindex, "indexes", found)
+    return found
+
+def age(root, when=OLD):
+    # Directories modified just now are read again on every refresh (MTIME_SLACK).
+    for directory, _, _ in os.walk(root):
+        os.utime(directory, (when, when))
+
+def located(index_set, pattern, **options):
+    query = fsindex.Query(pattern, **options)
+    return sorted(index.entry_path(i) for index in index_set.indexes() for i in index.search(query))
+
+#Incremental refresh
+def test_unchanged_directories_are_not_read_again(tree, index_set):
+    first = index_set.update(str(tree))
+    assert (first["entries"], first["directories"], first["rescanned"]) == (6, 4, 4)
+    second = index_set.update(str(tree))
+    assert (second["entries"], second["directories"], second["rescanned"]) == (6, 4, 0)
+    assert located(index_set, "*.py") == [str(tree / "src" / "pkg" / "main.py"),
+                                          str(tree / "src" / "pkg" / "util.py")]
+
+def test_only_changed_directories_are_read(tree, index_set):
+    index_set.update(str(tree))
+    (tree / "src" / "pkg" / "new.py").write_text("")
+    os.remove(tree / "docs" / "guide.md")
+    age(tree / "src" / "pkg", OLD + 60)
+    age(tree / "docs", OLD + 60)
+    stats = index_set.update(str(tree))
+    assert stats["rescanned"] == 2
+    assert str(tree / "src" / "pkg" / "new.py") in located(index_set, "new")
+    assert located(index_set, "guide") == []
+    assert located(index_set, "util", basename=True) == [str(tree / "src" / "pkg" / "util.py")]
+
+def test_recent_directories_are_read_again(tree, index_set):
+    age(tree / "docs", time.time())
+    index_set.update(str(tree))
+    assert index_set.update(str(tree))["rescanned"] == 1
+
+def test_new_subdirectories_are_indexed(tree, index_set):
+    index_set.update(str(tree))
+    (tree / "src" / "extra").mkdir()
+    (tree / "src" / "extra" / "more.py").write_text("")
+    os.utime(tree / "src", (OLD + 60, OLD + 60))
+    os.utime(tree / "src" / "extra", (OLD, OLD))
+    stats = index_set.update(str(tree))
+    assert stats["rescanned"] == 2
+    assert located(index_set, "more.py") == [str(tree / "src" / "extra" / "more.py")]
+
+#Commands
+def test_updatedb_and_locate(tree, index_set, capsys):
+    assert fsindex.locate_command(["main"]) == 1
+    assert "No indexes yet" in capsys.readouterr().out
+    assert fsindex.updatedb_command([str(tree)]) == 0
+    assert "(4 read)" in capsys.readouterr().out
+    assert fsindex.updatedb_command([]) == 0
+    assert "(0 read)" in capsys.readouterr().out
+    assert fsindex.locate_command(["-i", "MAIN"]) == 0
+    assert capsys.readouterr().out == str(tree / "src" / "pkg" / "main.py") + "\n"
+    assert fsindex.locate_command(["-c", "*.py"]) == 0
+    assert capsys.readouterr().out == "2\n"
+
+def test_locate_e_leaves_out_deleted_files(tree, index_set, capsys):
+    fsindex.updatedb_command([str(tree)])
+    os.remove(tree / "src" / "pkg" / "util.py")
+    capsys.readouterr()
+    assert fsindex.locate_command(["-e", "util"]) == 1
+    assert fsindex.locate_command(["util"]) == 0
+    assert "util.py" in capsys.readouterr().out
+
+def test_an_outer_root_replaces_inner_indexes(tree, index_set, capsys):
+    fsindex.updatedb_command([str(tree / "src")])
+    fsindex.updatedb_command([str(tree / "src" / "pkg")])
+    assert "already indexed as part of" in capsys.readouterr().out
+    fsindex.updatedb_command([str(tree)])
+    assert [index.root for index in index_set.indexes()] == [str(tree)]
+    assert fsindex.updatedb_command(["--remove", str(tree)]) == 0
+    assert index_set.indexes() == []
@@ -0,0 +1,59 @@
+#Imports
+import io
+
+from vterm_core import grep
+
+#Line semantics
+LINES = b"plain x y\nx\nb\nlast x"
+
+def mapped(pattern, data=LINES, invert=False):
+    regex = grep.compile_pattern(pattern)
+    return list(grep.search_mapped(regex, data, 0, len(data), invert))
+
+def streamed(pattern, data=LINES, invert=False):
+    regex = grep.compile_pattern(pattern)
+    return list(grep.search_lines(regex, io.BytesIO(data), invert))
+
+def test_match_does_not_run_past_the_newline():
+    # "x\s" would otherwise match the "x" ending line 2 plus its newline.
+    assert mapped(r"x\s") == [(1, b"plain x y")]
+    assert mapped(r"x[^z]b") == []
+
+def test_mapped_and_stdin_agree():
+    for pattern in (r"x\s", r"x[^z]b", r"^x$", r"x", r"\Wy", r"y$"):
+        assert mapped(pattern) == streamed(pattern), pattern
+
+def test_inverted_and_line_numbers():
+    assert mapped("x", invert=True) == [(3, b"b")]
+    assert mapped("x") == [(1, b"plain x y"), (2, b"x"), (4, b"last x")]
+
+def test_carriage_returns_are_dropped():
+    assert mapped("x", b"a x\r\nb\r\n") == [(1, b"a x")]
+
+#Command
+def test_command_on_file_and_stdin(tmp_path, capsys):
+    path = tmp_path / "lines.txt"
+    path.write_bytes(LINES + b"\n")
+    assert grep.command(["-n", r"x\s", str(path)]) == 0
+    assert capsys.readouterr().out == "1:plain x y\n"
+    assert grep.command(["-c", "x"], stdin=io.BytesIO(LINES)) == 0
+    assert capsys.readouterr().out == "3\n"
+    assert grep.command(["nothing", str(path)]) == 1
+
+#Trailing newline
+BLANK = b"foo bar\nbaz\n\nqux foo\n"
+
+def test_no_line_after_the_final_newline():
+    assert mapped(r"^$", BLANK) == [(3, b"")]
+    assert mapped(r"^\s*$", BLANK) == [(3, b"")]
+    assert mapped(r"^$", b"a\n\n") == [(2, b"")]
+    assert mapped(r"^$", b"a\nb") == []
+
+def test_blank_line_counts(tmp_path, capsys):
+    path = tmp_path / "blank.txt"
+    path.write_bytes(BLANK)
+    for pattern in (r"^$", r"^\s*$"):
+        grep.command(["-c", pattern, str(path)])
+        assert capsys.readouterr().out == "1\n"
+    grep.command(["-n", r"^$", str(path)])
+    assert capsys.readouterr().out == "3:\n"
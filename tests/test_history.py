@@ -0,0 +1,87 @@
+#Imports
+import pytest
+
+from vterm_core import history
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "history")
+
+def loaded(path, limit=history.MAX_ENTRIES):
+    store = history.History(path, limit)
+    store.preload()
+    return store
+
+#Index
+def test_search_is_newest_first_and_skips_older_copies():
+    index = history.HistoryIndex()
+    index.extend(["ls -l", "grep foo", "ls -a", "grep bar", "ls -l"])
+    assert [entry for _, entry in index.search("ls")] == ["ls -l", "ls -a"]
+    assert [entry for _, entry in index.search("grep", prefix=True)] == ["grep bar", "grep foo"]
+    assert [entry for _, entry in index.search("-l")] == ["ls -l"]
+    assert list(index.search("missing")) == []
+
+def test_prefix_search_matches_only_the_start():
+    index = history.HistoryIndex()
+    index.extend(["echo ls", "ls"])
+    assert [entry for _, entry in index.search("ls", prefix=True)] == ["ls"]
+    assert [entry for _, entry in index.search("ls")] == ["ls", "echo ls"]
+
+def test_recent_lists_distinct_entries():
+    index = history.HistoryIndex()
+    index.extend(["a", "b", "a", "c"])
+    assert [entry for _, entry in index.recent()] == ["c", "a", "b"]
+    assert [entry for _, entry in index.recent(2)] == ["c", "a"]
+    assert len(index) == 3
+
+#History file
+def test_sessions_share_the_file(path):
+    first = loaded(path)
+    second = loaded(path)
+    first.record("make build")
+    first.record("make build")
+    second.record("make test")
+    first.refresh()
+    assert [entry for _, entry in first.recent()] == ["make test", "make build"]
+    assert [entry for _, entry in loaded(path).search("make")] == ["make test", "make build"]
+    assert open(path).read() == "make build\nmake test\n"
+
+def test_lines_recorded_while_loading_are_kept(path):
+    loaded(path).record("old")
+    store = history.History(path)
+    store.record("typed early")
+    store.preload()
+    assert [entry for _, entry in store.recent()] == ["typed early", "old"]
+
+def test_compaction_keeps_the_newest_distinct_entries(path):
+    with open(path, "w") as file:
+        file.write("".join(f"cmd {n % 4}\n" for n in range(20)) + "last\n")
+    store = loaded(path, limit=3)
+    assert [entry for _, entry in store.recent()] == ["last", "cmd 3", "cmd 2"]
+    assert open(path).read() == "cmd 2\ncmd 3\nlast\n"
+
+def test_a_compacted_file_is_read_again(path):
+    writer = loaded(path)
+    for n in range(5):
+        writer.record(f"cmd {n}")
+    store = loaded(path)
+    loaded(path, limit=2).compact()
+    writer.record("new")
+    store.refresh()
+    assert [entry for _, entry in store.recent()] == ["new", "cmd 4", "cmd 3"]
+
+#Command
+def test_history_command(path, monkeypatch, capsys):
+    store = loaded(path)
+    for entry in ["ls", "cd src", "ls -l", "grep x"]:
+        store.record(entry)
+    monkeypatch.setattr(history, "store", store)
+    assert history.command(["-n", "2"]) is None
+    assert capsys.readouterr().out == "3  ls -l\n4  grep x\n"
+    assert history.command(["ls"]) is None
+    assert capsys.readouterr().out == "1  ls\n3  ls -l\n"
+    assert history.command(["-p", "c"]) is None
+    assert capsys.readouterr().out == "2  cd src\n"
+    assert history.command(["nothing"]) == 1
+    history.command(["-c"])
+    assert store.recent() == [] and open(path).read() == ""
@@ -0,0 +1,85 @@
+#Imports
+import os
+import shlex
+import sys
+import threading
+
+import pytest
+
+from vterm_core import find, fscopy, jobs, remove
+
+@pytest.fixture
+def stopped():
+    # This thread behaves like a built-in job that has just been killed.
+    jobs._thread.stop = threading.Event()
+    jobs._thread.stop.set()
+    yield
+    jobs._thread.stop = None
+
+def latest():
+    return jobs.supervisor.find()
+
+def finish(job):
+    assert job.done.wait(10), job.line
+    return job
+
+#Stopping built-ins
+def test_not_stopped_outside_jobs():
+    assert not jobs.stop_requested()
+    jobs.check_stop()
+
+def test_copy_and_remove_stop_between_files(tmp_path, stopped):
+    source = tmp_path / "source"
+    source.mkdir()
+    (source / "file.txt").write_text("data")
+    with pytest.raises(jobs.JobStopped):
+        fscopy.copy_tree(str(source), str(tmp_path / "copy"))
+    assert not (tmp_path / "copy" / "file.txt").exists()
+    with pytest.raises(jobs.JobStopped):
+        remove.TreeRemover().remove([str(source)])
+    assert (source / "file.txt").exists()
+
+def test_find_stops(tmp_path, stopped):
+    finder = find.ParallelFinder(find.Filters(find.parser.parse_args([])), jobs=1)
+    with pytest.raises(jobs.JobStopped):
+        list(finder.walk([str(tmp_path)]))
+
+#Background jobs
+def test_kill_stops_tail_f(shell, tmp_path):
+    path = tmp_path / "log.txt"
+    path.write_text("first\n")
+    assert shell.execute(f"tail -f {path} &") == 0
+    job = latest()
+    assert shell.execute("kill %%") == 0
+    assert finish(job).describe() == "Killed (SIGTERM)"
+
+def test_cd_waits_for_builtin_jobs(shell, tmp_path, capsys):
+    path = tmp_path / "log.txt"
+    path.write_text("")
+    shell.execute(f"tail -f {path} &")
+    job = latest()
+    try:
+        assert shell.execute(f"cd {tmp_path}") == 1
+        assert "built-in jobs are running" in capsys.readouterr().out
+    finally:
+        shell.execute("kill %%")
+        finish(job)
+
+@pytest.mark.skipif(os.name == "nt", reason="process groups are a POSIX notion")
+def test_programs_in_builtin_jobs_are_detached(shell):
+    sleeper = f"{shlex.quote(sys.executable)} -c {shlex.quote('import time; time.sleep(30)')}"
+    shell.execute(f"{sleeper} | grep x &")
+    job = latest()
+    try:
+        for _ in range(100):
+            if job.processes:
+                break
+            job.done.wait(0.05)
+        child = job.processes[0]
+        # Its own process group, where kill finds it, and the keyboard is left to the prompt.
+        assert os.getpgid(child.pid) == child.pid
+        if os.path.isdir("/proc"):
+            assert os.readlink(f"/proc/{child.pid}/fd/0") == os.devnull
+    finally:
+        shell.execute("kill %%")
+    assert finish(job).describe() == "Killed (SIGTERM)"
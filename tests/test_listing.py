@@ -0,0 +1,82 @@
+#Imports
+import io
+import os
+
+import pytest
+
+from vterm_core import listing
+
+@pytest.fixture
+def directory(tmp_path):
+    for name, size, age in [("b.txt", 300, 30), ("a.txt", 10, 10), ("c.txt", 2000, 20)]:
+        path = tmp_path / name
+        path.write_bytes(b"x" * size)
+        os.utime(path, (1_000_000 + age, 1_000_000 + age))
+    (tmp_path / ".hidden").write_text("")
+    (tmp_path / "sub").mkdir()
+    return tmp_path
+
+def ls(*args):
+    out = io.StringIO()
+    status = listing.command(list(args), out)
+    return status, out.getvalue()
+
+def names(*args):
+    status, text = ls(*args)
+    assert status == 0
+    return text.splitlines()
+
+#Listing
+def test_sorted_by_name_without_hidden_files(directory):
+    assert names(str(directory)) == ["a.txt", "b.txt", "c.txt", "sub"]
+    assert names("-a", str(directory)) == [".hidden", "a.txt", "b.txt", "c.txt", "sub"]
+    assert names("-r", str(directory)) == ["sub", "c.txt", "b.txt", "a.txt"]
+
+def test_sorted_by_size_and_time(directory):
+    # A directory's own size depends on the filesystem.
+    assert [name for name in names("-S", str(directory)) if name != "sub"] == ["c.txt", "b.txt", "a.txt"]
+    assert names("-t", str(directory))[0] == "sub"
+    assert names("-t", str(directory))[1:] == ["b.txt", "c.txt", "a.txt"]
+
+def test_unsorted_lists_everything(directory):
+    assert sorted(names("-U", str(directory))) == ["a.txt", "b.txt", "c.txt", "sub"]
+
+def test_long_format(directory):
+    lines = names("-l", str(directory))
+    assert lines[2].startswith("-rw") and lines[2].split()[1] == "2000" and lines[2].endswith(" c.txt")
+    assert lines[3].startswith("d")
+    assert names("-lh", str(directory))[2].split()[1] != "2000"
+
+@pytest.mark.skipif(not hasattr(os, "symlink"), reason="needs symlinks")
+def test_long_format_shows_link_targets(directory):
+    os.symlink("a.txt", directory / "link")
+    assert names("-l", str(directory))[3].endswith(" link -> a.txt")
+
+def test_files_missing_paths_and_several_directories(directory):
+    status, text = ls(str(directory / "a.txt"), str(directory / "missing"), str(directory / "sub"), str(directory))
+    assert status == 1
+    assert text.splitlines() == [
+        str(directory / "a.txt"),
+        f"ls: cannot access '{directory / 'missing'}': No such file or directory",
+        "",
+        f"{directory / 'sub'}:",
+        "",
+        f"{directory}:",
+        "a.txt", "b.txt", "c.txt", "sub",
+    ]
+
+def test_large_directories_are_written_in_batches(tmp_path, monkeypatch):
+    for n in range(500):
+        (tmp_path / f"file{n:04}").write_text("")
+    monkeypatch.setattr(listing, "WRITE_BATCH", 100)
+    writes = []
+
+    class Out(io.StringIO):
+        def write(self, text):
+            writes.append(text)
+            return super().write(text)
+
+    out = Out()
+    assert listing.command([str(tmp_path)], out) == 0
+    assert out.getvalue().splitlines() == [f"file{n:04}" for n in range(500)]
+    assert len(writes) > 10
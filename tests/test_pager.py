@@ -0,0 +1,45 @@
+#Imports
+import io
+
+import pytest
+
+from vterm_core import pager
+from vterm_core.arguments import UsageError
+
+NUMBERS = b"".join(b"%d\n" % number for number in range(1, 21))
+
+#head and tail on stdin
+@pytest.mark.parametrize("args, expected", [
+    ([], b"".join(b"%d\n" % number for number in range(1, 11))),
+    (["-3"], b"1\n2\n3\n"),
+    (["-n", "2"], b"1\n2\n"),
+    (["-n0"], b""),
+])
+def test_head_reads_stdin(args, expected, capsys):
+    pager.head_command(args, stdin=io.BytesIO(NUMBERS))
+    assert capsys.readouterr().out == expected.decode()
+
+@pytest.mark.parametrize("args, expected", [
+    (["-2"], b"19\n20\n"),
+    (["-n", "1"], b"20\n"),
+    (["-f", "-1"], b"20\n"),
+])
+def test_tail_reads_stdin(args, expected, capsys):
+    pager.tail_command(args, stdin=io.BytesIO(NUMBERS))
+    assert capsys.readouterr().out == expected.decode()
+
+def test_head_stops_reading_early():
+    stream = io.BytesIO(NUMBERS)
+    pager.show_stream(stream, "head", 2)
+    assert stream.readline() == b"3\n"
+
+def test_file_still_wins_over_stdin(tmp_path, capsys):
+    path = tmp_path / "numbers.txt"
+    path.write_bytes(NUMBERS)
+    pager.tail_command(["-1", str(path)], stdin=io.BytesIO(b"ignored\n"))
+    assert capsys.readouterr().out == "20\n"
+
+def test_no_file_on_a_terminal(monkeypatch):
+    monkeypatch.setattr(pager.sys, "stdin", None)
+    with pytest.raises(UsageError):
+        pager.head_command([])
@@ -0,0 +1,60 @@
+#Imports
+import shlex
+import signal
+import sys
+
+import pytest
+
+from vterm_core import process
+from vterm_core.builtins import run_pipeline_stages
+
+def python(code):
+    return f"{shlex.quote(sys.executable)} -c {shlex.quote(code)}"
+
+PRINT_LINES = python("for i in range(1, 6): print(f'line {i}')")
+UPPER = python("import sys; sys.stdout.write(sys.stdin.read().upper())")
+
+#Statuses
+def test_one_status_per_stage(capfd):
+    assert process.run_pipeline([PRINT_LINES, UPPER]) == [0, 0]
+    assert capfd.readouterr().out == "".join(f"LINE {i}\n" for i in range(1, 6))
+    assert process.run_pipeline([python("raise SystemExit(3)"), UPPER]) == [3, 0]
+
+def test_missing_program(capfd):
+    assert process.run_pipeline(["vterm-no-such-program", UPPER]) == [127, 0]
+    assert "Command not found: vterm-no-such-program" in capfd.readouterr().out
+
+@pytest.mark.skipif(not hasattr(signal, "SIGPIPE"), reason="no SIGPIPE")
+def test_sigpipe_upstream_is_not_a_failure(capfd):
+    # `yes | head -1`: the writer dies of SIGPIPE once the reader has gone away.
+    writer = python("import signal; signal.signal(signal.SIGPIPE, signal.SIG_DFL)\nwhile True: print('y')")
+    statuses = process.run_pipeline([writer, python("import sys; print(sys.stdin.readline().strip())")])
+    assert statuses == [128 + signal.SIGPIPE, 0]
+    assert not process.pipeline_failed(statuses)
+    assert capfd.readouterr().out == "y\n"
+
+def test_pipeline_failed():
+    assert not process.pipeline_failed([0, 0])
+    assert process.pipeline_failed([0, 1])
+    assert process.pipeline_failed([2, 0])
+
+#Mixed with built-ins
+def test_external_into_builtin(shell, capfd):
+    assert run_pipeline_stages(shell, [PRINT_LINES, "grep -n 3"]) == [0, 0]
+    assert capfd.readouterr().out == "3:line 3\n"
+
+def test_builtin_into_external(shell, tmp_path, capfd):
+    path = tmp_path / "lines.txt"
+    path.write_text("a\nb\nc\n")
+    assert run_pipeline_stages(shell, [f"head -2 {path}", UPPER]) == [0, 0]
+    assert capfd.readouterr().out == "A\nB\n"
+
+def test_builtins_on_both_sides(shell, capfd):
+    statuses = run_pipeline_stages(shell, [PRINT_LINES, "tail -2", UPPER, "grep 5"])
+    assert statuses == [0, 0, 0, 0]
+    assert capfd.readouterr().out == "LINE 5\n"
+    assert run_pipeline_stages(shell, [PRINT_LINES, "grep nothing"]) == [0, 1]
+
+def test_registry_reports_the_last_status(shell, capfd):
+    assert shell.execute(f"{PRINT_LINES} | grep nothing") == 1
+    assert "Pipeline exit status: 0 | 1" in capfd.readouterr().out
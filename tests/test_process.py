@@ -0,0 +1,58 @@
+#Imports
+import shlex
+import sys
+
+from vterm_core import metrics, process
+from vterm_core.builtins import run_command
+
+def python(code):
+    return f"{shlex.quote(sys.executable)} -c {shlex.quote(code)}"
+
+#Capture buffer
+def test_capture_keeps_only_the_newest_bytes():
+    capture = process.CaptureBuffer(8)
+    for chunk in (b"abc", b"defgh", b"ijklmnop", b"qr"):
+        capture.append(chunk)
+    assert capture.getvalue() == b"klmnopqr"
+    assert capture.size == 8
+    assert capture.truncated
+
+def test_capture_under_the_limit():
+    capture = process.CaptureBuffer(100)
+    capture.append(b"line\n")
+    assert capture.text() == "line\n"
+    assert not capture.truncated
+
+#run_command
+def test_buffered_mode_returns_the_output():
+    assert run_command(python("print('hello')")) == "hello\n"
+
+def test_stream_mode_prints_everything_and_keeps_the_tail(capfd):
+    code = "import sys\nfor i in range(1000): print(i)\nprint('oops', file=sys.stderr)"
+    captured = run_command(python(code), stream=True, capture_limit=8)
+    assert captured == "998\n999\n"
+    out, err = capfd.readouterr()
+    assert out == "".join(f"{i}\n" for i in range(1000))
+    assert err == "oops\n"
+
+def test_stream_command_reports_the_status():
+    status, capture = process.stream_command(python("raise SystemExit(3)"), capture_limit=16)
+    assert status == 3
+    assert capture.getvalue() == b""
+
+def test_missing_program():
+    # Errors come back as the text instead of raising, as run_command always did.
+    assert "command not found" in run_command("vterm-no-such-program --flag")
+    assert "command not found" in run_command("vterm-no-such-program", stream=True)
+
+#Metrics
+def test_failures_are_counted(monkeypatch):
+    monkeypatch.setattr(metrics.collector, "enabled", True)
+    monkeypatch.setattr(metrics.collector, "errors", {})
+    run_command(python("pass"))
+    run_command(python("pass"), stream=True)
+    assert metrics.collector.errors == {}
+    run_command(python("raise SystemExit(1)"))
+    run_command(python("raise SystemExit(2)"), stream=True)
+    run_command("vterm-no-such-program")
+    assert metrics.collector.errors == {"run_command": 3}
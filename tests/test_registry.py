@@ -0,0 +1,62 @@
+#Imports
+import pytest
+
+from vterm_core.arguments import UsageError
+from vterm_core.registry import CommandRegistry
+
+@pytest.fixture
+def registry():
+    registry = CommandRegistry()
+    registry.calls = []
+    registry.fallback = lambda argv, line: registry.calls.append(("fallback", argv)) or 127
+    for name in ("rm", "ls"):
+        registry.register(name, lambda args, name=name: registry.calls.append((name, args)), f"{name} help")
+    return registry
+
+#Dispatch
+def test_exact_names_only(registry):
+    # "rmdir" and "lsblk" start like built-ins but are other programs.
+    assert registry.execute("rmdir old") == 127
+    assert registry.execute("lsblk") == 127
+    assert registry.execute("rm -r old") == 0
+    assert registry.execute("LS") == 0
+    assert registry.calls == [("fallback", ["rmdir", "old"]), ("fallback", ["lsblk"]),
+                              ("rm", ["-r", "old"]), ("ls", [])]
+
+def test_sequence_returns_the_last_status(registry):
+    assert registry.execute("nope ; ls") == 0
+    assert registry.execute("ls ; nope") == 127
+
+def test_usage_errors_and_missing_arguments(registry, capsys):
+    def strict(args):
+        raise UsageError("bad option")
+    registry.register("strict", strict, "Strict.", usage="strict FILE")
+    registry.register("needs", lambda args: 0, "Needs.", usage="needs FILE", min_args=1)
+    assert registry.execute("strict -x") == 2
+    assert registry.execute("needs") == 2
+    assert capsys.readouterr().out == ("strict: bad option\nUsage: strict FILE\n"
+                                       "Argument needed. Usage: needs FILE\n")
+
+def test_os_errors_do_not_escape(registry, capsys):
+    def failing(args):
+        raise PermissionError(13, "Permission denied", "secret.txt")
+    registry.register("failing", failing, "Fails.")
+    errors = []
+    registry.on_error = lambda: errors.append(1)
+    assert registry.execute("failing") == 1
+    assert capsys.readouterr().out == "failing: secret.txt: Permission denied\n"
+    assert errors == [1]
+
+def test_platform_can_replace_a_builtin(registry):
+    registry.register("ls", lambda args: 3, "Other ls.")
+    assert registry.execute("ls") == 3
+
+#Directories
+def test_cd_and_mkdir_report_os_errors(shell, tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "a.txt").write_text("")
+    assert shell.execute("cd a.txt") == 1
+    assert shell.execute("mkdir a.txt/sub") == 1
+    assert shell.execute("cd missing") == 1
+    assert capsys.readouterr().out == ("cd: a.txt: Not a directory\nmkdir: a.txt/sub: Not a directory\n"
+                                       "Directory not found: missing\n")
@@ -0,0 +1,67 @@
+#Imports
+import os
+
+import pytest
+
+from vterm_core import remove
+
+@pytest.fixture
+def tree(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for directory in ("work/a/b", "work/c"):
+        (tmp_path / directory).mkdir(parents=True)
+    for name in ("work/a/one.txt", "work/a/b/two.txt", "work/c/three.log", "work/top.txt"):
+        (tmp_path / name).write_text("12345")
+    return tmp_path
+
+#Protection
+@pytest.mark.parametrize("path", [".", "..", "./", "work/..", "/", os.sep * 2])
+def test_dot_and_root_are_protected(tree, path):
+    assert remove.protected(path)
+
+def test_cwd_and_its_parents_are_protected(tree, monkeypatch):
+    monkeypatch.chdir(tree / "work" / "a")
+    assert remove.protected(str(tree / "work" / "a"))
+    assert remove.protected(str(tree / "work"))
+    assert remove.protected(str(tree))
+    assert not remove.protected("b")
+    assert not remove.protected(str(tree / "work" / "c"))
+
+def test_symlink_to_a_parent_is_only_a_link(tree):
+    os.symlink(str(tree), "work/link")
+    assert not remove.protected("work/link")
+
+def test_command_refuses_protected_targets(tree, capsys):
+    assert remove.command(["-r", "."]) == 1
+    assert "Refusing to remove '.'" in capsys.readouterr().out
+    assert (tree / "work" / "top.txt").exists()
+
+#Dry run
+def test_dry_run_removes_nothing(tree, capsys):
+    assert remove.command(["-r", "-n", "work"]) == 0
+    out = capsys.readouterr().out
+    assert "would remove " + os.path.join("work", "a", "b", "two.txt") in out
+    assert "Would remove 4 files and 4 directories (20 B)" in out
+    assert sorted(path.name for path in (tree / "work").iterdir()) == ["a", "c", "top.txt"]
+
+#Removing
+def test_recursive_remove(tree, capsys):
+    assert remove.command(["-q", "-r", "work"]) == 0
+    assert not (tree / "work").exists()
+
+def test_directory_needs_r(tree, capsys):
+    assert remove.command(["work"]) == 1
+    assert "Use rm -r" in capsys.readouterr().out
+    assert (tree / "work").exists()
+
+def test_globs_and_force(tree, capsys):
+    assert remove.command(["-q", "work/*.txt"]) == 0
+    assert not (tree / "work" / "top.txt").exists()
+    assert remove.command(["-q", "missing*", "gone.txt"]) == 1
+    assert remove.command(["-q", "-f", "missing*", "gone.txt"]) == 0
+
+def test_removing_a_link_keeps_its_target(tree, capsys):
+    os.symlink(str(tree / "work"), "link")
+    assert remove.command(["-q", "link"]) == 0
+    assert not os.path.lexists("link")
+    assert (tree / "work" / "top.txt").exists()
@@ -0,0 +1,43 @@
+#Imports
+import os
+
+import pytest
+
+from vterm_core import executables
+from vterm_core.registry import CommandRegistry
+from vterm_core.suggest import SuggestionIndex
+
+@pytest.fixture
+def crowded_path(tmp_path, monkeypatch):
+    # Dozens of python* programs all share the trigrams of a mistyped "python".
+    names = ["python2", "python3", "python3-config", "pythonw", "python-argcomplete-check"]
+    names += [f"python3.{minor}" for minor in range(4, 14)] + [f"python3.{minor}-config" for minor in range(4, 14)]
+    names += [f"python3.{minor}-gdb.py" for minor in range(4, 14)] + [f"pythontex{index}" for index in range(500)]
+    for name in names:
+        path = tmp_path / name
+        path.write_text("")
+        path.chmod(0o755)
+    monkeypatch.setenv("PATH", str(tmp_path))
+    executables.commands.forget()
+    yield tmp_path
+    executables.commands.forget()
+
+def index_with(*builtins):
+    registry = CommandRegistry()
+    for name in builtins:
+        registry.register(name, lambda args: 0, "A built-in.")
+    return SuggestionIndex(registry)
+
+@pytest.mark.skipif(os.name == "nt", reason="PATH executables are found by extension on Windows")
+def test_builtin_survives_a_crowded_path(crowded_path):
+    index = index_with("python", "pwd", "help")
+    assert "python" in index.lookup("pythn")
+    assert index.lookup("pythn")[0] == "python"
+
+def test_short_names(crowded_path):
+    index = index_with("ls", "cd", "grep", "find")
+    assert index.lookup("lss") == ["ls"]
+    assert index.lookup("gerp")[0] == "grep"
+
+def test_nothing_close(crowded_path):
+    assert index_with("ls", "grep").lookup("zzzzzz") == []